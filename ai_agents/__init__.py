@@ -4,3 +4,4 @@ from .forecast_agent import ForecastAgent, build_cashflow_forecast
 from .driver_agent import DriverAgent, analyze_drivers_sync, DriverAnalysisResponse
 from .explainer_agent import ExplainerAgent, explain_forecast_sync, ForecastExplanation
 from .scenario_agent import ScenarioAgent, suggest_scenarios_sync, ScenarioAnalysisResponse
+from .orchestrator import AnalysisPipeline, Pipeline, run_full_analysis_sync
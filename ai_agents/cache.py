@@ -0,0 +1,211 @@
+"""
+Response cache shared by all AI agents.
+
+Structured agent outputs are cached under a hash of the model name,
+instructions, normalized message and output schema. Lookups go to an
+in-memory LRU first, then to a SQLite file with TTL and size-based
+eviction, so repeated analyses of unchanged data survive Streamlit
+reruns and restarts without another model call.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from pydantic import BaseModel
+
+import config
+
+# Bump to invalidate every cached response (e.g. after prompt format changes)
+CACHE_VERSION = 1
+
+
+def normalize_message(message: str) -> str:
+    """Collapses whitespace so formatting-only changes hit the same entry."""
+    return re.sub(r"\s+", " ", message).strip()
+
+
+def schema_version(output_type: Any) -> str:
+    """Short hash of a pydantic output type's JSON schema."""
+    if output_type is None or not hasattr(output_type, "model_json_schema"):
+        return "text"
+    schema = json.dumps(output_type.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()[:16]
+
+
+def cache_key(agent: Any, message: str) -> str:
+    """Cache key of an agent call."""
+    parts = [
+        str(CACHE_VERSION),
+        str(getattr(agent, "model", "")),
+        normalize_message(str(getattr(agent, "instructions", ""))),
+        normalize_message(message),
+        schema_version(getattr(agent, "output_type", None)),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of agent outputs."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_items: Optional[int] = None,
+        ttl_hours: Optional[float] = None,
+        max_disk_mb: Optional[float] = None,
+    ):
+        """
+        Args:
+            path: SQLite file (config.AI_CACHE_PATH if None)
+            memory_items: Entries kept in the in-memory LRU
+            ttl_hours: Age after which disk entries expire
+            max_disk_mb: Disk tier size; least recently used entries are evicted
+        """
+        self.path = Path(path or config.AI_CACHE_PATH)
+        self.memory_items = memory_items if memory_items is not None else config.AI_CACHE_MEMORY_ITEMS
+        self.ttl = (ttl_hours if ttl_hours is not None else config.AI_CACHE_TTL_HOURS) * 3600
+        self.max_bytes = int((max_disk_mb if max_disk_mb is not None else config.AI_CACHE_MAX_MB) * 1024 * 1024)
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed on success and always closed."""
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        with self._lock:
+            self._memory[key] = (value, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, output_type: Any = None) -> Optional[Any]:
+        """
+        Looks up a cached output.
+
+        Args:
+            key: Key from cache_key()
+            output_type: Pydantic model to rebuild the output with
+
+        Returns:
+            Cached output, or None on a miss
+        """
+        now = time.time()
+        value = None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                del self._memory[key]
+            elif entry is not None:
+                value = entry[0]
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+
+        if value is None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                elif row is not None:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+
+            with self._lock:
+                self._counters["disk_hits" if row else "misses"] += 1
+            if row is None:
+                return None
+            value = row[0]
+            self._remember(key, value, row[1])
+
+        if output_type is not None and hasattr(output_type, "model_validate_json"):
+            return output_type.model_validate_json(value)
+        return json.loads(value)
+
+    def set(self, key: str, output: Any) -> None:
+        """Stores an output (pydantic model or JSON-serializable value)."""
+        value = output.model_dump_json() if isinstance(output, BaseModel) else json.dumps(output)
+        now = time.time()
+        self._remember(key, value, now)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed, size)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value)),
+            )
+            evicted = self._evict(conn, now)
+        with self._lock:
+            self._counters["writes"] += 1
+            self._counters["evictions"] += evicted
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drops expired entries, then least recently used ones over the size limit."""
+        expired = conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return expired
+        oversized = conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS running FROM responses"
+            " ) WHERE running > ?)",
+            (self.max_bytes,),
+        ).rowcount
+        return expired + oversized
+
+    def clear(self) -> None:
+        """Removes all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and number of disk entries."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+        with self._connect() as conn:
+            counters["disk_entries"] = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["memory_hits"] + counters["disk_hits"]) / lookups if lookups else 0.0
+        return counters
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Shared cache used by run_agent() (None when AI_CACHE_ENABLED is off)."""
+    global _default_cache
+    if not config.AI_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
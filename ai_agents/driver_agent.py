@@ -6,12 +6,16 @@ benchmarks, and provides actionable recommendations for cash flow improvement.
 """
 
 import config
-from agents import Runner, Agent, trace
+from agents import Agent
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import json
 import os
+from .prompting import PromptBuilder
+from .event_loop import run_sync, shared_instance
+from .runner import run_agent
+from .tools import FORECAST_TOOLS, TOOL_INSTRUCTIONS, ForecastToolContext, forecast_scope
 
 load_dotenv()
 
@@ -42,7 +46,7 @@ class DriverAgent:
         self.agent = Agent(
             name="driver_analyst",
             model=config.FORECAST_MODEL,
-            tools=[],
+            tools=FORECAST_TOOLS,
             instructions="""
             You are a financial analyst specializing in working capital and cash flow analysis.
 
@@ -59,7 +63,7 @@ class DriverAgent:
             - CCC = DSO + DIO - DPO (lower is better)
 
             Respond in English with specific numbers and actionable advice.
-            """,
+            """ + TOOL_INSTRUCTIONS,
             output_type=DriverAnalysisResponse,
         )
         self.benchmarks = self._load_benchmarks()
@@ -86,53 +90,54 @@ class DriverAgent:
         drivers: dict,
         industry: str,
         historical_data: Optional[dict] = None,
+        forecast_context: Optional[ForecastToolContext] = None,
     ) -> DriverAnalysisResponse:
-        """Analyze current financial drivers and provide recommendations."""
+        """Analyze current financial drivers and provide recommendations.
+
+        forecast_context gives the agent's forecast tools the full drivers
+        and last month's revenue; without it they can only look up benchmarks.
+        """
         benchmark = self.benchmarks.get(
             industry, self.benchmarks.get("services", {})
         )
         ccc = drivers['dso_days'] + drivers['dio_days'] - drivers['dpo_days']
 
-        message = f"""
-Analyze current drivers and provide recommendations:
-
-CURRENT VALUES:
-- DSO: {drivers['dso_days']} days
-- DPO: {drivers['dpo_days']} days
-- DIO: {drivers['dio_days']} days
-- CCC: {ccc} days
-
-INDUSTRY BENCHMARKS for "{industry}":
-- DSO: {benchmark.get('dso', 'N/A')} days
-- DPO: {benchmark.get('dpo', 'N/A')} days
-- DIO: {benchmark.get('dio', 'N/A')} days
+        message = PromptBuilder("driver").build(
+            "Analyze current drivers and provide recommendations.",
+            {
+                "CURRENT VALUES": {
+                    "dso_days": drivers['dso_days'],
+                    "dpo_days": drivers['dpo_days'],
+                    "dio_days": drivers['dio_days'],
+                    "ccc_days": ccc,
+                },
+                f"INDUSTRY BENCHMARKS ({industry})": {
+                    key: benchmark.get(key) for key in ('dso', 'dpo', 'dio')
+                },
+                **({"HISTORICAL CONTEXT": historical_data} if historical_data else {}),
+                **({"FORECAST INPUTS": forecast_context.summary()} if forecast_context else {}),
+            },
+            "Give specific recommendations for each driver and estimate potential cash flow impact.",
+        )
 
-{f'HISTORICAL CONTEXT: {json.dumps(historical_data, ensure_ascii=False)}' if historical_data else ''}
+        with forecast_scope(forecast_context):
+            result = await run_agent(self.agent, message, trace_name="analyze_drivers")
 
-Give specific recommendations for each driver and estimate potential cash flow impact.
-"""
+        return result.final_output
 
-        with trace("analyze_drivers"):
-            result = await Runner.run(self.agent, message)
 
-        return result.final_output
+def get_driver_agent() -> DriverAgent:
+    """Shared DriverAgent instance."""
+    return shared_instance(DriverAgent)
 
 
 def analyze_drivers_sync(
     drivers: dict,
     industry: str,
     historical_data: Optional[dict] = None,
+    forecast_context: Optional[ForecastToolContext] = None,
 ) -> DriverAnalysisResponse:
     """Synchronous wrapper for DriverAgent.analyze_drivers()."""
-    import asyncio
-
-    agent = DriverAgent()
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    return loop.run_until_complete(
-        agent.analyze_drivers(drivers, industry, historical_data)
+    return run_sync(
+        get_driver_agent().analyze_drivers(drivers, industry, historical_data, forecast_context)
     )
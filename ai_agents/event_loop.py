@@ -0,0 +1,107 @@
+"""
+Shared background event loop for AI agent calls.
+
+Sync callers (Streamlit script threads) submit coroutines to one
+long-lived loop running in a daemon thread instead of creating or
+reusing a per-thread loop. The OpenAI HTTP client stays bound to that
+loop, so connections are pooled across calls and UI sessions. Agent
+instances are created once and shared. Context variables of the caller
+(e.g. the scheduler session) are carried over to the coroutine.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Dict, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+_instances: Dict[type, Any] = {}
+_instances_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared loop, starting its thread on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed() or _thread is None or not _thread.is_alive():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=_run, name="ai-agents-loop", daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop = loop
+        return _loop
+
+
+async def _in_context(context: contextvars.Context, coro: Awaitable[T]) -> T:
+    """Runs `coro` with the caller's context variables set."""
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+def submit(coro: Awaitable[T]) -> "Future[T]":
+    """
+    Schedules a coroutine on the shared loop.
+
+    Returns:
+        concurrent.futures.Future with the coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), get_loop())
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Runs a coroutine on the shared loop and waits for its result.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait (None = no limit)
+
+    Raises:
+        RuntimeError: If called from the loop thread itself (would deadlock)
+    """
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_sync() called from the agent loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), loop)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+
+def shared_instance(cls: Type[T]) -> T:
+    """Returns a process-wide instance of `cls`, created on first use."""
+    with _instances_lock:
+        if cls not in _instances:
+            _instances[cls] = cls()
+        return _instances[cls]
+
+
+def shutdown(timeout: float = 5.0) -> None:
+    """Stops the shared loop (a new one is started on the next call)."""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout)
+    loop.close()
@@ -6,11 +6,13 @@ highlighting key drivers, assumptions, risks, and confidence levels.
 """
 
 import config
-from agents import Runner, Agent, trace
+from agents import Agent
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List
-import json
+from .prompting import PromptBuilder
+from .event_loop import run_sync, shared_instance
+from .runner import run_agent
 
 load_dotenv()
 
@@ -57,27 +59,26 @@ class ExplainerAgent:
         historical_context: dict,
     ) -> ForecastExplanation:
         """Explain a forecast in simple language for management."""
-        message = f"""
-Explain this cash flow forecast for management:
-
-FORECAST DATA:
-{json.dumps(forecast_data, ensure_ascii=False, indent=2)}
-
-CURRENT DRIVERS:
-- DSO: {drivers.get('dso_days', 'N/A')} days
-- DPO: {drivers.get('dpo_days', 'N/A')} days
-- DIO: {drivers.get('dio_days', 'N/A')} days
+        message = PromptBuilder("explainer").build(
+            "Explain this cash flow forecast for management.",
+            {
+                "FORECAST DATA": forecast_data,
+                "CURRENT DRIVERS": {
+                    key: drivers.get(key) for key in ('dso_days', 'dpo_days', 'dio_days')
+                },
+                "HISTORICAL CONTEXT": historical_context,
+            },
+            "Provide a clear explanation with specific numbers, risk assessment, and recommendation.",
+        )
 
-HISTORICAL CONTEXT:
-{json.dumps(historical_context, ensure_ascii=False, indent=2)}
+        result = await run_agent(self.agent, message, trace_name="explain_forecast")
 
-Provide a clear explanation with specific numbers, risk assessment, and recommendation.
-"""
+        return result.final_output
 
-        with trace("explain_forecast"):
-            result = await Runner.run(self.agent, message)
 
-        return result.final_output
+def get_explainer_agent() -> ExplainerAgent:
+    """Shared ExplainerAgent instance."""
+    return shared_instance(ExplainerAgent)
 
 
 def explain_forecast_sync(
@@ -86,15 +87,6 @@ def explain_forecast_sync(
     historical_context: dict,
 ) -> ForecastExplanation:
     """Synchronous wrapper for ExplainerAgent.explain_forecast()."""
-    import asyncio
-
-    agent = ExplainerAgent()
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    return loop.run_until_complete(
-        agent.explain_forecast(forecast_data, drivers, historical_context)
+    return run_sync(
+        get_explainer_agent().explain_forecast(forecast_data, drivers, historical_context)
     )
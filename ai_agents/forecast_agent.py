@@ -1,10 +1,20 @@
+import asyncio
+import queue
 import config
-from agents import Runner, Agent, trace
+from agents import Agent
+from dataclasses import dataclass
 from dotenv import load_dotenv
 import pandas as pd
 from pydantic import BaseModel, Field
-from typing import List, Any
-from .forecast_analyzer import analyze_historical_data
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from forecasting.baseline import BaselineForecaster
+from .forecast_analyzer import analyze_matrix
+from .prompting import PromptBuilder, compact_json, count_tokens, series_digest
+from .event_loop import run_sync, shared_instance, submit
+from .resilience import CircuitOpenError
+from .runner import run_agent
+from .scheduler import PRIORITY_BULK
+from .triage import triage_categories, baseline_justification
 
 load_dotenv()
 
@@ -12,6 +22,50 @@ class ForecastAgentResponse(BaseModel):
     amount: float = Field(description="Forecasted amount")
     justification: str = Field(description="Justification of forecast")
 
+class CategoryForecast(BaseModel):
+    category: str = Field(description="Category name exactly as given")
+    amount: float = Field(description="Forecasted amount")
+    justification: str = Field(description="Justification of forecast")
+
+class BatchForecastResponse(BaseModel):
+    forecasts: List[CategoryForecast] = Field(description="One forecast per category")
+
+
+@dataclass
+class ForecastUpdate:
+    """One finished category of a streamed forecast"""
+    index: Any
+    category: str
+    amount: float
+    justification: str
+    source: str      # 'llm', 'baseline' (triage), 'fallback' (failed call) or 'circuit_open'
+    done: int
+    total: int
+
+
+def compact_history(category: str, values: List[float], stats: Optional[pd.Series] = None) -> str:
+    """One-line summary of a category for batched prompts"""
+    return f"{category} | {compact_json(series_digest(values, stats=stats))}"
+
+
+def history_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """analyze_matrix() of every row's values (all columns except category)"""
+    history = df.drop(columns=['category']).apply(pd.to_numeric, errors='coerce')
+    return analyze_matrix(history.to_numpy(dtype=float), index=df.index)
+
+
+def baseline_fallback(values: List[float]) -> Tuple[float, str]:
+    """Statistical baseline forecast used while the AI circuit is open"""
+    series = pd.Series(values, dtype=float).ffill().bfill().fillna(0)
+    if series.empty:
+        return 0, "AI unavailable (circuit open); no history"
+    baseline = BaselineForecaster().fit_predict(series.to_numpy()[None, :], 1)
+    return (
+        float(baseline['point'][0, 0]),
+        f"AI unavailable (circuit open); baseline {baseline['method'][0]} used",
+    )
+
+
 class ForecastAgent:
     """
     AI agent that generates forecasts based on given dataframe with historical data
@@ -33,14 +87,258 @@ class ForecastAgent:
         """,
         output_type=ForecastAgentResponse
     )
-        
-    async def build_cashflow_forecast(self, df: pd.DataFrame, last_period:  Any) -> pd.DataFrame:
+        self.batch_agent = Agent(
+        name="forecast_batch_agent",
+        model=config.FORECAST_MODEL,
+        tools=[],
+        instructions="""
+        You are a financial planner.
+        You are given several cash flow categories, one per line:
+        name | history digest (JSON with n, trend, volatility, mean, std,
+        min, max, last and the most recent monthly values, old to new).
+        Forecast the next month for every category.
+        Return one item per category with the category name exactly as given,
+        the forecasted amount and a short justification.
+        """,
+        output_type=BatchForecastResponse
+    )
+
+    async def _forecast_category(
+        self,
+        row: pd.Series,
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float] = None,
+        stats: Optional[pd.Series] = None,
+    ) -> Tuple[float, str, str]:
+        """
+        Forecasts one category; falls back to the last value on failure
+        and to the statistical baseline while the circuit is open
+
+        Args:
+            row: Wide-table row (category + monthly values)
+            semaphore: Bounds the number of concurrent LLM calls
+            timeout: Seconds per call from scheduler admission, retries included
+                (config.FORECAST_CALL_TIMEOUT if None)
+            stats: Precomputed analyze_matrix() row of the category
+
+        Returns:
+            (forecast amount, justification, source): source is 'llm', 'fallback'
+            or 'circuit_open'
+        """
+        category = row['category']
+        # Extract all numeric values (excluding category column)
+        values = [v for k, v in row.items() if k != 'category']
+        async with semaphore:
+            try:
+                message = PromptBuilder("forecast").build(
+                    "Forecast the next month for this cash flow category.",
+                    {"Category": category, "History": series_digest(values, stats=stats)},
+                    "History holds summary statistics and the most recent values (old to new).",
+                )
+                result = await run_agent(
+                    self.agent, message, trace_name="make_forecast", priority=PRIORITY_BULK,
+                    deadline=timeout or config.FORECAST_CALL_TIMEOUT,
+                )
+                return float(result.final_output.amount), result.final_output.justification, 'llm'
+            except CircuitOpenError:
+                return (*baseline_fallback(values), 'circuit_open')
+            except asyncio.TimeoutError:
+                reason = "timed out"
+            except Exception as e:
+                reason = f"failed ({type(e).__name__})"
+
+        # If the call fails, use the last value as fallback
+        forecast_value = values[-1] if values else 0
+        return forecast_value, f"AI forecast {reason}; last value used", 'fallback'
+
+    def make_batches(
+        self,
+        rows: pd.DataFrame,
+        token_budget: Optional[int] = None,
+        stats: Optional[pd.DataFrame] = None,
+    ) -> List[List[Tuple[Any, str, list, str]]]:
+        """
+        Groups categories into batches that fit a token budget
+
+        Each category costs its compact history line plus the expected
+        output per category; names are unique within a batch.
+
+        Args:
+            rows: Wide-table rows to forecast
+            token_budget: Tokens per request (config.FORECAST_BATCH_TOKEN_BUDGET if None)
+            stats: Precomputed analyze_matrix() of the rows
+
+        Returns:
+            List of batches of (index, category, values, line)
+        """
+        budget = token_budget or config.FORECAST_BATCH_TOKEN_BUDGET
+        overhead = count_tokens(self.batch_agent.instructions)
+
+        batches, current, names, used = [], [], set(), overhead
+        for index, row in rows.iterrows():
+            category = str(row['category'])
+            values = [v for k, v in row.items() if k != 'category']
+            line = compact_history(category, values, None if stats is None else stats.loc[index])
+            cost = count_tokens(line) + config.FORECAST_BATCH_OUTPUT_TOKENS
+
+            if current and (used + cost > budget or category in names):
+                batches.append(current)
+                current, names, used = [], set(), overhead
+            current.append((index, category, values, line))
+            names.add(category)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _forecast_batch(
+        self,
+        batch: List[Tuple[Any, str, list, str]],
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float] = None,
+    ) -> Dict[Any, Tuple[float, str, str]]:
+        """
+        Forecasts a batch of categories in one request
+
+        When the call fails or the output omits categories, the missing
+        categories are split in two halves and retried; a single category
+        that still fails gets its last value.
+
+        Returns:
+            {row index: (forecast amount, justification, source)}
+        """
+        message = "Categories:\n" + "\n".join(line for _, _, _, line in batch)
+
+        async with semaphore:
+            try:
+                result = await run_agent(
+                    self.batch_agent, message, trace_name="make_forecast_batch", priority=PRIORITY_BULK,
+                    deadline=timeout or config.FORECAST_CALL_TIMEOUT,
+                )
+                returned = {
+                    item.category.strip(): item for item in result.final_output.forecasts
+                }
+                reason = "omitted from batch output"
+            except CircuitOpenError:
+                return {index: (*baseline_fallback(values), 'circuit_open') for index, _, values, _ in batch}
+            except asyncio.TimeoutError:
+                returned, reason = {}, "timed out"
+            except Exception as e:
+                returned, reason = {}, f"failed ({type(e).__name__})"
+
+        output, missing = {}, []
+        for item in batch:
+            index, category = item[0], item[1]
+            if category in returned:
+                output[index] = (float(returned[category].amount), returned[category].justification, 'llm')
+            else:
+                missing.append(item)
+
+        if len(missing) == 1 and len(batch) == 1:
+            index, _, values, _ = missing[0]
+            output[index] = (values[-1] if values else 0, f"AI forecast {reason}; last value used", 'fallback')
+        elif missing:
+            half = (len(missing) + 1) // 2
+            parts = [missing[:half], missing[half:]] if len(missing) > 1 else [missing]
+            for part in await asyncio.gather(*[
+                self._forecast_batch(p, semaphore, timeout) for p in parts
+            ]):
+                output.update(part)
+        return output
+
+    async def stream_cashflow_forecast(
+        self,
+        df: pd.DataFrame,
+        triage: bool = False,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        batch: bool = False,
+    ) -> AsyncIterator[ForecastUpdate]:
+        """
+        Yields each category's forecast as soon as it is ready
+
+        Baseline categories (with triage) come first, then LLM results in
+        completion order. Closing the generator cancels the calls still
+        in flight.
+
+        Args:
+            df: Wide table (category + monthly values)
+            triage, max_concurrency, timeout, batch: See build_cashflow_forecast()
+        """
+        total, done = len(df), 0
+        # One vectorized pass feeds both triage and the prompts
+        stats = history_stats(df)
+
+        rows = df
+        if triage:
+            routing = triage_categories(df, stats=stats)
+            for index, route in routing[routing['route'] == 'baseline'].iterrows():
+                done += 1
+                yield ForecastUpdate(
+                    index, route['category'], route['forecast'], baseline_justification(route),
+                    'baseline', done, total,
+                )
+            rows = df.loc[routing['route'] == 'llm']
+
+        semaphore = asyncio.Semaphore(max_concurrency or config.FORECAST_MAX_CONCURRENCY)
+        if batch:
+            calls = [self._forecast_batch(b, semaphore, timeout) for b in self.make_batches(rows, stats=stats)]
+        else:
+            calls = [
+                self._forecast_one(index, row, semaphore, timeout, stats.loc[index])
+                for index, row in rows.iterrows()
+            ]
+
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for index, (forecast_value, comment, source) in (await finished).items():
+                    done += 1
+                    yield ForecastUpdate(
+                        index, rows.at[index, 'category'], forecast_value, comment, source, done, total,
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _forecast_one(
+        self,
+        index: Any,
+        row: pd.Series,
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float] = None,
+        stats: Optional[pd.Series] = None,
+    ) -> Dict[Any, Tuple[float, str, str]]:
+        """_forecast_category() keyed by row index, like _forecast_batch()"""
+        return {index: await self._forecast_category(row, semaphore, timeout, stats)}
+
+    async def build_cashflow_forecast(
+        self,
+        df: pd.DataFrame,
+        last_period:  Any,
+        triage: bool = False,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        batch: bool = False,
+        on_result: Optional[Callable[[ForecastUpdate], Any]] = None,
+    ) -> pd.DataFrame:
         """
         Generates forecast for next month across all categories
 
+        Categories are forecast concurrently (at most `max_concurrency`
+        LLM calls in flight); a category whose call fails or times out
+        gets its last value.
+
         Args:
             df: DataFrame with data (category, month, amount)
             last_period: last month
+            triage: If True, only categories the statistical baseline can't
+                handle are sent to the LLM (see ai_agents.triage)
+            max_concurrency: Parallel LLM calls (config.FORECAST_MAX_CONCURRENCY if None)
+            timeout: Seconds per LLM call (config.FORECAST_CALL_TIMEOUT if None)
+            batch: If True, several categories share one request (sized to
+                config.FORECAST_BATCH_TOKEN_BUDGET)
+            on_result: Called with each ForecastUpdate as categories finish
 
         Returns:
             DataFrame with forecast:
@@ -63,77 +361,79 @@ class ForecastAgent:
         # df_filtered = df[['category'] + fitered_months]
 
         # Create a new column for forecasts
-        forecasts = []
-        comments = []
+        forecasts = {}
+        comments = {}
+        sources = {}
 
-        for index, row in df.iterrows():
-            category = row['category']
-            # Extract all numeric values (excluding category column)
-            values = [v for k, v in row.items() if k != 'category']
-            prepared_values = analyze_historical_data(values)
-
-            # Create a text message for the AI agent
-            message = f"""
-Category: {category}
-Historical values with analysis: {prepared_values}
-
-Based on this historical cash flow data, and additional statistical data 
-povieded from preliminary analysis, provide a numerical forecast for the next period.
-Return ONLY the number, without any currency symbols, text or explanation.
-"""
-
-            with trace("make_forecast"):
-                result = await Runner.run(
-                    self.agent,
-                    message
-                )
+        async for update in self.stream_cashflow_forecast(
+            df, triage=triage, max_concurrency=max_concurrency, timeout=timeout, batch=batch
+        ):
+            forecasts[update.index] = update.amount
+            comments[update.index] = update.justification
+            sources[update.index] = update.source
+            if on_result is not None:
+                on_result(update)
 
-            # Parse the result
-            try:
-                forecast_value = float(result.final_output.amount.strip())
-            except (ValueError, AttributeError):
-                # If parsing fails, use the last value as fallback
-                forecast_value = values[-1] if values else 0
+        # Add forecast column to dataframe (aligned on the row index)
+        if triage:
+            df['forecast_source'] = pd.Series(sources)
+        df['ai_forecast'] = pd.Series(forecasts)
+        df['ai_comments'] = pd.Series(comments)
 
-            forecasts.append(forecast_value)
-            comments.append(result.final_output.justification)
+        return df
 
-        # Add forecast column to dataframe
-        df['ai_forecast'] = forecasts
-        df['ai_comments'] = comments
 
-        return df
+def get_forecast_agent() -> ForecastAgent:
+    """Shared ForecastAgent instance"""
+    return shared_instance(ForecastAgent)
 
 
 # Standalone function for easy import from app.py
-def build_cashflow_forecast(df: pd.DataFrame, last_period: Any) -> pd.DataFrame:
+def build_cashflow_forecast(df: pd.DataFrame, last_period: Any, triage: bool = False, batch: bool = False) -> pd.DataFrame:
     """
     Wrapper function to build cash flow forecast using ForecastAgent.
 
     Args:
         df: DataFrame with historical data
         last_period: Last period date
+        triage: Send only uncertain categories to the LLM
+        batch: Forecast several categories per LLM request
 
     Returns:
         DataFrame with forecast column populated
     """
-    import asyncio
+    return run_sync(get_forecast_agent().build_cashflow_forecast(df, last_period, triage=triage, batch=batch))
 
-    agent = ForecastAgent()
-
-    # Run async function in sync context
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
 
-    return loop.run_until_complete(agent.build_cashflow_forecast(df, last_period))
+def iter_cashflow_forecast(df: pd.DataFrame, triage: bool = False, batch: bool = False) -> Iterator[ForecastUpdate]:
+    """
+    Sync iterator over ForecastUpdates for progressive UIs.
 
-            
+    Runs on the shared agent loop; stopping early (break, close() or an
+    exception in the consumer) cancels the remaining LLM calls.
 
+    Args:
+        df: Wide table (category + monthly values)
+        triage: Send only uncertain categories to the LLM
+        batch: Forecast several categories per LLM request
+    """
+    updates: "queue.Queue" = queue.Queue()
+    finished = object()
 
+    async def pump() -> None:
+        try:
+            async for update in get_forecast_agent().stream_cashflow_forecast(df, triage=triage, batch=batch):
+                updates.put(update)
+        finally:
+            updates.put(finished)
 
-            
-        
-        
\ No newline at end of file
+    future = submit(pump())
+    try:
+        while True:
+            update = updates.get()
+            if update is finished:
+                break
+            yield update
+        future.result()
+    finally:
+        future.cancel()
@@ -1,6 +1,7 @@
+import warnings
 import pandas as pd 
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 
 def calculate_trend(values: List[float]) -> str:
     """
@@ -88,4 +89,190 @@ def analyze_historical_data(values: List[float]) -> Dict:
         'values': values
     }
 
-    return analysis
\ No newline at end of file
+    return analysis
+
+
+def classify_trend(avg_change: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_trend() labels
+
+    Args:
+        avg_change: Average month-over-month change in % per row
+        n: Number of observations per row
+
+    Returns:
+        Array of trend labels
+    """
+    labels = np.select(
+        [avg_change > 15, avg_change > 0, avg_change < 0],
+        ["significant growth", "moderate growth", "moderate decrease"],
+        default="significant decrease",
+    )
+    return np.where(n < 2, "insufficient data", labels)
+
+
+def classify_volatility(cv: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_volatility() labels
+
+    Args:
+        cv: Coefficient of variation in % per row
+        n: Number of observations per row
+
+    Returns:
+        Array of volatility labels
+    """
+    labels = np.select([cv > 20, cv > 10], ["high", "medium"], default="low")
+    return np.where(n < 2, "insufficient data", labels)
+
+
+def _theil_sen(y: np.ndarray, chunk: int = 2048) -> np.ndarray:
+    """Median of pairwise slopes per row (NaN-aware), computed in row chunks"""
+    t = y.shape[1]
+    i, j = np.triu_indices(t, k=1)
+    slopes = np.full(len(y), np.nan)
+    if len(i) == 0:
+        return slopes
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for start in range(0, len(y), chunk):
+            block = y[start:start + chunk]
+            slopes[start:start + chunk] = np.nanmedian((block[:, j] - block[:, i]) / (j - i), axis=1)
+    return slopes
+
+
+def _autocorrelation(deviations: np.ndarray, lag: int) -> np.ndarray:
+    """Autocorrelation at `lag` from mean deviations (NaN = missing)"""
+    if deviations.shape[1] <= lag:
+        return np.full(len(deviations), np.nan)
+    a, b = deviations[:, lag:], deviations[:, :-lag]
+    both = ~np.isnan(a) & ~np.isnan(b)
+    numerator = np.where(both, a * b, 0).sum(axis=1)
+    denominator = np.nansum(deviations ** 2, axis=1)
+    ok = (denominator > 0) & both.any(axis=1)
+    return np.where(ok, numerator / np.where(ok, denominator, 1), np.nan)
+
+
+def outlier_mask(values: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+    Flags outliers by the robust (median / MAD) z-score
+
+    Rows with zero MAD fall back to the mean absolute deviation; rows
+    without any spread have no outliers.
+
+    Args:
+        values: Matrix (categories x months), NaN = missing
+        threshold: Robust z-score above which a point is an outlier
+
+    Returns:
+        Boolean matrix of the same shape
+    """
+    y = np.asarray(values, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(y, axis=1, keepdims=True)
+        deviation = np.abs(y - median)
+        scale = 1.4826 * np.nanmedian(deviation, axis=1, keepdims=True)
+        fallback = 1.2533 * np.nanmean(deviation, axis=1, keepdims=True)
+    scale = np.where(scale > 0, scale, fallback)
+    scale = np.where(np.isnan(scale), 0, scale)
+    z = np.where(scale > 0, deviation / np.where(scale > 0, scale, 1), 0)
+    return np.nan_to_num(z) > threshold
+
+
+def analyze_matrix(
+    values: np.ndarray,
+    season_length: int = 12,
+    index: Optional[Sequence] = None,
+) -> pd.DataFrame:
+    """
+    All historical statistics for every category in one pass
+
+    NaN entries are missing months and are skipped, as in the per-series
+    functions (month-over-month changes are taken between consecutive
+    observed values; changes from 0 are ignored).
+
+    Args:
+        values: Matrix (categories x months, old to new)
+        season_length: Months per seasonal cycle
+        index: Index of the result (e.g. the wide table's index)
+
+    Returns:
+        DataFrame with one row per category:
+        n, mean, std, min, max, last, avg_change_pct, trend, cv,
+        volatility, slope (Theil-Sen, per month), seasonality_strength
+        (0-1, NaN under two cycles), acf_1, acf_season, outliers,
+        last_is_outlier
+    """
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[None, :]
+    rows, t = y.shape
+    valid = ~np.isnan(y)
+    n = valid.sum(axis=1)
+    has_data = n > 0
+    safe_n = np.maximum(n, 1)
+
+    mean = np.where(has_data, np.where(valid, y, 0).sum(axis=1) / safe_n, np.nan)
+    deviations = np.where(valid, y - mean[:, None], np.nan)
+    std = np.where(has_data, np.sqrt(np.nansum(deviations ** 2, axis=1) / safe_n), np.nan)
+    minimum = np.where(has_data, np.where(valid, y, np.inf).min(axis=1, initial=np.inf), np.nan)
+    maximum = np.where(has_data, np.where(valid, y, -np.inf).max(axis=1, initial=-np.inf), np.nan)
+    last_pos = t - 1 - np.argmax(valid[:, ::-1], axis=1) if t else np.zeros(rows, dtype=int)
+    last = np.where(has_data, y[np.arange(rows), last_pos] if t else np.nan, np.nan)
+
+    # Month-over-month change against the previous observed value
+    positions = np.where(valid, np.arange(t), -1)
+    seen = np.maximum.accumulate(positions, axis=1) if t else positions
+    previous = np.full_like(seen, -1)
+    previous[:, 1:] = seen[:, :-1]
+    prev_values = np.take_along_axis(y, np.maximum(previous, 0), axis=1)
+    pairs = valid & (previous >= 0) & (prev_values != 0)
+    changes = np.where(pairs, (y - prev_values) / np.where(pairs, np.abs(prev_values), 1) * 100, 0)
+    pair_count = pairs.sum(axis=1)
+    avg_change = np.where(pair_count > 0, changes.sum(axis=1) / np.maximum(pair_count, 1), 0.0)
+
+    cv = np.where(has_data & (mean != 0), std / np.where(mean != 0, np.abs(mean), 1) * 100, 0.0)
+
+    # Robust trend line, then seasonal means of the detrended series
+    slope = _theil_sen(y)
+    steps = np.arange(t)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        intercept = np.nanmedian(y - np.nan_to_num(slope)[:, None] * steps, axis=1)
+        detrended = y - intercept[:, None] - np.nan_to_num(slope)[:, None] * steps
+        cycles = -(-t // season_length) if t else 0
+        padded = np.full((rows, cycles * season_length), np.nan)
+        padded[:, :t] = detrended
+        seasonal = np.nanmean(padded.reshape(rows, cycles, season_length), axis=1)
+        seasonal -= np.nanmean(seasonal, axis=1, keepdims=True)
+        remainder = detrended - np.tile(seasonal, cycles)[:, :t]
+        total_var = np.nanvar(detrended, axis=1)
+        strength = np.where(
+            total_var > 0,
+            1 - np.nanvar(remainder, axis=1) / np.where(total_var > 0, total_var, 1),
+            0.0,
+        )
+    strength = np.where(n >= 2 * season_length, np.clip(strength, 0, 1), np.nan)
+
+    outliers = outlier_mask(y)
+    last_outlier = outliers[np.arange(rows), last_pos] & has_data if t else np.zeros(rows, dtype=bool)
+
+    return pd.DataFrame({
+        'n': n,
+        'mean': mean,
+        'std': std,
+        'min': minimum,
+        'max': maximum,
+        'last': last,
+        'avg_change_pct': avg_change,
+        'trend': classify_trend(avg_change, n),
+        'cv': cv,
+        'volatility': classify_volatility(cv, n),
+        'slope': slope,
+        'seasonality_strength': strength,
+        'acf_1': _autocorrelation(deviations, 1),
+        'acf_season': _autocorrelation(deviations, season_length),
+        'outliers': outliers.sum(axis=1),
+        'last_is_outlier': last_outlier,
+    }, index=index)
@@ -0,0 +1,191 @@
+"""
+Durable bulk AI forecast jobs.
+
+A job stores its work queue (one item per entity x category) in the
+database. run_forecast_job() forecasts the queue chunk by chunk with
+ForecastAgent.stream_cashflow_forecast() and writes results back in bulk
+checkpoints while the calls are running, so a crashed or cancelled run
+loses at most the last unwritten checkpoint. Running the job again
+resumes from the remaining items: completed items are never forecast
+twice, and items whose call failed are retried, after a backoff, up to
+FORECAST_JOB_MAX_ATTEMPTS times. While the AI circuit breaker is open
+the run pauses without using up attempts.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+import config
+from core.db import (
+    create_forecast_job,
+    get_forecast_job,
+    get_forecast_job_items,
+    get_pending_job_items,
+    save_forecast_job_results,
+    requeue_failed_job_items,
+    set_forecast_job_status,
+)
+from .event_loop import run_sync
+from .forecast_agent import get_forecast_agent
+from .resilience import backoff_delay
+
+
+def submit_forecast_job(
+    df: pd.DataFrame,
+    description: Optional[str] = None,
+    entity_column: str = "entity",
+    triage: bool = False,
+    batch: bool = False,
+) -> int:
+    """
+    Queues a wide table for bulk forecasting.
+
+    Args:
+        df: Wide table: category, optional entity column and monthly values
+        description: Job description
+        entity_column: Column naming the entity (ignored if absent)
+        triage, batch: See ForecastAgent.build_cashflow_forecast(); kept
+            with the job so a resumed run uses the same settings
+
+    Returns:
+        ID of the created job
+    """
+    has_entity = entity_column in df.columns
+    history = df.drop(columns=['category'] + ([entity_column] if has_entity else []))
+    history = history.apply(pd.to_numeric, errors='coerce')
+    entities = df[entity_column].astype(str).tolist() if has_entity else [None] * len(df)
+
+    items = [
+        {
+            'item_key': f"{entity}|{category}" if entity is not None else str(category),
+            'entity': entity,
+            'category': str(category),
+            'history': [None if pd.isna(v) else float(v) for v in values],
+        }
+        for entity, category, values in zip(entities, df['category'], history.itertuples(index=False))
+    ]
+    options = {'columns': [str(c) for c in history.columns], 'triage': triage, 'batch': batch}
+    return create_forecast_job(items, options, description)
+
+
+def _chunk_frame(items: List[Dict], columns: List[str]) -> pd.DataFrame:
+    """Wide table of queue items indexed by item id (entity-qualified category names)."""
+    df = pd.DataFrame([item['history'] for item in items], columns=columns, index=[item['id'] for item in items])
+    df.insert(0, 'category', [
+        f"{item['entity']} / {item['category']}" if item['entity'] is not None else item['category']
+        for item in items
+    ])
+    return df
+
+
+async def run_forecast_job(
+    job_id: int,
+    chunk_size: Optional[int] = None,
+    checkpoint_items: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    max_chunks: Optional[int] = None,
+) -> Dict:
+    """
+    Forecasts a job's remaining items (starts or resumes the job).
+
+    The job ends "completed", or "completed_with_errors" when items still
+    failed after FORECAST_JOB_MAX_ATTEMPTS attempts; running such a job
+    again retries those items. When the AI circuit breaker opens, the run
+    stops with the job "paused" and the unfinished items keep their
+    attempts, so a later run resumes them.
+
+    Args:
+        job_id: Job ID from submit_forecast_job()
+        chunk_size: Items loaded per step (config.FORECAST_JOB_CHUNK_SIZE if None)
+        checkpoint_items: Results per bulk write (config.FORECAST_JOB_CHECKPOINT_ITEMS if None)
+        max_concurrency: Concurrent LLM calls (config.FORECAST_MAX_CONCURRENCY if None)
+        max_chunks: Stop after this many chunks, leaving the job resumable
+
+    Returns:
+        Job dictionary (see core.db.get_forecast_job()) after the run
+
+    Raises:
+        ValueError: If the job doesn't exist
+    """
+    job = get_forecast_job(job_id)
+    if job is None:
+        raise ValueError(f"Unknown forecast job: {job_id}")
+    if job['status'] in ("completed", "cancelled"):
+        return job
+    if job['status'] == "completed_with_errors":
+        await asyncio.to_thread(requeue_failed_job_items, job_id)
+
+    chunk_size = chunk_size or config.FORECAST_JOB_CHUNK_SIZE
+    checkpoint_items = checkpoint_items or config.FORECAST_JOB_CHECKPOINT_ITEMS
+    options = job['options']
+    agent = get_forecast_agent()
+    set_forecast_job_status(job_id, "running")
+
+    chunks, failed, circuit_open = 0, set(), False
+    while not circuit_open and (max_chunks is None or chunks < max_chunks):
+        items = await asyncio.to_thread(
+            get_pending_job_items, job_id, chunk_size, config.FORECAST_JOB_MAX_ATTEMPTS
+        )
+        if not items:
+            progress = get_forecast_job(job_id)
+            set_forecast_job_status(job_id, "completed_with_errors" if progress['failed_items'] else "completed")
+            break
+        chunks += 1
+        attempts = {item['id']: item['attempts'] + 1 for item in items}
+
+        retries = [item['attempts'] for item in items if item['id'] in failed]
+        if retries:
+            # Give a struggling provider time before retrying this run's failures
+            await asyncio.sleep(backoff_delay(
+                max(retries) - 1, config.FORECAST_JOB_RETRY_BASE_DELAY, config.FORECAST_JOB_RETRY_MAX_DELAY
+            ))
+
+        buffer: List[Dict[str, Any]] = []
+        stream = agent.stream_cashflow_forecast(
+            _chunk_frame(items, options['columns']),
+            triage=options.get('triage', False),
+            max_concurrency=max_concurrency,
+            batch=options.get('batch', False),
+        )
+        try:
+            async for update in stream:
+                if update.source == "circuit_open":
+                    # Provider outage: stop without using up the items' attempts
+                    circuit_open = True
+                    break
+                if update.source == "fallback":
+                    failed.add(update.index)
+                buffer.append({
+                    'id': update.index,
+                    'status': "failed" if update.source == "fallback" else "done",
+                    'attempts': attempts[update.index],
+                    'forecast_amount': float(update.amount),
+                    'justification': update.justification,
+                    'source': update.source,
+                })
+                if len(buffer) >= checkpoint_items:
+                    # Written off the loop so the calls in flight keep running
+                    await asyncio.to_thread(save_forecast_job_results, job_id, buffer)
+                    buffer = []
+        finally:
+            await stream.aclose()
+        await asyncio.to_thread(save_forecast_job_results, job_id, buffer)
+
+    if circuit_open:
+        set_forecast_job_status(job_id, "paused")
+    return get_forecast_job(job_id)
+
+
+def run_forecast_job_sync(job_id: int, **kwargs: Any) -> Dict:
+    """Synchronous wrapper for run_forecast_job()."""
+    return run_sync(run_forecast_job(job_id, **kwargs))
+
+
+def forecast_job_results(job_id: int) -> pd.DataFrame:
+    """Items of a job with status, attempts, forecast and justification."""
+    return pd.DataFrame(
+        get_forecast_job_items(job_id),
+        columns=['entity', 'category', 'status', 'attempts', 'forecast_amount', 'justification', 'source'],
+    )
@@ -0,0 +1,344 @@
+"""
+Dependency-graph orchestration of the analysis pipeline.
+
+A Pipeline declares nodes (agents and deterministic forecast steps) with
+their dependencies. run() starts every node as soon as its dependencies
+are done, so independent branches run concurrently and a full analysis
+costs its critical path instead of the sum of its steps. Node outputs
+are passed downstream by name, cached by a fingerprint of the node's
+inputs, and each run reports a per-node timing breakdown.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pydantic import BaseModel
+
+import config
+from drivers.models import ForecastDrivers
+from forecasting.driver_based import DriverBasedForecaster
+from .driver_agent import DriverAnalysisResponse, get_driver_agent
+from .event_loop import run_sync, shared_instance
+from .explainer_agent import ForecastExplanation, get_explainer_agent
+from .scenario_agent import ScenarioAnalysisResponse, evaluate_suggestions, get_scenario_agent
+from .tools import ForecastToolContext
+
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of node inputs (DataFrames, pydantic models, JSON-like values)."""
+    digest = hashlib.sha1()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+    elif isinstance(value, BaseModel):
+        digest.update(type(value).__name__.encode())
+        digest.update(value.model_dump_json().encode())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(f"{key}={fingerprint(value[key])};".encode())
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            digest.update(f"{fingerprint(item)},".encode())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=repr).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class Node:
+    """One pipeline step: func(**dependency outputs, **inputs) -> output."""
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    output_type: Optional[type] = None
+    cache: bool = True
+
+
+@dataclass
+class PipelineResult:
+    """Outputs, errors and timings of one pipeline run."""
+    outputs: Dict[str, Any]
+    errors: Dict[str, str]
+    timings: pd.DataFrame
+    wall_ms: float
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_ms: float = 0.0
+
+    @property
+    def sum_ms(self) -> float:
+        """Time the nodes would take one after another."""
+        return float(self.timings["duration_ms"].sum()) if not self.timings.empty else 0.0
+
+
+class Pipeline:
+    """Dependency graph of nodes with concurrent execution and a result cache."""
+
+    def __init__(self, cache_size: int = 128):
+        self.nodes: Dict[str, Node] = {}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        deps: Sequence[str] = (),
+        inputs: Sequence[str] = (),
+        output_type: Optional[type] = None,
+        cache: bool = True,
+    ) -> "Pipeline":
+        """
+        Declares a node; dependencies must already be declared.
+
+        Args:
+            name: Node name (its output is passed downstream under this name)
+            func: Sync or async callable taking the dependencies' outputs and
+                the declared inputs as keyword arguments
+            deps: Upstream node names
+            inputs: Names of run() inputs the node uses
+            output_type: Expected output type (checked after each run)
+            cache: Reuse the output while the node's inputs are unchanged
+
+        Raises:
+            ValueError: For a duplicate node or an unknown dependency
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node: {name}")
+        missing = [d for d in deps if d not in self.nodes]
+        if missing:
+            raise ValueError(f"Node {name} depends on undeclared nodes: {missing}")
+        self.nodes[name] = Node(name, func, tuple(deps), tuple(inputs), output_type, cache)
+        return self
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return True, self._cache[key]
+        return False, None
+
+    def _cache_set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def run(self, inputs: Dict[str, Any], targets: Optional[Sequence[str]] = None) -> PipelineResult:
+        """
+        Runs the pipeline (or the nodes `targets` need).
+
+        A failing node is reported in `errors`; nodes downstream of it are
+        skipped while independent branches still complete.
+        """
+        selected = self._closure(targets) if targets else list(self.nodes)
+        start = time.perf_counter()
+        done: Dict[str, asyncio.Future] = {name: asyncio.get_running_loop().create_future() for name in selected}
+        outputs: Dict[str, Any] = {}
+        fingerprints: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        rows: List[Dict[str, Any]] = []
+
+        async def run_node(node: Node) -> None:
+            try:
+                await asyncio.gather(*(done[d] for d in node.deps))
+                failed = [d for d in node.deps if d in errors]
+                if failed:
+                    errors[node.name] = f"skipped: {', '.join(failed)} failed"
+                    return
+
+                kwargs = {d: outputs[d] for d in node.deps}
+                kwargs.update({name: inputs.get(name) for name in node.inputs})
+                key = fingerprint([node.name, [fingerprints[d] for d in node.deps],
+                                   {name: inputs.get(name) for name in node.inputs}])
+                fingerprints[node.name] = key
+
+                node_start = time.perf_counter()
+                hit, value = self._cache_get(key) if node.cache else (False, None)
+                if not hit:
+                    if asyncio.iscoroutinefunction(node.func):
+                        value = await node.func(**kwargs)
+                    else:
+                        value = await asyncio.to_thread(node.func, **kwargs)
+                    if node.output_type is not None and not isinstance(value, node.output_type):
+                        raise TypeError(
+                            f"{node.name} returned {type(value).__name__}, "
+                            f"expected {node.output_type.__name__}"
+                        )
+                    if node.cache:
+                        self._cache_set(key, value)
+                outputs[node.name] = value
+                rows.append({
+                    "node": node.name,
+                    "start_ms": (node_start - start) * 1000,
+                    "duration_ms": (time.perf_counter() - node_start) * 1000,
+                    "cached": hit,
+                })
+            except Exception as e:
+                errors[node.name] = f"{type(e).__name__}: {e}"
+            finally:
+                done[node.name].set_result(None)
+
+        await asyncio.gather(*(run_node(self.nodes[name]) for name in selected))
+
+        timings = pd.DataFrame(rows, columns=["node", "start_ms", "duration_ms", "cached"])
+        timings = timings.sort_values("start_ms").reset_index(drop=True)
+        path, path_ms = self._critical_path(timings)
+        return PipelineResult(
+            outputs=outputs,
+            errors=errors,
+            timings=timings,
+            wall_ms=(time.perf_counter() - start) * 1000,
+            critical_path=path,
+            critical_path_ms=path_ms,
+        )
+
+    def _closure(self, targets: Sequence[str]) -> List[str]:
+        """Targets and all their upstream nodes, in declaration order."""
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.nodes:
+                raise ValueError(f"Unknown node: {name}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.nodes[name].deps)
+        return [name for name in self.nodes if name in needed]
+
+    def _critical_path(self, timings: pd.DataFrame) -> Tuple[List[str], float]:
+        """Longest chain of node durations through the graph."""
+        duration = dict(zip(timings["node"], timings["duration_ms"]))
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        for name, node in self.nodes.items():   # declaration order is topological
+            if name not in duration:
+                continue
+            upstream = max((best[d] for d in node.deps if d in best), default=(0.0, []), key=lambda b: b[0])
+            best[name] = (upstream[0] + duration[name], upstream[1] + [name])
+        if not best:
+            return [], 0.0
+        total, path = max(best.values(), key=lambda b: b[0])
+        return path, total
+
+
+# === Full analysis pipeline ===
+
+def _monthly_history(df_history: pd.DataFrame) -> pd.DataFrame:
+    monthly = df_history.groupby(df_history['date'].dt.to_period('M'))['amount'].sum().reset_index()
+    monthly.columns = ['period', 'revenue']
+    monthly['revenue'] = monthly['revenue'].astype(float)
+    return monthly
+
+
+def _driver_forecast(history: pd.DataFrame, drivers: ForecastDrivers, periods: Optional[int]) -> pd.DataFrame:
+    return DriverBasedForecaster(drivers).generate_forecast(
+        history, periods or config.DEFAULT_FORECAST_PERIODS
+    )
+
+
+def _working_capital(drivers: ForecastDrivers) -> dict:
+    wc = drivers.working_capital
+    return {'dso_days': wc.dso_days, 'dpo_days': wc.dpo_days, 'dio_days': wc.dio_days}
+
+
+def _history_summary(history: pd.DataFrame) -> dict:
+    return {
+        'months_analyzed': len(history),
+        'last_month_revenue': float(history['revenue'].iloc[-1]),
+        'avg_monthly_revenue': float(history['revenue'].mean()),
+    }
+
+
+async def _driver_analysis(history: pd.DataFrame, drivers: ForecastDrivers, industry: str) -> DriverAnalysisResponse:
+    return await get_driver_agent().analyze_drivers(
+        _working_capital(drivers), industry,
+        forecast_context=ForecastToolContext.from_history(drivers, history),
+    )
+
+
+async def _scenario_suggestions(history: pd.DataFrame, drivers: ForecastDrivers, industry: str) -> ScenarioAnalysisResponse:
+    return await get_scenario_agent().suggest_scenarios(
+        _working_capital(drivers), industry, _history_summary(history),
+        forecast_context=ForecastToolContext.from_history(drivers, history),
+    )
+
+
+def _scenario_evaluation(
+    scenario_suggestions: ScenarioAnalysisResponse,
+    history: pd.DataFrame,
+    drivers: ForecastDrivers,
+    periods: Optional[int],
+) -> tuple:
+    return evaluate_suggestions(
+        scenario_suggestions, drivers, history, periods=periods or config.DEFAULT_FORECAST_PERIODS
+    )
+
+
+async def _explanation(forecast: pd.DataFrame, history: pd.DataFrame, drivers: ForecastDrivers) -> ForecastExplanation:
+    forecast_data = {
+        'periods': len(forecast),
+        'total_revenue': float(forecast['revenue'].sum()),
+        'total_operating_cashflow': float(forecast['operating_cashflow'].sum()),
+        'total_free_cashflow': float(forecast['free_cashflow'].sum()),
+        'monthly_free_cashflow': forecast['free_cashflow'].tolist(),
+        'ccc_days': float(forecast['ccc_days'].iloc[0]),
+    }
+    return await get_explainer_agent().explain_forecast(
+        forecast_data, _working_capital(drivers), _history_summary(history)
+    )
+
+
+class AnalysisPipeline(Pipeline):
+    """
+    Full analysis: history -> driver forecast -> explanation, with driver
+    analysis and scenario suggestions (-> evaluation) in parallel.
+
+    Inputs: df_history (category, date, amount), drivers (ForecastDrivers),
+    industry (str), periods (int or None).
+    """
+
+    def __init__(self, cache_size: int = 128):
+        super().__init__(cache_size)
+        self.add("history", _monthly_history, inputs=("df_history",), output_type=pd.DataFrame)
+        self.add("forecast", _driver_forecast, deps=("history",), inputs=("drivers", "periods"),
+                 output_type=pd.DataFrame)
+        self.add("driver_analysis", _driver_analysis, deps=("history",), inputs=("drivers", "industry"),
+                 output_type=DriverAnalysisResponse)
+        self.add("scenario_suggestions", _scenario_suggestions, deps=("history",), inputs=("drivers", "industry"),
+                 output_type=ScenarioAnalysisResponse)
+        self.add("scenario_evaluation", _scenario_evaluation, deps=("scenario_suggestions", "history"),
+                 inputs=("drivers", "periods"), output_type=tuple)
+        self.add("explanation", _explanation, deps=("forecast", "history"), inputs=("drivers",),
+                 output_type=ForecastExplanation)
+
+
+def get_analysis_pipeline() -> AnalysisPipeline:
+    """Shared AnalysisPipeline (its node cache is shared across sessions)."""
+    return shared_instance(AnalysisPipeline)
+
+
+def run_full_analysis_sync(
+    df_history: pd.DataFrame,
+    drivers: ForecastDrivers,
+    industry: str,
+    periods: Optional[int] = None,
+) -> PipelineResult:
+    """Synchronous wrapper for the full analysis pipeline."""
+    return run_sync(get_analysis_pipeline().run({
+        "df_history": df_history,
+        "drivers": drivers,
+        "industry": industry,
+        "periods": periods,
+    }))
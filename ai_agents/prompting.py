@@ -0,0 +1,272 @@
+"""
+Prompt building and token accounting for AI agents.
+
+Payloads are serialized as compact, rounded, fixed-schema JSON; long
+series are replaced by a stats digest plus the most recent points.
+Every prompt is checked against its agent's token budget, and each
+agent call records prompt tokens, tokens saved versus the verbose
+payload, and latency.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import config
+from .forecast_analyzer import analyze_matrix
+
+
+class PromptBudgetError(ValueError):
+    """Raised when a prompt cannot be shrunk to its agent's token budget."""
+
+
+@lru_cache(maxsize=None)
+def _encoder(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Encodings are downloaded on first use; offline we fall back to the estimate
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count with tiktoken when installed, else ~4 characters per token."""
+    encoder = _encoder(model or config.FORECAST_MODEL)
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text))
+
+
+def compact_value(value: Any) -> Any:
+    """Rounds numbers (integers above 100, 2 decimals below) and converts numpy types."""
+    if isinstance(value, dict):
+        return {str(k): compact_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series)):
+        return [compact_value(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return int(round(value)) if abs(value) >= 100 else round(value, 2)
+    return value
+
+
+def _plain(value: Any) -> Any:
+    """json.dumps fallback for numpy scalars/arrays and other objects."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def compact_json(payload: Any) -> str:
+    """Compact JSON of a payload after compact_value()."""
+    return json.dumps(compact_value(payload), ensure_ascii=False, separators=(",", ":"))
+
+
+def series_digest(
+    values: List[float],
+    max_points: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Fixed-schema summary of a series for prompts.
+
+    Args:
+        values: Historical values (old to new); NaN entries are skipped
+        max_points: Most recent points kept verbatim (config.PROMPT_MAX_POINTS if None)
+        stats: The series' row of forecast_analyzer.analyze_matrix(), if
+            already computed (skips recomputing the statistics)
+
+    Returns:
+        {n, trend, volatility, mean, std, min, max, last, recent}
+    """
+    max_points = max_points or config.PROMPT_MAX_POINTS
+    clean = [float(v) for v in values if v is not None and not pd.isna(v)]
+    if not clean:
+        return {"n": 0, "recent": []}
+    if stats is None:
+        stats = analyze_matrix(np.asarray([clean])).iloc[0]
+    return {
+        "n": int(stats["n"]),
+        "trend": stats["trend"],
+        "volatility": stats["volatility"],
+        "mean": stats["mean"],
+        "std": stats["std"],
+        "min": stats["min"],
+        "max": stats["max"],
+        "last": stats["last"],
+        "recent": clean[-max_points:],
+    }
+
+
+def _shrink(payload: Any) -> Any:
+    """Halves every list in a payload, keeping the most recent items."""
+    if isinstance(payload, dict):
+        return {k: _shrink(v) for k, v in payload.items()}
+    if isinstance(payload, list) and len(payload) > 1:
+        return [_shrink(v) for v in payload[-(len(payload) // 2):]]
+    return payload
+
+
+def _lists_shrinkable(payload: Any) -> bool:
+    if isinstance(payload, dict):
+        return any(_lists_shrinkable(v) for v in payload.values())
+    return isinstance(payload, list) and (len(payload) > 1 or any(_lists_shrinkable(v) for v in payload))
+
+
+class PromptBuilder:
+    """Builds agent messages from compact sections within a token budget."""
+
+    def __init__(self, agent_name: str, budget: Optional[int] = None, model: Optional[str] = None):
+        """
+        Args:
+            agent_name: Key in config.PROMPT_TOKEN_BUDGETS
+            budget: Token budget for the message (overrides config)
+            model: Model used for token counting
+        """
+        self.agent_name = agent_name
+        self.budget = budget or config.PROMPT_TOKEN_BUDGETS.get(agent_name, 2000)
+        self.model = model
+
+    def build(
+        self,
+        header: str,
+        sections: Dict[str, Any],
+        footer: str = "",
+        shrinkable: Optional[Sequence[str]] = None,
+    ) -> str:
+        """
+        Renders `header`, one `NAME: <compact json>` line per section and `footer`.
+
+        Lists inside the shrinkable sections are halved (keeping recent
+        items) until the message fits the budget, and a note naming the
+        truncated sections is added. Other sections (drivers, seasonality
+        factors, forecast series) are always sent whole.
+
+        Args:
+            shrinkable: Sections that may be truncated (default: sections
+                whose name starts with "HISTOR", e.g. History, HISTORICAL CONTEXT)
+
+        Raises:
+            PromptBudgetError: If the message can't fit the budget
+        """
+        verbose = "\n".join(
+            [header]
+            + [f"{name}:\n{json.dumps(payload, ensure_ascii=False, indent=2, default=_plain)}"
+               for name, payload in sections.items()]
+            + [footer]
+        )
+        if shrinkable is None:
+            shrinkable = [name for name in sections if name.upper().startswith("HISTOR")]
+        sections = dict(sections)
+        truncated: List[str] = []
+
+        while True:
+            note = (
+                [f"NOTE: lists in {', '.join(truncated)} are truncated to their most recent items."]
+                if truncated else []
+            )
+            message = "\n".join(
+                [header.strip()]
+                + [f"{name}: {compact_json(payload)}" for name, payload in sections.items()]
+                + note
+                + [footer.strip()]
+            ).strip()
+            tokens = count_tokens(message, self.model)
+            if tokens <= self.budget:
+                break
+            candidates = [name for name in shrinkable if name in sections and _lists_shrinkable(sections[name])]
+            if not candidates:
+                raise PromptBudgetError(
+                    f"{self.agent_name} prompt needs {tokens} tokens, budget is {self.budget}"
+                )
+            for name in candidates:
+                sections[name] = _shrink(sections[name])
+                if name not in truncated:
+                    truncated.append(name)
+
+        _register_baseline(message, count_tokens(verbose, self.model))
+        return message
+
+
+@dataclass
+class PromptMetric:
+    """One agent call."""
+    agent: str
+    prompt_tokens: int
+    tokens_saved: int
+    latency_ms: float
+    cached: bool
+
+
+_metrics: "deque[PromptMetric]" = deque(maxlen=5000)
+_baselines: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _message_id(message: str) -> str:
+    return hashlib.sha1(message.encode()).hexdigest()
+
+
+def _register_baseline(message: str, verbose_tokens: int) -> None:
+    with _lock:
+        if len(_baselines) > 10000:
+            _baselines.clear()
+        _baselines[_message_id(message)] = verbose_tokens
+
+
+def record_call(agent: str, message: str, latency_ms: float, cached: bool = False) -> PromptMetric:
+    """Records prompt size, savings and latency of one agent call."""
+    tokens = count_tokens(message)
+    with _lock:
+        verbose = _baselines.pop(_message_id(message), tokens)
+        metric = PromptMetric(
+            agent=agent,
+            prompt_tokens=tokens,
+            tokens_saved=max(verbose - tokens, 0),
+            latency_ms=latency_ms,
+            cached=cached,
+        )
+        _metrics.append(metric)
+    return metric
+
+
+def get_prompt_metrics() -> pd.DataFrame:
+    """All recorded calls as a DataFrame."""
+    with _lock:
+        rows = [asdict(m) for m in _metrics]
+    return pd.DataFrame(rows, columns=["agent", "prompt_tokens", "tokens_saved", "latency_ms", "cached"])
+
+
+def summarize_prompt_metrics() -> pd.DataFrame:
+    """Per-agent calls, prompt tokens, tokens saved and mean/p95 latency."""
+    df = get_prompt_metrics()
+    if df.empty:
+        return pd.DataFrame(columns=["calls", "prompt_tokens", "tokens_saved", "latency_ms_mean", "latency_ms_p95"])
+    groups = df.groupby("agent")
+    return pd.DataFrame({
+        "calls": groups.size(),
+        "prompt_tokens": groups["prompt_tokens"].sum(),
+        "tokens_saved": groups["tokens_saved"].sum(),
+        "latency_ms_mean": groups["latency_ms"].mean(),
+        "latency_ms_p95": groups["latency_ms"].quantile(0.95),
+    })
@@ -0,0 +1,257 @@
+"""
+Deadlines, retries, hedging and circuit breaking for agent calls.
+
+resilient_call() wraps one LLM request:
+- the whole call (retries included) must finish within a deadline;
+- failed attempts are retried with jittered exponential backoff;
+- an attempt still running after the agent's p95 latency gets a
+  duplicate (hedge) request, and the first response wins;
+- repeated failures open a per-agent circuit breaker, so callers fail
+  fast (and fall back to statistical forecasts) while the provider is
+  degraded.
+Latencies are kept per agent for the hedge delay and exported as
+histograms for tuning.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Histogram bucket upper bounds (ms)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000, float("inf"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an agent's circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds) per agent."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """q-th percentile in seconds (None with fewer than `min_samples` samples)."""
+        with self._lock:
+            samples = np.asarray(self._samples.get(name, ()))
+        if samples.size < max(min_samples, 1):
+            return None
+        return float(np.percentile(samples, q))
+
+    def histograms(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> pd.DataFrame:
+        """Counts per agent and latency bucket: agent, le_ms, count."""
+        with self._lock:
+            samples = {name: np.asarray(s) * 1000 for name, s in self._samples.items()}
+        rows = []
+        for name, values in samples.items():
+            counts, _ = np.histogram(values, bins=[0.0, *buckets])
+            rows += [{"agent": name, "le_ms": le, "count": int(c)} for le, c in zip(buckets, counts)]
+        return pd.DataFrame(rows, columns=["agent", "le_ms", "count"])
+
+    def summary(self) -> pd.DataFrame:
+        """Per-agent calls and p50/p95/p99 latency (ms)."""
+        with self._lock:
+            samples = {name: np.asarray(s) * 1000 for name, s in self._samples.items()}
+        return pd.DataFrame(
+            [
+                {
+                    "agent": name,
+                    "calls": values.size,
+                    "p50_ms": float(np.percentile(values, 50)),
+                    "p95_ms": float(np.percentile(values, 95)),
+                    "p99_ms": float(np.percentile(values, 99)),
+                }
+                for name, values in samples.items() if values.size
+            ],
+            columns=["agent", "calls", "p50_ms", "p95_ms", "p99_ms"],
+        )
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open after `reset_seconds`, where one trial call decides
+    between closed (success) and open (failure).
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None):
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = config.CIRCUIT_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if now - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the trial slot when half-open)."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self) -> None:
+        """Frees the half-open trial slot without a verdict (e.g. the call was cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+_tracker = LatencyTracker()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide latency tracker."""
+    return _tracker
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Circuit breaker of an agent, created on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker()
+        return _breakers[name]
+
+
+def reset_breakers() -> None:
+    """Closes all circuit breakers."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    base = config.AGENT_RETRY_BASE_DELAY if base is None else base
+    cap = config.AGENT_RETRY_MAX_DELAY if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def _hedged(name: str, make_call: Callable[[], Awaitable[Any]], hedge_after: Optional[float]) -> Any:
+    """Runs make_call(); fires one duplicate after `hedge_after` seconds and keeps the first success."""
+    start = time.monotonic()
+    tasks = [asyncio.ensure_future(make_call())]
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                tasks.append(asyncio.ensure_future(make_call()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    _tracker.record(name, time.monotonic() - start)
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def resilient_call(
+    name: str,
+    make_call: Callable[[], Awaitable[Any]],
+    deadline: Optional[float] = None,
+    retries: Optional[int] = None,
+    hedge: Optional[bool] = None,
+) -> Any:
+    """
+    Runs an agent request with deadline, retries, hedging and circuit breaker.
+
+    Args:
+        name: Agent name (keys latencies and the circuit breaker)
+        make_call: Returns a new awaitable for one attempt
+        deadline: Seconds for the whole call (config.AGENT_CALL_DEADLINE if None)
+        retries: Retries after the first attempt (config.AGENT_MAX_RETRIES if None)
+        hedge: Fire a duplicate after the p95 latency (config.AGENT_HEDGE_ENABLED if None)
+
+    Raises:
+        CircuitOpenError: If the agent's breaker is open
+        asyncio.TimeoutError: If the deadline passes
+        Exception: The last attempt's error once retries are exhausted
+    """
+    deadline = deadline or config.AGENT_CALL_DEADLINE
+    retries = config.AGENT_MAX_RETRIES if retries is None else retries
+    hedge = config.AGENT_HEDGE_ENABLED if hedge is None else hedge
+
+    breaker = get_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{name}: circuit open after {breaker.failures} failures")
+
+    hedge_after = (
+        _tracker.percentile(name, config.AGENT_HEDGE_PERCENTILE, config.AGENT_HEDGE_MIN_SAMPLES)
+        if hedge else None
+    )
+    end = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        try:
+            result = await asyncio.wait_for(_hedged(name, make_call, hedge_after), end - time.monotonic())
+            breaker.record_success()
+            return result
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            # Includes the deadline's TimeoutError, which never has time left for a retry
+            delay = backoff_delay(attempt)
+            if attempt >= retries or time.monotonic() + delay >= end:
+                breaker.record_failure()
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def latency_histograms() -> pd.DataFrame:
+    """Agent call latency histograms (agent, le_ms, count) for tuning."""
+    return _tracker.histograms()
+
+
+def latency_summary() -> pd.DataFrame:
+    """Per-agent p50/p95/p99 call latency (ms)."""
+    return _tracker.summary()
@@ -0,0 +1,191 @@
+"""
+Single entry point for running agents.
+
+All agent calls go through run_agent(), so the backend can be swapped
+(e.g. for a local stub Runner in tests) with set_runner(), structured
+outputs are served from the shared response cache, uncached calls wait
+for the request scheduler and run with deadlines, retries, hedging and a
+circuit breaker, and every call is recorded in the prompt metrics and
+the call telemetry.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from agents import Runner, trace
+
+import config
+from .cache import cache_key, get_cache
+from .prompting import count_tokens, record_call
+from .resilience import CircuitOpenError, get_breaker, resilient_call
+from .scheduler import PRIORITY_INTERACTIVE, current_session, get_scheduler
+from .telemetry import CallRecord, call_cost, get_telemetry
+
+_runner: Any = Runner
+_cache_stub = False
+_schedule_stub = False
+_resilient_stub = False
+
+
+@dataclass
+class CachedResult:
+    """Runner-like result served from the response cache."""
+    final_output: Any
+    cached: bool = True
+
+
+def set_runner(
+    runner: Any,
+    use_cache: bool = False,
+    use_scheduler: bool = False,
+    use_resilience: bool = False,
+) -> Any:
+    """
+    Replaces the runner used by run_agent().
+
+    Args:
+        runner: Object with an async `run(agent, input)` method
+            (the openai-agents Runner by default)
+        use_cache: Whether calls to a replaced runner go through the
+            response cache (off by default so stubs see every call)
+        use_scheduler: Whether calls to a replaced runner are rate limited
+            by the request scheduler (off by default)
+        use_resilience: Whether calls to a replaced runner get deadlines,
+            retries, hedging and the circuit breaker (off by default)
+
+    Returns:
+        The previous runner, so it can be restored
+    """
+    global _runner, _cache_stub, _schedule_stub, _resilient_stub
+    previous, _runner = _runner, runner
+    _cache_stub = use_cache
+    _schedule_stub = use_scheduler
+    _resilient_stub = use_resilience
+    return previous
+
+
+def get_runner() -> Any:
+    """Returns the runner currently used by run_agent()."""
+    return _runner
+
+
+async def _run(
+    agent: Any,
+    message: str,
+    trace_name: Optional[str],
+    priority: int,
+    call: CallRecord,
+    deadline: Optional[float] = None,
+) -> Any:
+    scheduler = get_scheduler() if (_runner is Runner or _schedule_stub) else None
+
+    async def admit() -> None:
+        if scheduler is not None:
+            waited = await scheduler.acquire(count_tokens(message) + config.LLM_EXPECTED_OUTPUT_TOKENS, priority)
+            call.queue_ms += waited * 1000
+
+    async def attempt() -> Any:
+        call.attempts += 1
+        # The first attempt was admitted before the deadline started
+        if call.attempts > 1:
+            await admit()
+        return await _runner.run(agent, message)
+
+    async def run() -> Any:
+        resilient = _runner is Runner or _resilient_stub
+        name = getattr(agent, "name", "agent")
+        # Fail fast instead of queueing for a call the breaker will refuse
+        if resilient and get_breaker(name).state == "open":
+            raise CircuitOpenError(f"{name}: circuit open")
+        await admit()
+        if resilient:
+            return await resilient_call(name, attempt, deadline=deadline)
+        if deadline is None:
+            return await attempt()
+        return await asyncio.wait_for(attempt(), deadline)
+
+    if trace_name is None:
+        return await run()
+    with trace(trace_name):
+        return await run()
+
+
+def _count_usage(call: CallRecord, result: Any) -> None:
+    """Token counts from the SDK's usage stats, estimated when the runner has none."""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    if usage is not None and getattr(usage, "input_tokens", 0):
+        call.prompt_tokens = usage.input_tokens
+        call.completion_tokens = usage.output_tokens
+    else:
+        output = result.final_output
+        call.completion_tokens = count_tokens(
+            output.model_dump_json() if hasattr(output, "model_dump_json") else str(output)
+        )
+    call.cost_usd = call_cost(call.model, call.prompt_tokens, call.completion_tokens)
+
+
+def _finish(call: CallRecord, start: float, message: str, error: Optional[BaseException] = None) -> None:
+    call.wall_ms = (time.perf_counter() - start) * 1000
+    if error is None:
+        record_call(call.agent, message, call.wall_ms, cached=call.cached)
+    else:
+        call.ok, call.error = False, type(error).__name__
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record(call)
+
+
+async def run_agent(
+    agent: Any,
+    message: str,
+    trace_name: Optional[str] = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[float] = None,
+) -> Any:
+    """
+    Runs an agent on a message with the current runner.
+
+    Args:
+        agent: openai-agents Agent
+        message: Input message
+        trace_name: Optional trace name for the run
+        use_cache: Look up / store the output in the response cache
+        priority: Scheduler priority class (PRIORITY_INTERACTIVE or PRIORITY_BULK)
+        deadline: Seconds for the call, retries included, counted from
+            scheduler admission (config.AGENT_CALL_DEADLINE if None)
+
+    Returns:
+        Runner result (with `final_output`)
+    """
+    start = time.perf_counter()
+    model = getattr(agent, "model", None)
+    call = CallRecord(
+        agent=getattr(agent, "name", "agent"),
+        trace=trace_name,
+        session=current_session(),
+        model=model if isinstance(model, str) else None,
+        prompt_tokens=count_tokens(message),
+    )
+
+    cache = get_cache() if use_cache and (_runner is Runner or _cache_stub) else None
+    key = cache_key(agent, message) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key, getattr(agent, "output_type", None))
+        if cached is not None:
+            call.cached = True
+            _finish(call, start, message)
+            return CachedResult(final_output=cached)
+
+    try:
+        result = await _run(agent, message, trace_name, priority, call, deadline)
+    except BaseException as e:
+        _finish(call, start, message, e)
+        raise
+    if cache is not None:
+        cache.set(key, result.final_output)
+    _count_usage(call, result)
+    _finish(call, start, message)
+    return result
@@ -3,14 +3,21 @@ ScenarioAgent - generates what-if scenarios with AI reasoning.
 
 Suggests realistic scenarios based on current drivers, industry context,
 and historical data, with probability estimates and driver adjustments.
+evaluate_suggestions() runs the suggested adjustments through the
+forecast engine.
 """
 
 import config
-from agents import Runner, Agent, trace
+from agents import Agent
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import List, Dict
-import json
+from typing import List, Dict, Optional, Tuple
+from drivers.models import ForecastDrivers
+from forecasting.scenarios import Scenario, ScenarioEngine, apply_adjustments, unique_name
+from .prompting import PromptBuilder
+from .event_loop import run_sync, shared_instance
+from .runner import run_agent
+from .tools import FORECAST_TOOLS, TOOL_INSTRUCTIONS, ForecastToolContext, forecast_scope
 
 load_dotenv()
 
@@ -38,7 +45,7 @@ class ScenarioAgent:
         self.agent = Agent(
             name="scenario_planner",
             model=config.FORECAST_MODEL,
-            tools=[],
+            tools=FORECAST_TOOLS,
             instructions="""
             You are a strategic financial planner specializing in scenario analysis.
 
@@ -62,7 +69,7 @@ class ScenarioAgent:
 
             Probabilities should sum to approximately 1.0.
             Respond in English with specific numbers.
-            """,
+            """ + TOOL_INSTRUCTIONS,
             output_type=ScenarioAnalysisResponse,
         )
 
@@ -71,56 +78,100 @@ class ScenarioAgent:
         current_drivers: dict,
         industry: str,
         historical_summary: dict,
+        forecast_context: Optional[ForecastToolContext] = None,
     ) -> ScenarioAnalysisResponse:
-        """Suggest what-if scenarios based on current state."""
+        """Suggest what-if scenarios based on current state.
+
+        forecast_context lets the agent test its scenarios with the
+        forecast tools.
+        """
         ccc = (
             current_drivers.get('dso_days', 0)
             + current_drivers.get('dio_days', 0)
             - current_drivers.get('dpo_days', 0)
         )
 
-        message = f"""
-Suggest 3-4 realistic scenarios for cash flow planning:
-
-CURRENT DRIVERS:
-- DSO: {current_drivers.get('dso_days', 'N/A')} days
-- DPO: {current_drivers.get('dpo_days', 'N/A')} days
-- DIO: {current_drivers.get('dio_days', 'N/A')} days
-- CCC: {ccc} days
-
-INDUSTRY: {industry}
+        message = PromptBuilder("scenario").build(
+            "Suggest 3-4 realistic scenarios for cash flow planning.",
+            {
+                "CURRENT DRIVERS": {
+                    "dso_days": current_drivers.get('dso_days'),
+                    "dpo_days": current_drivers.get('dpo_days'),
+                    "dio_days": current_drivers.get('dio_days'),
+                    "ccc_days": ccc,
+                },
+                "INDUSTRY": industry,
+                "HISTORICAL CONTEXT": historical_summary,
+                **({"FORECAST INPUTS": forecast_context.summary()} if forecast_context else {}),
+            },
+            "For each scenario specify: name and description, driver adjustment "
+            "multipliers, probability (0.0 to 1.0) and reasoning.",
+        )
 
-HISTORICAL CONTEXT:
-{json.dumps(historical_summary, ensure_ascii=False, indent=2)}
+        with forecast_scope(forecast_context):
+            result = await run_agent(self.agent, message, trace_name="suggest_scenarios")
 
-For each scenario specify:
-1. Name and description
-2. Driver adjustment multipliers
-3. Probability (0.0 to 1.0)
-4. Reasoning
-"""
+        return result.final_output
 
-        with trace("suggest_scenarios"):
-            result = await Runner.run(self.agent, message)
 
-        return result.final_output
+def get_scenario_agent() -> ScenarioAgent:
+    """Shared ScenarioAgent instance."""
+    return shared_instance(ScenarioAgent)
 
 
 def suggest_scenarios_sync(
     current_drivers: dict,
     industry: str,
     historical_summary: dict,
+    forecast_context: Optional[ForecastToolContext] = None,
 ) -> ScenarioAnalysisResponse:
     """Synchronous wrapper for ScenarioAgent.suggest_scenarios()."""
-    import asyncio
+    return run_sync(
+        get_scenario_agent().suggest_scenarios(
+            current_drivers, industry, historical_summary, forecast_context
+        )
+    )
 
-    agent = ScenarioAgent()
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
 
-    return loop.run_until_complete(
-        agent.suggest_scenarios(current_drivers, industry, historical_summary)
+def evaluate_suggestions(
+    suggestions: ScenarioAnalysisResponse,
+    base_drivers: ForecastDrivers,
+    historical_data,
+    periods: int = 12,
+    n_simulations: int = 0,
+) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """
+    Evaluates AI-suggested scenarios in one batched forecast.
+
+    Args:
+        suggestions: ScenarioAgent output
+        base_drivers: Drivers the multipliers apply to
+        historical_data: DataFrame with 'revenue' column (and optionally 'cogs')
+        periods: Forecast periods
+        n_simulations: Monte Carlo runs per scenario (0 = none)
+
+    Returns:
+        (results, rejected): results in the ScenarioEngine.evaluate_scenarios()
+        format, ready for render_scenario_comparison(); rejected maps
+        scenarios whose adjustments are out of range to the reason
+        (repeated names suffixed as in evaluate_scenarios())
+    """
+    scenarios, rejected = [], {}
+    for suggestion in suggestions.scenarios:
+        try:
+            drivers, warnings = apply_adjustments(base_drivers, suggestion.driver_adjustments)
+        except ValueError as e:
+            rejected[unique_name(suggestion.scenario_name, rejected)] = str(e)
+            continue
+        scenarios.append(Scenario(
+            name=suggestion.scenario_name,
+            description=suggestion.description,
+            drivers=drivers,
+            probability=suggestion.probability,
+            warnings=warnings,
+        ))
+
+    results = ScenarioEngine(base_drivers).evaluate_scenarios(
+        historical_data, scenarios, periods=periods, n_simulations=n_simulations
     )
+    return results, rejected
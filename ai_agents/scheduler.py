@@ -0,0 +1,260 @@
+"""
+Process-wide scheduler for LLM requests.
+
+Every agent call acquires a slot here before it is sent. Token buckets
+enforce requests-per-minute and tokens-per-minute limits; waiting
+requests are granted by priority class (interactive before bulk) and
+round-robin across sessions within a class, so one planner's 800
+category forecasts can't starve another planner's explanation.
+Queue depth and wait times are exposed via metrics().
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+import config
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+DEFAULT_SESSION = "default"
+_session: contextvars.ContextVar = contextvars.ContextVar("llm_session", default=DEFAULT_SESSION)
+
+
+@contextmanager
+def session_scope(session_id: str) -> Iterator[None]:
+    """Attributes agent calls made inside the block to a session (for fair queuing)."""
+    token = _session.set(session_id)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def set_session(session_id: str) -> None:
+    """Sets the session of the current context (e.g. once per Streamlit script run)."""
+    _session.set(session_id)
+
+
+def current_session() -> str:
+    """Session of the current context."""
+    return _session.get()
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+@dataclass
+class _Ticket:
+    tokens: int
+    priority: int
+    session: str
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class RequestScheduler:
+    """Rate-limited, priority- and session-fair admission of LLM requests."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        """
+        Args:
+            requests_per_minute: Request bucket size and refill (config.LLM_REQUESTS_PER_MINUTE)
+            tokens_per_minute: Token bucket size and refill (config.LLM_TOKENS_PER_MINUTE)
+        """
+        self.requests = TokenBucket(requests_per_minute or config.LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(tokens_per_minute or config.LLM_TOKENS_PER_MINUTE)
+
+        self._lock = threading.Lock()
+        # priority -> session -> waiting tickets; round-robin order of sessions per priority
+        self._queues: Dict[int, Dict[str, Deque[_Ticket]]] = {}
+        self._rotation: Dict[int, Deque[str]] = {}
+        # Waiter whose loop runs the pending refill timer
+        self._timer_ticket: Optional[_Ticket] = None
+
+        self._waits: Dict[int, Deque[float]] = {}
+        self._granted: Dict[int, int] = {}
+        self._granted_by_session: Dict[str, int] = {}
+        self._max_depth = 0
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE, session: Optional[str] = None) -> float:
+        """
+        Waits until a request of `tokens` tokens may be sent.
+
+        Args:
+            tokens: Estimated prompt + completion tokens
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BULK
+            session: Session id (current session_scope() if None)
+
+        Returns:
+            Seconds spent waiting
+        """
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(
+            tokens=tokens,
+            priority=priority,
+            session=session or current_session(),
+            loop=loop,
+            future=loop.create_future(),
+        )
+        with self._lock:
+            rotation = self._rotation.setdefault(priority, deque())
+            if ticket.session not in rotation:
+                rotation.append(ticket.session)
+            self._queues.setdefault(priority, {}).setdefault(ticket.session, deque()).append(ticket)
+            self._max_depth = max(self._max_depth, self._depth())
+        self._dispatch()
+
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            # Drops the ticket and hands the refill timer to a live waiter
+            self._dispatch()
+            raise
+        return time.monotonic() - ticket.enqueued
+
+    def _depth(self) -> int:
+        return sum(len(q) for sessions in self._queues.values() for q in sessions.values())
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        """Head of the next session in the highest non-empty priority class."""
+        for priority in sorted(self._rotation):
+            rotation = self._rotation[priority]
+            while rotation:
+                queue = self._queues[priority][rotation[0]]
+                # Drop tickets whose caller gave up (cancelled / timed out)
+                while queue and queue[0].future.done():
+                    queue.popleft()
+                if queue:
+                    return queue[0]
+                rotation.popleft()
+        return None
+
+    def _dispatch(self) -> None:
+        """Grants as many waiting tickets as the buckets allow."""
+        with self._lock:
+            while True:
+                ticket = self._next_ticket()
+                if ticket is None:
+                    return
+                now = time.monotonic()
+                wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(ticket.tokens, now))
+                if wait > 0:
+                    self._arm_timer(wait)
+                    return
+
+                self.requests.take(1)
+                self.tokens.take(ticket.tokens)
+                rotation = self._rotation[ticket.priority]
+                queue = self._queues[ticket.priority][ticket.session]
+                queue.popleft()
+                rotation.rotate(-1)   # this session goes to the back of the round
+                if not queue:
+                    rotation.remove(ticket.session)
+
+                self._waits.setdefault(ticket.priority, deque(maxlen=5000)).append(now - ticket.enqueued)
+                self._granted[ticket.priority] = self._granted.get(ticket.priority, 0) + 1
+                self._granted_by_session[ticket.session] = self._granted_by_session.get(ticket.session, 0) + 1
+                ticket.loop.call_soon_threadsafe(_resolve, ticket.future)
+
+    def _arm_timer(self, wait: float) -> None:
+        """Re-runs _dispatch() after `wait` seconds on a live waiter's loop (lock held)."""
+        armed = self._timer_ticket
+        if armed is not None and not armed.future.done() and armed.loop.is_running():
+            return
+        self._timer_ticket = None
+        # The previous waiter was granted or cancelled and its loop may be gone
+        for sessions in self._queues.values():
+            for queue in sessions.values():
+                for ticket in queue:
+                    if not ticket.future.done() and ticket.loop.is_running():
+                        self._timer_ticket = ticket
+                        ticket.loop.call_soon_threadsafe(ticket.loop.call_later, wait, self._on_timer)
+                        return
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer_ticket = None
+        self._dispatch()
+
+    def metrics(self) -> Dict[str, object]:
+        """Queue depth, grants and wait-time percentiles (ms) per priority class."""
+        with self._lock:
+            by_priority: List[Dict[str, object]] = []
+            for priority in sorted(set(self._waits) | set(self._queues)):
+                waits = np.asarray(self._waits.get(priority, ())) * 1000
+                by_priority.append({
+                    "priority": PRIORITY_NAMES.get(priority, str(priority)),
+                    "queued": sum(len(q) for q in self._queues.get(priority, {}).values()),
+                    "granted": self._granted.get(priority, 0),
+                    "wait_ms_p50": float(np.percentile(waits, 50)) if waits.size else 0.0,
+                    "wait_ms_p95": float(np.percentile(waits, 95)) if waits.size else 0.0,
+                })
+            return {
+                "queue_depth": self._depth(),
+                "max_queue_depth": self._max_depth,
+                "by_priority": by_priority,
+                "granted_by_session": dict(self._granted_by_session),
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[RequestScheduler]:
+    """Process-wide scheduler (None when LLM_SCHEDULER_ENABLED is off)."""
+    global _scheduler
+    if not config.LLM_SCHEDULER_ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+
+def set_scheduler(scheduler: Optional[RequestScheduler]) -> Optional[RequestScheduler]:
+    """Replaces the process-wide scheduler; returns the previous one."""
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, scheduler
+    return previous
@@ -0,0 +1,239 @@
+"""
+Offline stand-in for the openai-agents Runner.
+
+StubRunner has the Runner.run(agent, input) interface used by run_agent()
+and answers with schema-valid outputs built from the prompt (naive
+forecasts from the history digest, driver recommendations from the
+benchmarks, fixed scenarios, an explanation of the forecast totals). Its
+latency follows a configurable distribution and calls fail at a
+configurable rate, so agents can be tested and benchmarked without an
+API key:
+
+    set_runner(StubRunner(StubLatency(median_ms=300), failure_rate=0.02))
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from .driver_agent import DriverAnalysisResponse, DriverRecommendation
+from .explainer_agent import ForecastExplanation
+from .forecast_agent import BatchForecastResponse, CategoryForecast, ForecastAgentResponse
+from .resilience import LatencyTracker
+from .scenario_agent import ScenarioAnalysisResponse, ScenarioSuggestion
+
+_SECTION = re.compile(r"^([^:\n|]+): (.+)$", re.MULTILINE)
+_BATCH_LINE = re.compile(r"^(.+?) \| (\{.*\})$", re.MULTILINE)
+
+
+class StubProviderError(RuntimeError):
+    """Injected failure of a stub call."""
+
+
+@dataclass
+class StubLatency:
+    """
+    Lognormal call latency.
+
+    Attributes:
+        median_ms: Median latency
+        sigma: Lognormal shape (0 = every call takes median_ms; 0.5 puts
+            p99 near 3x the median)
+        stall_rate: Share of calls that take stall_ms instead (provider stalls)
+        stall_ms: Latency of a stalled call
+    """
+    median_ms: float = 50.0
+    sigma: float = 0.5
+    stall_rate: float = 0.0
+    stall_ms: float = 5000.0
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds."""
+        if self.stall_rate and rng.random() < self.stall_rate:
+            return self.stall_ms / 1000
+        if self.sigma <= 0:
+            return self.median_ms / 1000
+        return rng.lognormvariate(0, self.sigma) * self.median_ms / 1000
+
+
+@dataclass
+class StubResult:
+    """Runner-like result of a stub call."""
+    final_output: Any
+
+
+def _sections(message: str) -> Dict[str, Any]:
+    """`NAME: <json>` lines of a PromptBuilder message."""
+    sections = {}
+    for name, payload in _SECTION.findall(message):
+        try:
+            sections[name.strip()] = json.loads(payload)
+        except ValueError:
+            continue
+    return sections
+
+
+def _naive(digest: Any) -> float:
+    if isinstance(digest, dict):
+        for key in ("last", "mean"):
+            if isinstance(digest.get(key), (int, float)):
+                return float(digest[key])
+    return 0.0
+
+
+def _forecast(message: str) -> ForecastAgentResponse:
+    amount = _naive(_sections(message).get("History"))
+    return ForecastAgentResponse(amount=amount, justification="stub: last value carried forward")
+
+
+def _batch_forecast(message: str) -> BatchForecastResponse:
+    items = []
+    for category, digest in _BATCH_LINE.findall(message):
+        try:
+            amount = _naive(json.loads(digest))
+        except ValueError:
+            amount = 0.0
+        items.append(CategoryForecast(
+            category=category, amount=amount, justification="stub: last value carried forward"
+        ))
+    return BatchForecastResponse(forecasts=items)
+
+
+def _driver_analysis(message: str) -> DriverAnalysisResponse:
+    sections = _sections(message)
+    current = sections.get("CURRENT VALUES", {})
+    benchmarks = next((v for k, v in sections.items() if k.startswith("INDUSTRY BENCHMARKS")), {})
+    recommendations = []
+    for driver in ("dso", "dpo", "dio"):
+        value = current.get(f"{driver}_days")
+        benchmark = benchmarks.get(driver)
+        if value is None or benchmark is None:
+            continue
+        recommendations.append(DriverRecommendation(
+            driver_name=driver.upper(),
+            current_value=value,
+            recommended_value=(value + benchmark) / 2,
+            industry_benchmark=benchmark,
+            impact_on_cashflow="stub: moves working capital towards the benchmark",
+            reasoning=f"stub: {driver.upper()} {value} vs benchmark {benchmark}",
+        ))
+    return DriverAnalysisResponse(
+        recommendations=recommendations,
+        overall_assessment="stub: drivers compared with industry benchmarks",
+        risk_factors=[],
+        opportunities=[],
+    )
+
+
+def _scenarios(message: str) -> ScenarioAnalysisResponse:
+    presets = [
+        ("Base case", {}, 0.5),
+        ("Faster collections", {"dso_days": 0.85}, 0.3),
+        ("Slower growth", {"revenue_growth_pct": 0.5, "dso_days": 1.1}, 0.2),
+    ]
+    return ScenarioAnalysisResponse(
+        scenarios=[
+            ScenarioSuggestion(
+                scenario_name=name, description=f"stub: {name.lower()}",
+                driver_adjustments=adjustments, probability=probability, reasoning="stub",
+            )
+            for name, adjustments, probability in presets
+        ],
+        key_uncertainties=["stub: collection speed"],
+        recommendation="stub: plan for the base case",
+    )
+
+
+def _explanation(message: str) -> ForecastExplanation:
+    data = _sections(message).get("FORECAST DATA", {})
+    total = data.get("total_free_cashflow")
+    summary = f"stub: total free cash flow {total:,.0f}" if isinstance(total, (int, float)) else "stub forecast"
+    return ForecastExplanation(
+        summary=summary,
+        key_drivers=["stub: working capital"],
+        assumptions=["stub: drivers stay constant"],
+        risks=[],
+        confidence_level="medium",
+        recommendation="stub: monitor working capital",
+    )
+
+
+_BUILDERS: Dict[Type[BaseModel], Callable[[str], BaseModel]] = {
+    ForecastAgentResponse: _forecast,
+    BatchForecastResponse: _batch_forecast,
+    DriverAnalysisResponse: _driver_analysis,
+    ScenarioAnalysisResponse: _scenarios,
+    ForecastExplanation: _explanation,
+}
+
+
+def _placeholder(annotation: Any) -> Any:
+    """Schema-valid default value of a field type."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        return _placeholder(next(a for a in get_args(annotation) if a is not type(None)))
+    if origin in (list, tuple, set):
+        return []
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation(**{
+            name: _placeholder(field.annotation) for name, field in annotation.model_fields.items()
+        })
+    return {str: "stub", float: 0.0, int: 0, bool: False}.get(annotation)
+
+
+def stub_output(output_type: Any, message: str) -> Any:
+    """Schema-valid output of `output_type` for a prompt."""
+    if output_type is None:
+        return "stub"
+    builder = _BUILDERS.get(output_type)
+    return builder(message) if builder else _placeholder(output_type)
+
+
+class StubRunner:
+    """Runner stand-in with simulated latency and failures."""
+
+    def __init__(
+        self,
+        latency: Optional[StubLatency] = None,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+        agent_latency: Optional[Dict[str, StubLatency]] = None,
+    ):
+        """
+        Args:
+            latency: Default latency distribution (StubLatency() if None)
+            failure_rate: Share of calls that raise StubProviderError
+            seed: Seed for latencies and failures (None = random)
+            agent_latency: Latency per agent name, overriding `latency`
+        """
+        self.latency = latency or StubLatency()
+        self.failure_rate = failure_rate
+        self.agent_latency = agent_latency or {}
+        self.latencies = LatencyTracker(window=100_000)
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    async def run(self, agent: Any, input: str, **kwargs: Any) -> StubResult:
+        name = getattr(agent, "name", "agent")
+        with self._lock:
+            self.calls[name] += 1
+            delay = self.agent_latency.get(name, self.latency).sample(self._rng)
+            failed = self._rng.random() < self.failure_rate
+        await asyncio.sleep(delay)
+        if failed:
+            with self._lock:
+                self.failures[name] += 1
+            raise StubProviderError(f"{name}: injected failure")
+        self.latencies.record(name, delay)
+        return StubResult(final_output=stub_output(getattr(agent, "output_type", None), input))
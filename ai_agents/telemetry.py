@@ -0,0 +1,247 @@
+"""
+Per-call telemetry of agent requests.
+
+run_agent() records one CallRecord per call: wall time, time spent queued
+in the request scheduler, prompt/completion tokens, extra attempts
+(retries and hedged duplicates), cache hits, errors and estimated cost.
+The last TELEMETRY_WINDOW records are aggregated into per-agent
+p50/p95/p99 latencies and histograms; every record is appended to a
+size-rotated JSONL file and the totals since start are periodically
+written in the Prometheus text format, both under .cache/ by default.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import config
+from .resilience import LATENCY_BUCKETS_MS
+
+RECORD_COLUMNS = [
+    "timestamp", "agent", "trace", "session", "model", "wall_ms", "queue_ms",
+    "prompt_tokens", "completion_tokens", "attempts", "cached", "ok", "error", "cost_usd",
+]
+
+
+@dataclass
+class CallRecord:
+    """One agent call."""
+    agent: str
+    trace: Optional[str] = None
+    session: str = "default"
+    model: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    wall_ms: float = 0.0
+    queue_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 0
+    cached: bool = False
+    ok: bool = True
+    error: Optional[str] = None
+    cost_usd: float = 0.0
+
+
+def call_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost from config.LLM_PRICES_PER_1M (0 for unknown models)."""
+    prompt_price, completion_price = config.LLM_PRICES_PER_1M.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class Telemetry:
+    """Rolling window of call records with JSONL and Prometheus export."""
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        jsonl_path: Optional[str] = None,
+        prometheus_path: Optional[str] = None,
+        export_seconds: Optional[float] = None,
+        jsonl_max_mb: Optional[float] = None,
+    ):
+        """
+        Args:
+            window: Records kept for aggregation (config.TELEMETRY_WINDOW if None)
+            jsonl_path: File every record is appended to ("" = none)
+            prometheus_path: File the aggregates are written to ("" = none)
+            export_seconds: Minimum seconds between Prometheus writes
+            jsonl_max_mb: Size at which the JSONL file is rotated to <path>.1
+        """
+        self._records: Deque[CallRecord] = deque(maxlen=window or config.TELEMETRY_WINDOW)
+        self.jsonl_path = config.TELEMETRY_JSONL_PATH if jsonl_path is None else jsonl_path
+        self.prometheus_path = config.TELEMETRY_PROMETHEUS_PATH if prometheus_path is None else prometheus_path
+        self.export_seconds = config.TELEMETRY_EXPORT_SECONDS if export_seconds is None else export_seconds
+        self.jsonl_max_bytes = (config.TELEMETRY_JSONL_MAX_MB if jsonl_max_mb is None else jsonl_max_mb) * 2**20
+        self._totals: Dict[str, Dict[str, float]] = {}
+        # Cumulative wall-time bucket counts per agent (Prometheus histogram)
+        self._buckets: Dict[str, np.ndarray] = {}
+        self._last_export: Optional[float] = None
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        with self._lock:
+            self._records.append(call)
+            totals = self._totals.setdefault(call.agent, dict.fromkeys(
+                ("calls", "errors", "cache_hits", "prompt_tokens", "completion_tokens", "cost_usd", "wall_ms"), 0.0
+            ))
+            totals["calls"] += 1
+            totals["errors"] += not call.ok
+            totals["cache_hits"] += call.cached
+            totals["prompt_tokens"] += call.prompt_tokens
+            totals["completion_tokens"] += call.completion_tokens
+            totals["cost_usd"] += call.cost_usd
+            totals["wall_ms"] += call.wall_ms
+            buckets = self._buckets.setdefault(call.agent, np.zeros(len(LATENCY_BUCKETS_MS), dtype=np.int64))
+            buckets += call.wall_ms <= np.asarray(LATENCY_BUCKETS_MS)
+            now = time.monotonic()
+            export = bool(self.prometheus_path) and (
+                self._last_export is None or now - self._last_export >= self.export_seconds
+            )
+            if export:
+                self._last_export = now
+        if self.jsonl_path:
+            self._append(json.dumps(asdict(call)) + "\n")
+        if export:
+            self.export_prometheus()
+
+    def _append(self, line: str) -> None:
+        """Appends a line to the JSONL file, rotating it at jsonl_max_bytes."""
+        path = Path(self.jsonl_path)
+        with self._file_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size >= self.jsonl_max_bytes:
+                path.replace(path.with_name(path.name + ".1"))
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+
+    def records(self) -> pd.DataFrame:
+        """Records in the window as a DataFrame (RECORD_COLUMNS)."""
+        with self._lock:
+            rows = [asdict(r) for r in self._records]
+        return pd.DataFrame(rows, columns=RECORD_COLUMNS)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-agent aggregates over the window: calls, total wall seconds,
+        errors, cache hit rate, extra attempts, wall p50/p95/p99, queue p95,
+        tokens and cost.
+        """
+        df = self.records()
+        columns = [
+            "agent", "calls", "wall_s", "errors", "cache_hit_rate", "extra_attempts",
+            "p50_ms", "p95_ms", "p99_ms", "queue_p95_ms",
+            "prompt_tokens", "completion_tokens", "cost_usd",
+        ]
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        rows = []
+        for agent, group in df.groupby("agent"):
+            wall = group["wall_ms"].to_numpy()
+            rows.append({
+                "agent": agent,
+                "calls": len(group),
+                "wall_s": float(wall.sum() / 1000),
+                "errors": int((~group["ok"].astype(bool)).sum()),
+                "cache_hit_rate": float(group["cached"].mean()),
+                "extra_attempts": int((group["attempts"] - 1).clip(lower=0).sum()),
+                "p50_ms": float(np.percentile(wall, 50)),
+                "p95_ms": float(np.percentile(wall, 95)),
+                "p99_ms": float(np.percentile(wall, 99)),
+                "queue_p95_ms": float(np.percentile(group["queue_ms"], 95)),
+                "prompt_tokens": int(group["prompt_tokens"].sum()),
+                "completion_tokens": int(group["completion_tokens"].sum()),
+                "cost_usd": float(group["cost_usd"].sum()),
+            })
+        return pd.DataFrame(rows, columns=columns)
+
+    def histograms(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> pd.DataFrame:
+        """Wall-time counts per agent and bucket: agent, le_ms, count."""
+        df = self.records()
+        rows = []
+        for agent, group in df.groupby("agent"):
+            counts, _ = np.histogram(group["wall_ms"].to_numpy(), bins=[0.0, *buckets])
+            rows += [{"agent": agent, "le_ms": le, "count": int(c)} for le, c in zip(buckets, counts)]
+        return pd.DataFrame(rows, columns=["agent", "le_ms", "count"])
+
+    def prometheus_text(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        with self._lock:
+            totals = {agent: dict(values) for agent, values in self._totals.items()}
+            buckets = {agent: counts.copy() for agent, counts in self._buckets.items()}
+        lines: List[str] = []
+        counters = [
+            ("calls", "Agent calls"),
+            ("errors", "Failed agent calls"),
+            ("cache_hits", "Agent calls served from the response cache"),
+            ("prompt_tokens", "Prompt tokens sent"),
+            ("completion_tokens", "Completion tokens received"),
+            ("cost_usd", "Estimated cost in USD"),
+        ]
+        for key, help_text in counters:
+            name = f"fcf_agent_{key}_total"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{agent="{_escape(a)}"}} {t[key]:g}' for a, t in sorted(totals.items())]
+
+        name = "fcf_agent_call_duration_ms"
+        lines += [f"# HELP {name} Agent call wall time", f"# TYPE {name} histogram"]
+        for agent, counts in sorted(buckets.items()):
+            label = _escape(agent)
+            for le, count in zip(LATENCY_BUCKETS_MS, counts):
+                bound = "+Inf" if le == float("inf") else f"{le:g}"
+                lines.append(f'{name}_bucket{{agent="{label}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{agent="{label}"}} {totals[agent]["wall_ms"]:g}')
+            lines.append(f'{name}_count{{agent="{label}"}} {totals[agent]["calls"]:g}')
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: Optional[str] = None) -> Optional[Path]:
+        """Writes prometheus_text() to `path` (the configured file if None)."""
+        target = path or self.prometheus_path
+        if not target:
+            return None
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(self.prometheus_text(), encoding="utf-8")
+        tmp.replace(target)
+        return target
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+            self._buckets.clear()
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    """Shared Telemetry used by run_agent() (None when TELEMETRY_ENABLED is off)."""
+    global _telemetry
+    if not config.TELEMETRY_ENABLED:
+        return None
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
+
+
+def set_telemetry(telemetry: Optional[Telemetry]) -> Optional[Telemetry]:
+    """Replaces the shared Telemetry (e.g. in tests); returns the previous one."""
+    global _telemetry
+    with _telemetry_lock:
+        previous, _telemetry = _telemetry, telemetry
+    return previous
@@ -0,0 +1,277 @@
+"""
+Function tools that let agents query the forecast engine.
+
+Instead of pasting forecasts into prompts, DriverAgent and ScenarioAgent
+call these tools to run a forecast, a sensitivity check or a small Monte
+Carlo on the current drivers, or to look up industry benchmarks. The
+tools run on the vectorized BatchDriverForecaster and memoize results, so
+a call returns in milliseconds. Every call's latency is recorded per tool.
+
+The drivers and history the tools work on are set per request with
+forecast_scope(); without one, only lookup_benchmark() is available.
+"""
+
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+from agents import function_tool
+from pydantic import ValidationError
+
+from drivers.defaults import get_industry_defaults
+from drivers.models import ForecastDrivers, Industry
+from forecasting.batch import SENSITIVITY_DRIVERS, BatchDriverForecaster
+from .prompting import compact_value
+from .resilience import LatencyTracker
+
+# Longest forecast horizon (months) the tools accept
+MAX_TOOL_PERIODS = 60
+
+
+@dataclass
+class ForecastToolContext:
+    """Drivers and history the forecast tools work on."""
+    drivers: ForecastDrivers
+    last_revenue: float
+    last_cogs: Optional[float] = None
+
+    @classmethod
+    def from_history(cls, drivers: ForecastDrivers, historical_data: pd.DataFrame) -> "ForecastToolContext":
+        """Context from a DataFrame with 'revenue' (and optionally 'cogs') column."""
+        return cls(
+            drivers=drivers,
+            last_revenue=float(historical_data["revenue"].iloc[-1]),
+            last_cogs=float(historical_data["cogs"].iloc[-1]) if "cogs" in historical_data else None,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Inputs the tools see, for the prompt (also keys the response cache)."""
+        wc, revenue = self.drivers.working_capital, self.drivers.revenue
+        return {
+            "dso_days": wc.dso_days,
+            "dpo_days": wc.dpo_days,
+            "dio_days": wc.dio_days,
+            "revenue_growth_pct": revenue.revenue_growth_pct,
+            "gross_margin_pct": revenue.gross_margin_pct,
+            "seasonality_factors": revenue.seasonality_factors,
+            "capex": self.drivers.capex.model_dump() if self.drivers.capex else None,
+            "last_month_revenue": self.last_revenue,
+            "last_month_cogs": self.last_cogs,
+        }
+
+    def key(self) -> Tuple[str, float, Optional[float]]:
+        """Hashable identity used to memoize tool results."""
+        return self.drivers.model_dump_json(), self.last_revenue, self.last_cogs
+
+
+def _forecaster(key: Tuple[str, float, Optional[float]]) -> Tuple[BatchDriverForecaster, ForecastDrivers]:
+    drivers_json, last_revenue, last_cogs = key
+    history = {"revenue": [last_revenue]}
+    if last_cogs is not None:
+        history["cogs"] = [last_cogs]
+    return BatchDriverForecaster(pd.DataFrame(history)), ForecastDrivers.model_validate_json(drivers_json)
+
+
+_context: contextvars.ContextVar = contextvars.ContextVar("forecast_tool_context", default=None)
+_latency = LatencyTracker()
+
+
+@contextmanager
+def forecast_scope(context: Optional[ForecastToolContext]) -> Iterator[None]:
+    """Makes `context` available to the forecast tools inside the block."""
+    token = _context.set(context)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def _require_context() -> ForecastToolContext:
+    context = _context.get()
+    if context is None:
+        raise ValueError("No forecast loaded: run the driver-based forecast first")
+    return context
+
+
+def _timed(func: Callable) -> Callable:
+    """Records the latency of each call; errors are returned to the agent as text."""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except ValueError as e:
+            return {"error": str(e)}
+        finally:
+            _latency.record(func.__name__, time.perf_counter() - start)
+    return wrapper
+
+
+def _check_periods(periods: int) -> int:
+    """Forecast horizon requested by an agent, rejected outside 1..MAX_TOOL_PERIODS."""
+    periods = int(periods)
+    if not 1 <= periods <= MAX_TOOL_PERIODS:
+        raise ValueError(f"periods must be between 1 and {MAX_TOOL_PERIODS}, got {periods}")
+    return periods
+
+
+def _with_overrides(drivers: ForecastDrivers, overrides: Dict[str, Optional[float]]) -> ForecastDrivers:
+    """Drivers with the given values replaced, re-validated against the model's limits."""
+    working_capital = {k: v for k, v in overrides.items() if v is not None and k in ("dso_days", "dpo_days", "dio_days")}
+    revenue = {k: v for k, v in overrides.items() if v is not None and k not in working_capital}
+    data = drivers.model_dump()
+    data["working_capital"].update(working_capital)
+    data["revenue"].update(revenue)
+    try:
+        return ForecastDrivers.model_validate(data)
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+        raise ValueError(f"Invalid driver values: {errors}") from None
+
+
+@functools.lru_cache(maxsize=1024)
+def _forecast_totals(key: Tuple[str, float, Optional[float]], periods: int) -> Tuple[Tuple[str, float], ...]:
+    forecaster, drivers = _forecaster(key)
+    forecast = forecaster.to_frame(forecaster.run([drivers], periods))
+    return tuple({
+        "total_revenue": forecast["revenue"].sum(),
+        "total_operating_cashflow": forecast["operating_cashflow"].sum(),
+        "total_free_cashflow": forecast["free_cashflow"].sum(),
+        "min_monthly_free_cashflow": forecast["free_cashflow"].min(),
+        "last_net_working_capital": forecast["net_working_capital"].iloc[-1],
+        "ccc_days": drivers.working_capital.ccc_days,
+    }.items())
+
+
+@_timed
+def run_forecast(
+    dso_days: Optional[float] = None,
+    dpo_days: Optional[float] = None,
+    dio_days: Optional[float] = None,
+    revenue_growth_pct: Optional[float] = None,
+    gross_margin_pct: Optional[float] = None,
+    periods: int = 12,
+) -> Dict[str, Any]:
+    """Run the driver-based cash flow forecast, optionally with changed drivers.
+
+    Args:
+        dso_days: Days sales outstanding (current value if null).
+        dpo_days: Days payable outstanding (current value if null).
+        dio_days: Days inventory outstanding (current value if null).
+        revenue_growth_pct: Annual revenue growth in % (current value if null).
+        gross_margin_pct: Gross margin in % (current value if null).
+        periods: Months to forecast (1 to 60).
+    """
+    context = _require_context()
+    periods = _check_periods(periods)
+    drivers = _with_overrides(context.drivers, {
+        "dso_days": dso_days,
+        "dpo_days": dpo_days,
+        "dio_days": dio_days,
+        "revenue_growth_pct": revenue_growth_pct,
+        "gross_margin_pct": gross_margin_pct,
+    })
+    key = (drivers.model_dump_json(), context.last_revenue, context.last_cogs)
+    return compact_value(dict(_forecast_totals(key, periods)))
+
+
+@functools.lru_cache(maxsize=256)
+def _sensitivity(key: Tuple[str, float, Optional[float]], driver_name: str, change_pct: float, periods: int) -> Tuple[float, ...]:
+    forecaster, drivers = _forecaster(key)
+    result = forecaster.sensitivity(drivers, driver_name, [-change_pct, 0, change_pct], periods)
+    return tuple(result.values())
+
+
+@_timed
+def compute_sensitivity(driver_name: str = "all", change_pct: float = 10, periods: int = 12) -> Dict[str, Any]:
+    """Total free cash flow when one driver moves down/up by change_pct percent.
+
+    Args:
+        driver_name: dso_days, dpo_days, dio_days, revenue_growth_pct,
+            gross_margin_pct, or all (every driver, largest impact first).
+        change_pct: Relative change of the driver in %.
+        periods: Months to forecast (1 to 60).
+    """
+    context = _require_context()
+    periods = _check_periods(periods)
+    names = SENSITIVITY_DRIVERS if driver_name == "all" else [driver_name]
+    rows = []
+    for name in names:
+        low, base, high = _sensitivity(context.key(), name, float(change_pct), periods)
+        rows.append({"driver": name, "fcf_low": low, "fcf_base": base, "fcf_high": high})
+    rows.sort(key=lambda r: abs(r["fcf_high"] - r["fcf_low"]), reverse=True)
+    return compact_value({"change_pct": change_pct, "drivers": rows})
+
+
+@functools.lru_cache(maxsize=64)
+def _monte_carlo(key: Tuple[str, float, Optional[float]], n_simulations: int, periods: int, seed: int) -> Tuple[Tuple[str, float], ...]:
+    forecaster, drivers = _forecaster(key)
+    return tuple(forecaster.monte_carlo(drivers, n_simulations, periods, seed).items())
+
+
+@_timed
+def run_monte_carlo(n_simulations: int = 500, periods: int = 12) -> Dict[str, Any]:
+    """Distribution of total free cash flow with random driver variations
+    (DSO/DPO/DIO +-20%, growth +-50%).
+
+    Args:
+        n_simulations: Number of simulations (at most 5000).
+        periods: Months to forecast (1 to 60).
+    """
+    context = _require_context()
+    periods = _check_periods(periods)
+    n_simulations = max(1, min(int(n_simulations), 5000))
+    return compact_value(dict(_monte_carlo(context.key(), n_simulations, periods, 0)))
+
+
+@_timed
+def lookup_benchmark(industry: str) -> Dict[str, Any]:
+    """Typical drivers for an industry.
+
+    Args:
+        industry: retail, manufacturing, services, technology or healthcare.
+    """
+    try:
+        defaults = get_industry_defaults(Industry(industry.lower()))
+    except ValueError:
+        raise ValueError(
+            f"Unknown industry: {industry}. Use one of {[i.value for i in Industry]}"
+        ) from None
+    return compact_value({
+        "industry": industry.lower(),
+        "dso_days": defaults.working_capital.dso_days,
+        "dpo_days": defaults.working_capital.dpo_days,
+        "dio_days": defaults.working_capital.dio_days,
+        "ccc_days": defaults.working_capital.ccc_days,
+        "revenue_growth_pct": defaults.revenue.revenue_growth_pct,
+        "gross_margin_pct": defaults.revenue.gross_margin_pct,
+    })
+
+
+# Appended to the instructions of agents that get FORECAST_TOOLS
+TOOL_INSTRUCTIONS = """
+Use the tools for every number about cash flow impact instead of estimating:
+run_forecast (FCF/OCF totals for the current or changed drivers),
+compute_sensitivity (FCF when each driver moves down/up), run_monte_carlo
+(FCF distribution under random driver variations) and lookup_benchmark
+(typical drivers of an industry). If a tool reports that no forecast is
+loaded, describe impacts qualitatively.
+"""
+
+FORECAST_TOOLS = [
+    function_tool(run_forecast),
+    function_tool(compute_sensitivity),
+    function_tool(run_monte_carlo),
+    function_tool(lookup_benchmark),
+]
+
+
+def tool_latency_summary() -> pd.DataFrame:
+    """Per-tool calls and p50/p95/p99 latency (ms)."""
+    return _latency.summary().rename(columns={"agent": "tool"})
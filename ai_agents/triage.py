@@ -0,0 +1,113 @@
+"""
+Triage stage in front of the forecast agent.
+
+Scores every category's forecastability from the statistical baseline
+(relative interval width, volatility, recent structural breaks) and
+routes only the uncertain tail to the LLM. Everything else keeps the
+baseline forecast with an auto-generated justification.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from forecasting.baseline import BaselineForecaster, wide_to_matrix
+from .forecast_analyzer import analyze_matrix
+
+
+def detect_structural_breaks(values: np.ndarray, recent: int = 3, z: float = 3.0) -> np.ndarray:
+    """
+    Flags rows whose last `recent` months shifted away from the earlier level.
+
+    Args:
+        values: Matrix (N, T) without gaps
+        recent: Months treated as the recent regime
+        z: Threshold on the two-sample t-like statistic
+
+    Returns:
+        Boolean array (N,)
+    """
+    n, t = values.shape
+    k = min(recent, t // 3)
+    if k < 1 or t - k < 2:
+        return np.zeros(n, dtype=bool)
+
+    prior, last = values[:, :-k], values[:, -k:]
+    shift = np.abs(last.mean(axis=1) - prior.mean(axis=1))
+    scale = prior.std(axis=1, ddof=1) * np.sqrt(1 / k + 1 / (t - k))
+    level = np.abs(prior.mean(axis=1))
+    # Ignore shifts that are tiny relative to the level of the series
+    return (shift > z * scale) & (shift > 0.1 * level)
+
+
+def triage_categories(
+    df_wide: pd.DataFrame,
+    max_interval_width: Optional[float] = None,
+    max_llm_share: Optional[float] = None,
+    stats: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Decides which categories need the LLM.
+
+    A category goes to the LLM when its baseline interval is wider than
+    `max_interval_width` (relative to the level of the series), its
+    volatility is high, or its recent months break from the history.
+    When `max_llm_share` is set, only that share of categories with the
+    highest uncertainty is routed to the LLM.
+
+    Args:
+        df_wide: Wide table (category + month columns)
+        max_interval_width: Relative interval width threshold
+        max_llm_share: Upper bound on the share of LLM calls (0-1)
+        stats: analyze_matrix() of the categories, if already computed
+
+    Returns:
+        DataFrame indexed like df_wide with category, method, forecast,
+        lower, upper, interval_width, volatility, structural_break,
+        score and route ('llm' or 'baseline')
+    """
+    if max_interval_width is None:
+        max_interval_width = config.TRIAGE_MAX_INTERVAL_WIDTH
+    if max_llm_share is None:
+        max_llm_share = config.TRIAGE_MAX_LLM_SHARE
+
+    values, _ = wide_to_matrix(df_wide)
+    result = BaselineForecaster().forecast(df_wide).to_frame()
+
+    scale = np.maximum(np.abs(result["forecast"].to_numpy()), np.abs(values).mean(axis=1))
+    width = (result["upper"] - result["lower"]).to_numpy()
+    result["interval_width"] = np.where(scale > 0, width / np.where(scale > 0, scale, 1), 0.0)
+    if stats is None:
+        stats = analyze_matrix(values, index=df_wide.index)
+    result["volatility"] = stats["volatility"].to_numpy()
+    result["structural_break"] = detect_structural_breaks(values)
+
+    # Hard signals dominate the ranking, width orders the rest
+    result["score"] = (
+        result["interval_width"]
+        + result["structural_break"].astype(float)
+        + (result["volatility"] == "high").astype(float)
+    )
+    needs_llm = (
+        (result["interval_width"] > max_interval_width)
+        | result["structural_break"]
+        | (result["volatility"] == "high")
+    )
+    if max_llm_share < 1:
+        limit = int(np.ceil(max_llm_share * len(result)))
+        top = result.loc[needs_llm, "score"].nlargest(limit).index
+        needs_llm = result.index.isin(top)
+    result["route"] = np.where(needs_llm, "llm", "baseline")
+    return result
+
+
+def baseline_justification(row: pd.Series) -> str:
+    """Justification text for a category forecast by the baseline."""
+    breaks = "recent structural break" if row["structural_break"] else "no recent structural break"
+    return (
+        f"Statistical baseline ({row['method']}): {row['forecast']:,.0f}, "
+        f"interval {row['lower']:,.0f} to {row['upper']:,.0f}. "
+        f"Volatility {row['volatility']}, {breaks}."
+    )
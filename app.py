@@ -2,11 +2,16 @@
 Cash Flow Planner v2.0 - Streamlit Application
 Driver-based forecasting with AI agents and scenario modeling
 """
+import sys
+import time
+import uuid
+
 import streamlit as st
 import pandas as pd
 from io import BytesIO
 
-from core.io_historical import load_history_from_file, get_data_summary
+from core.io_historical import get_data_summary
+from core.history_cache import load_history_cached
 from core.db import init_db, save_scenario, get_scenarios_list, get_scenario_lines
 from core.data_transform import pivot_to_wide_format, add_forecast_columns, get_next_month_name
 
@@ -20,16 +25,41 @@ st.set_page_config(
     layout="wide"
 )
 
+# Identifies this browser session to the LLM request scheduler
+st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+
+def register_ai_session():
+    """Attributes the following AI calls to this browser session (fair queuing)."""
+    from ai_agents.scheduler import set_session
+
+    set_session(st.session_state['session_id'])
+
+
+def current_forecast_context():
+    """Drivers and last month's revenue for the AI forecast tools (None before a driver forecast)."""
+    if 'forecast_drivers' not in st.session_state or 'df_history' not in st.session_state:
+        return None
+    from ai_agents.tools import ForecastToolContext
+
+    df_hist = st.session_state['df_history']
+    monthly = df_hist.groupby(df_hist['date'].dt.to_period('M'))['amount'].sum()
+    return ForecastToolContext(
+        drivers=st.session_state['forecast_drivers'],
+        last_revenue=float(monthly.iloc[-1]),
+    )
+
 # Header
 st.title("💰 Cash Flow Planner v2.0")
 st.markdown("Driver-based forecasting with AI")
 
 # Create tabs
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📊 Forecast",
     "📈 Drivers & Analysis",
     "🎯 Scenarios",
-    "📜 History"
+    "📜 History",
+    "🛠 Admin"
 ])
 
 # === TAB 1: FORECAST (original functionality preserved) ===
@@ -46,10 +76,14 @@ with tab1:
         try:
             # Load data
             with st.spinner("Loading data..."):
-                df_history = load_history_from_file(uploaded_file)
+                df_history = load_history_cached(uploaded_file)
 
             # Show statistics
             st.success(f"Loaded {len(df_history)} records")
+            load_report = df_history.attrs.get('load_report')
+            if load_report:
+                stages = ", ".join(f"{stage} {ms:.0f} ms" for stage, ms in load_report['timings_ms'].items())
+                st.caption(f"Read via {load_report['path']} ({stages})")
 
             summary = get_data_summary(df_history)
 
@@ -70,14 +104,16 @@ with tab1:
             next_month = get_next_month_name(df_history)
 
             # Check if there's already edited data in session_state
-            if 'edited_df' in st.session_state and 'last_uploaded_file' in st.session_state:
-                if st.session_state['last_uploaded_file'] == uploaded_file.name:
-                    df_display = st.session_state['edited_df']
-                else:
-                    df_display = add_forecast_columns(df_wide, next_month)
-                    st.session_state['last_uploaded_file'] = uploaded_file.name
+            if 'edited_df' in st.session_state and 'last_uploaded_file' in st.session_state \
+                    and st.session_state['last_uploaded_file'] == uploaded_file.name:
+                df_display = st.session_state['edited_df']
             else:
-                df_display = add_forecast_columns(df_wide, next_month)
+                # Pre-fill the forecast with the statistical baseline
+                from forecasting.baseline import baseline_forecast
+
+                baseline = baseline_forecast(df_wide)
+                df_display = add_forecast_columns(df_wide, next_month, baseline['forecast'])
+                df_display[f"{next_month}_Comments"] = "Baseline: " + baseline['method']
                 st.session_state['last_uploaded_file'] = uploaded_file.name
 
             # Save in session_state
@@ -127,27 +163,58 @@ with tab1:
             st.divider()
 
             # AI Forecast button
+            use_triage = st.checkbox(
+                "Send only uncertain categories to AI",
+                value=True,
+                help="Categories the statistical baseline forecasts confidently keep the baseline",
+            )
+            use_batch = st.checkbox(
+                "Batch several categories per AI request",
+                value=False,
+                help="Fewer, larger requests: lower prompt overhead for long category lists",
+            )
             if st.button("Calculate AI Forecast", type="primary", use_container_width=True):
                 try:
-                    with st.spinner("AI agent is analyzing data..."):
-                        from ai_agents.forecast_agent import build_cashflow_forecast
-
-                        df_wide_for_forecast = pivot_to_wide_format(df_history)
-                        last_month = get_next_month_name(df_history, 'date')
-                        forecast_df = build_cashflow_forecast(df_wide_for_forecast, last_month)
+                    from ai_agents.forecast_agent import iter_cashflow_forecast
+                    register_ai_session()
 
-                        updated_df = edited_df.copy()
-                        for idx, category in enumerate(forecast_df['category']):
-                            category_idx = updated_df[updated_df['category'] == category].index
-                            if len(category_idx) > 0:
-                                updated_df.loc[category_idx[0], forecast_col] = forecast_df.loc[idx, 'ai_forecast']
-                                updated_df.loc[category_idx[0], comment_col] = forecast_df.loc[idx, 'ai_comments']
+                    df_wide_for_forecast = pivot_to_wide_format(df_history)
+                    updated_df = edited_df.copy()
+                    positions = {category: idx for idx, category in zip(updated_df.index, updated_df['category'])}
 
-                        updated_df[total_col] = updated_df[forecast_col] + updated_df[adjustment_col]
-                        st.session_state['edited_df'] = updated_df
+                    progress = st.progress(0.0, text="AI agent is analyzing data...")
+                    # Clicking Cancel reruns the script, which stops the stream;
+                    # rows finished so far are already in session_state
+                    st.button("Cancel", key="cancel_ai_forecast")
+                    live_table = st.empty()
 
-                        st.success(f"Forecast complete! Updated {len(forecast_df)} categories")
-                        st.rerun()
+                    stream = iter_cashflow_forecast(df_wide_for_forecast, triage=use_triage, batch=use_batch)
+                    last_refresh = 0.0
+                    try:
+                        for update in stream:
+                            idx = positions.get(update.category)
+                            if idx is not None:
+                                updated_df.loc[idx, forecast_col] = update.amount
+                                updated_df.loc[idx, comment_col] = update.justification
+                                updated_df.loc[idx, total_col] = update.amount + updated_df.loc[idx, adjustment_col]
+                            st.session_state['edited_df'] = updated_df
+
+                            progress.progress(
+                                update.done / update.total,
+                                text=f"{update.done}/{update.total} categories: {update.category}",
+                            )
+                            # Redraw the table at most a few times per second
+                            if time.monotonic() - last_refresh > 0.3 or update.done == update.total:
+                                last_refresh = time.monotonic()
+                                live_table.dataframe(
+                                    updated_df[['category', forecast_col, comment_col]],
+                                    hide_index=True, use_container_width=True,
+                                )
+                    finally:
+                        stream.close()
+
+                    st.success(f"Forecast complete! Updated {len(df_wide_for_forecast)} categories")
+                    st.rerun()
 
                 except Exception as e:
                     import traceback
@@ -212,8 +279,37 @@ with tab2:
 
     from ui.driver_input import render_driver_input_form
 
+    # Calibrate drivers from the loaded history
+    if 'df_history' in st.session_state:
+        with st.expander("🎯 Calibrate drivers from history"):
+            categories = sorted(st.session_state['df_history']['category'].unique())
+            revenue_categories = st.multiselect(
+                "Revenue categories", categories,
+                help="Leave empty to treat all inflows as revenue",
+            )
+            cogs_categories = st.multiselect("COGS categories", categories)
+
+            if st.button("Calibrate", use_container_width=True):
+                from drivers.calibration import estimate_driver_table
+
+                row = estimate_driver_table(
+                    st.session_state['df_history'],
+                    group_col=None,
+                    revenue_categories=revenue_categories or None,
+                    cogs_categories=cogs_categories or None,
+                ).iloc[0]
+                # Pre-fill only what the history implies; keep the rest as entered
+                st.session_state['calibrated_drivers'] = {
+                    'working_capital': {},
+                    'revenue': {
+                        k: row[k] for k in ('revenue_growth_pct', 'gross_margin_pct', 'seasonality_factors')
+                        if isinstance(row[k], list) or pd.notna(row[k])
+                    },
+                }
+                st.success("Drivers calibrated — values below are pre-filled from history")
+
     # Render driver input form
-    drivers_dict = render_driver_input_form()
+    drivers_dict = render_driver_input_form(st.session_state.get('calibrated_drivers'))
 
     # Save drivers to session state
     st.session_state['current_drivers'] = drivers_dict
@@ -243,6 +339,7 @@ with tab2:
                     rev = RevenueDrivers(
                         revenue_growth_pct=drivers_dict['revenue']['revenue_growth_pct'],
                         gross_margin_pct=drivers_dict['revenue']['gross_margin_pct'],
+                        seasonality_factors=drivers_dict['revenue'].get('seasonality_factors'),
                     )
                     capex = None
                     if drivers_dict.get('capex'):
@@ -293,6 +390,7 @@ with tab2:
         try:
             with st.spinner("AI is analyzing drivers..."):
                 from ai_agents.driver_agent import analyze_drivers_sync
+                register_ai_session()
 
                 analysis = analyze_drivers_sync(
                     drivers={
@@ -301,6 +399,7 @@ with tab2:
                         'dio_days': drivers_dict['working_capital']['dio_days'],
                     },
                     industry=drivers_dict.get('industry', 'services'),
+                    forecast_context=current_forecast_context(),
                 )
                 st.session_state['driver_analysis'] = analysis
 
@@ -314,6 +413,61 @@ with tab2:
         from ui.dashboard import render_driver_analysis_results
         render_driver_analysis_results(st.session_state['driver_analysis'])
 
+    st.divider()
+
+    # Full AI analysis: forecast, driver analysis, scenarios and explanation in parallel
+    if st.button("Full AI Analysis", use_container_width=True):
+        if 'forecast_drivers' not in st.session_state:
+            st.warning("Calculate the driver-based forecast first")
+        else:
+            try:
+                with st.spinner("Running forecast, driver analysis, scenarios and explanation..."):
+                    from ai_agents.orchestrator import run_full_analysis_sync
+                    import config
+                    register_ai_session()
+
+                    run = run_full_analysis_sync(
+                        st.session_state['df_history'],
+                        st.session_state['forecast_drivers'],
+                        industry=drivers_dict.get('industry', 'services'),
+                        periods=config.DEFAULT_FORECAST_PERIODS,
+                    )
+                    outputs = run.outputs
+                    if 'forecast' in outputs:
+                        st.session_state['driver_forecast_df'] = outputs['forecast']
+                    if 'driver_analysis' in outputs:
+                        st.session_state['driver_analysis'] = outputs['driver_analysis']
+                    if 'scenario_suggestions' in outputs:
+                        st.session_state['ai_scenarios'] = outputs['scenario_suggestions']
+                        st.session_state.pop('ai_scenario_results', None)
+                    if 'scenario_evaluation' in outputs:
+                        st.session_state['ai_scenario_results'] = outputs['scenario_evaluation']
+                    if 'explanation' in outputs:
+                        st.session_state['forecast_explanation'] = outputs['explanation']
+                    st.session_state['analysis_run'] = run
+
+            except Exception as e:
+                import traceback
+                st.error(f"Error: {str(e)}")
+                with st.expander("Details"):
+                    st.code(traceback.format_exc())
+
+    if 'forecast_explanation' in st.session_state:
+        from ui.dashboard import render_forecast_explanation
+        render_forecast_explanation(st.session_state['forecast_explanation'])
+
+    if 'analysis_run' in st.session_state:
+        run = st.session_state['analysis_run']
+        for node, error in run.errors.items():
+            st.error(f"{node}: {error}")
+        with st.expander(
+            f"Timing: {run.wall_ms / 1000:.1f}s wall, "
+            f"{run.critical_path_ms / 1000:.1f}s critical path, "
+            f"{run.sum_ms / 1000:.1f}s sequential"
+        ):
+            st.caption("Critical path: " + " → ".join(run.critical_path))
+            st.dataframe(run.timings, use_container_width=True, hide_index=True)
+
 
 # === TAB 3: SCENARIOS ===
 with tab3:
@@ -401,6 +555,7 @@ with tab3:
             try:
                 with st.spinner("AI is generating scenario suggestions..."):
                     from ai_agents.scenario_agent import suggest_scenarios_sync
+                    register_ai_session()
 
                     d = st.session_state['current_drivers']
                     suggestions = suggest_scenarios_sync(
@@ -413,8 +568,10 @@ with tab3:
                         historical_summary={
                             'months_analyzed': st.session_state.get('df_history', pd.DataFrame()).shape[0],
                         },
+                        forecast_context=current_forecast_context(),
                     )
                     st.session_state['ai_scenarios'] = suggestions
+                    st.session_state.pop('ai_scenario_results', None)
 
             except Exception as e:
                 import traceback
@@ -438,6 +595,52 @@ with tab3:
                 for u in suggestions.key_uncertainties:
                     st.markdown(f"- {u}")
 
+            with_mc = st.checkbox("Include Monte Carlo per scenario", value=False)
+            if st.button("Evaluate AI Scenarios", use_container_width=True):
+                if 'df_history' not in st.session_state:
+                    st.warning("Upload historical data first")
+                elif 'forecast_drivers' not in st.session_state:
+                    st.warning("Calculate the driver-based forecast first")
+                else:
+                    try:
+                        from ai_agents.scenario_agent import evaluate_suggestions
+                        import config
+
+                        df_hist = st.session_state['df_history']
+                        monthly = df_hist.groupby(
+                            df_hist['date'].dt.to_period('M')
+                        )['amount'].sum().reset_index()
+                        monthly.columns = ['period', 'revenue']
+                        monthly['revenue'] = monthly['revenue'].astype(float)
+
+                        results, rejected = evaluate_suggestions(
+                            suggestions,
+                            st.session_state['forecast_drivers'],
+                            monthly,
+                            periods=config.DEFAULT_FORECAST_PERIODS,
+                            n_simulations=config.MONTE_CARLO_SIMULATIONS if with_mc else 0,
+                        )
+                        st.session_state['ai_scenario_results'] = (results, rejected)
+                    except Exception as e:
+                        import traceback
+                        st.error(f"Error: {str(e)}")
+                        with st.expander("Details"):
+                            st.code(traceback.format_exc())
+
+            if 'ai_scenario_results' in st.session_state:
+                from ui.scenario_builder import render_scenario_comparison
+
+                results, rejected = st.session_state['ai_scenario_results']
+                render_scenario_comparison(results)
+                for name, result in results.items():
+                    for warning in result.get('warnings', []):
+                        st.warning(f"{name}: {warning}")
+                    if 'monte_carlo' in result:
+                        mc = result['monte_carlo']
+                        st.caption(f"{name}: 90% FCF range {mc['p5']:,.0f} — {mc['p95']:,.0f}")
+                for name, reason in rejected.items():
+                    st.error(f"{name} not evaluated: {reason}")
+
 
 # === TAB 4: HISTORY ===
 with tab4:
@@ -501,3 +704,40 @@ with tab4:
 
     except Exception as e:
         st.error(f"Error loading history: {str(e)}")
+
+
+# === TAB 5: ADMIN ===
+with tab5:
+    st.header("Admin")
+
+    # The AI modules are only loaded once an AI feature was used
+    if 'ai_agents.telemetry' not in sys.modules:
+        st.info("No AI calls in this process yet")
+    else:
+        try:
+            from ai_agents.cache import get_cache
+            from ai_agents.prompting import summarize_prompt_metrics
+            from ai_agents.scheduler import get_scheduler
+            from ai_agents.telemetry import get_telemetry
+            from ai_agents.tools import tool_latency_summary
+            from ui.admin_panel import render_admin_panel
+
+            telemetry = get_telemetry()
+            if telemetry is None:
+                st.info("Telemetry is disabled (TELEMETRY_ENABLED=false)")
+            else:
+                scheduler, cache = get_scheduler(), get_cache()
+                render_admin_panel(
+                    telemetry.summary(),
+                    telemetry.histograms(),
+                    prompt_summary=summarize_prompt_metrics(),
+                    tool_summary=tool_latency_summary(),
+                    scheduler_metrics=scheduler.metrics() if scheduler else None,
+                    cache_stats=cache.stats() if cache else None,
+                )
+                if st.button("Export Prometheus metrics"):
+                    path = telemetry.export_prometheus()
+                    st.success(f"Written to {path}" if path else "TELEMETRY_PROMETHEUS_PATH is not set")
+
+        except Exception as e:
+            st.error(f"Error loading telemetry: {str(e)}")
@@ -22,6 +22,19 @@ FORECAST_LOOKBACK_MONTHS = int(os.getenv("FORECAST_LOOKBACK_MONTHS", "3"))
 HIST_COL_DATE = os.getenv("HIST_COL_DATE", "date")
 HIST_COL_CATEGORY = os.getenv("HIST_COL_CATEGORY", "category")
 HIST_COL_AMOUNT = os.getenv("HIST_COL_AMOUNT", "amount")
+# Encoding for CSV files that are not valid UTF-8
+HIST_CSV_FALLBACK_ENCODING = os.getenv("HIST_CSV_FALLBACK_ENCODING", "cp1251")
+
+# Long-format CSVs above this size (MB) are streamed in chunks and
+# pre-aggregated to monthly totals per category
+HIST_STREAM_MIN_MB = float(os.getenv("HIST_STREAM_MIN_MB", "100"))
+HIST_CSV_CHUNK_ROWS = int(os.getenv("HIST_CSV_CHUNK_ROWS", "1000000"))
+
+# === History Cache Configuration ===
+# Normalized uploads kept as Arrow files keyed by content hash (needs pyarrow)
+HISTORY_CACHE_ENABLED = os.getenv("HISTORY_CACHE_ENABLED", "true").lower() == "true"
+HISTORY_CACHE_DIR = os.getenv("HISTORY_CACHE_DIR", ".cache/history")
+HISTORY_CACHE_MAX_MB = float(os.getenv("HISTORY_CACHE_MAX_MB", "500"))
 
 # === AI Agent Configuration ===
 # Model for forecasting
@@ -30,9 +43,98 @@ FORECAST_MODEL = "gpt-4o-mini"
 # Generation temperature (0 = deterministic, 1 = creative)
 FORECAST_TEMPERATURE = 0.2
 
+# Concurrent per-category LLM calls and per-call timeout (seconds)
+FORECAST_MAX_CONCURRENCY = int(os.getenv("FORECAST_MAX_CONCURRENCY", "16"))
+FORECAST_CALL_TIMEOUT = float(os.getenv("FORECAST_CALL_TIMEOUT", "60"))
+
+# Batched forecasting: token budget per request and expected output tokens per category
+FORECAST_BATCH_TOKEN_BUDGET = int(os.getenv("FORECAST_BATCH_TOKEN_BUDGET", "4000"))
+FORECAST_BATCH_OUTPUT_TOKENS = int(os.getenv("FORECAST_BATCH_OUTPUT_TOKENS", "80"))
+
+# === Bulk Forecast Job Configuration ===
+# Queue items loaded and forecast per step, results per bulk checkpoint write
+FORECAST_JOB_CHUNK_SIZE = int(os.getenv("FORECAST_JOB_CHUNK_SIZE", "500"))
+FORECAST_JOB_CHECKPOINT_ITEMS = int(os.getenv("FORECAST_JOB_CHECKPOINT_ITEMS", "50"))
+# Attempts per item before a failed item keeps its fallback value
+FORECAST_JOB_MAX_ATTEMPTS = int(os.getenv("FORECAST_JOB_MAX_ATTEMPTS", "3"))
+# Jittered exponential backoff before failed items are retried (seconds)
+FORECAST_JOB_RETRY_BASE_DELAY = float(os.getenv("FORECAST_JOB_RETRY_BASE_DELAY", "5"))
+FORECAST_JOB_RETRY_MAX_DELAY = float(os.getenv("FORECAST_JOB_RETRY_MAX_DELAY", "60"))
+
+# === Prompt Configuration ===
+# Most recent points sent verbatim; the rest of a series goes into a stats digest
+PROMPT_MAX_POINTS = int(os.getenv("PROMPT_MAX_POINTS", "12"))
+
+# Token budget per agent message
+PROMPT_TOKEN_BUDGETS = {
+    "forecast": int(os.getenv("PROMPT_BUDGET_FORECAST", "400")),
+    "driver": int(os.getenv("PROMPT_BUDGET_DRIVER", "1000")),
+    "explainer": int(os.getenv("PROMPT_BUDGET_EXPLAINER", "3000")),
+    "scenario": int(os.getenv("PROMPT_BUDGET_SCENARIO", "2000")),
+}
+
 # === Driver-Based Forecasting Configuration ===
 # Default forecast periods (months)
 DEFAULT_FORECAST_PERIODS = int(os.getenv("DEFAULT_FORECAST_PERIODS", "12"))
 
 # Monte Carlo simulation count
 MONTE_CARLO_SIMULATIONS = int(os.getenv("MONTE_CARLO_SIMULATIONS", "1000"))
+
+# === Short-Term Cash Forecast Configuration ===
+# Rolling cash forecast horizon (weekly buckets)
+CASH_FORECAST_WEEKS = int(os.getenv("CASH_FORECAST_WEEKS", "13"))
+
+# === Forecast Triage Configuration ===
+# Relative baseline interval width above which a category goes to the LLM
+TRIAGE_MAX_INTERVAL_WIDTH = float(os.getenv("TRIAGE_MAX_INTERVAL_WIDTH", "0.25"))
+
+# Maximum share of categories sent to the LLM (0-1)
+TRIAGE_MAX_LLM_SHARE = float(os.getenv("TRIAGE_MAX_LLM_SHARE", "0.1"))
+
+# === LLM Request Scheduler Configuration ===
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+# Rate limits shared by all sessions of the process
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+# Completion tokens reserved per request when checking the token limit
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "200"))
+
+# === Agent Call Resilience Configuration ===
+# Seconds for a whole agent call, retries included
+AGENT_CALL_DEADLINE = float(os.getenv("AGENT_CALL_DEADLINE", "60"))
+# Retries after a failed attempt, with jittered exponential backoff (seconds)
+AGENT_MAX_RETRIES = int(os.getenv("AGENT_MAX_RETRIES", "2"))
+AGENT_RETRY_BASE_DELAY = float(os.getenv("AGENT_RETRY_BASE_DELAY", "0.5"))
+AGENT_RETRY_MAX_DELAY = float(os.getenv("AGENT_RETRY_MAX_DELAY", "8"))
+# Duplicate a request still running after this latency percentile
+AGENT_HEDGE_ENABLED = os.getenv("AGENT_HEDGE_ENABLED", "true").lower() == "true"
+AGENT_HEDGE_PERCENTILE = float(os.getenv("AGENT_HEDGE_PERCENTILE", "95"))
+AGENT_HEDGE_MIN_SAMPLES = int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", "20"))
+# Consecutive failed calls that open an agent's circuit, and seconds until a trial call
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# === AI Response Cache Configuration ===
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", ".cache/ai_responses.db")
+# Entries kept in memory, disk entry lifetime (hours) and disk size limit (MB)
+AI_CACHE_MEMORY_ITEMS = int(os.getenv("AI_CACHE_MEMORY_ITEMS", "512"))
+AI_CACHE_TTL_HOURS = float(os.getenv("AI_CACHE_TTL_HOURS", "168"))
+AI_CACHE_MAX_MB = float(os.getenv("AI_CACHE_MAX_MB", "50"))
+
+# === Agent Telemetry Configuration ===
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+# Calls kept for the rolling p50/p95/p99 aggregates
+TELEMETRY_WINDOW = int(os.getenv("TELEMETRY_WINDOW", "5000"))
+# Every call is appended to the JSONL file; aggregates are rewritten to the
+# Prometheus text file at most every TELEMETRY_EXPORT_SECONDS ("" disables a file)
+TELEMETRY_JSONL_PATH = os.getenv("TELEMETRY_JSONL_PATH", ".cache/agent_calls.jsonl")
+# The JSONL file is rotated to <path>.1 (replacing the previous one) at this size
+TELEMETRY_JSONL_MAX_MB = float(os.getenv("TELEMETRY_JSONL_MAX_MB", "10"))
+TELEMETRY_PROMETHEUS_PATH = os.getenv("TELEMETRY_PROMETHEUS_PATH", ".cache/agent_metrics.prom")
+TELEMETRY_EXPORT_SECONDS = float(os.getenv("TELEMETRY_EXPORT_SECONDS", "15"))
+# USD per 1M (prompt, completion) tokens, for cost estimates
+LLM_PRICES_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
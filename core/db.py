@@ -1,12 +1,13 @@
 """
 Database operations module
 """
-from sqlalchemy import create_engine
+import json
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker, Session
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from datetime import datetime
 
-from core.models import Base, Scenario, ScenarioLine, ScenarioDrivers
+from core.models import Base, Scenario, ScenarioLine, ScenarioDrivers, ForecastJob, ForecastJobItem
 import config
 
 
@@ -206,3 +207,239 @@ def get_scenario_drivers(scenario_id: int) -> Optional[Dict]:
 
     finally:
         db.close()
+
+
+def _job_dict(job: ForecastJob) -> Dict:
+    return {
+        'id': job.id,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+        'status': job.status,
+        'description': job.description or "",
+        'options': json.loads(job.options or "{}"),
+        'total_items': job.total_items,
+        'done_items': job.done_items,
+        'failed_items': job.failed_items,
+    }
+
+
+def create_forecast_job(
+    items: List[Dict],
+    options: Optional[Dict[str, Any]] = None,
+    description: Optional[str] = None,
+) -> int:
+    """
+    Create a bulk forecast job with its work queue (atomically)
+
+    Args:
+        items: List of dictionaries with fields:
+            - item_key (unique per job; later duplicates are skipped)
+            - entity (optional)
+            - category
+            - history (list of monthly values)
+        options: Job settings stored with the job (JSON-serializable)
+        description: Job description
+
+    Returns:
+        ID of created job
+    """
+    unique = {}
+    for item in items:
+        unique.setdefault(item['item_key'], item)
+
+    db = get_db()
+    try:
+        now = datetime.utcnow()
+        job = ForecastJob(
+            created_at=now,
+            updated_at=now,
+            status="queued",
+            description=description,
+            options=json.dumps(options or {}),
+            total_items=len(unique),
+        )
+        db.add(job)
+        db.flush()  # Get job ID
+
+        db.bulk_insert_mappings(ForecastJobItem, [
+            {
+                'job_id': job.id,
+                'item_key': key,
+                'entity': item.get('entity'),
+                'category': item['category'],
+                'history': json.dumps(item['history']),
+                'status': "pending",
+                'attempts': 0,
+            }
+            for key, item in unique.items()
+        ])
+
+        db.commit()
+        return job.id
+
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+
+def get_forecast_job(job_id: int) -> Optional[Dict]:
+    """
+    Get a forecast job with its progress counters
+
+    Returns:
+        Dictionary with job data or None if the job doesn't exist
+    """
+    db = get_db()
+    try:
+        job = db.get(ForecastJob, job_id)
+        return _job_dict(job) if job is not None else None
+    finally:
+        db.close()
+
+
+def get_forecast_jobs_list() -> List[Dict]:
+    """Get list of all forecast jobs, newest first"""
+    db = get_db()
+    try:
+        jobs = db.query(ForecastJob).order_by(ForecastJob.created_at.desc()).all()
+        return [_job_dict(job) for job in jobs]
+    finally:
+        db.close()
+
+
+def set_forecast_job_status(job_id: int, status: str) -> None:
+    """Set a forecast job's status"""
+    db = get_db()
+    try:
+        db.query(ForecastJob).filter(ForecastJob.id == job_id).update(
+            {'status': status, 'updated_at': datetime.utcnow()}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_pending_job_items(job_id: int, limit: int, max_attempts: int) -> List[Dict]:
+    """
+    Get the next items of a job still to forecast
+
+    Pending items and failed items with fewer than `max_attempts` attempts;
+    fewest attempts first (new items before retries), then in queue order.
+
+    Returns:
+        List of dictionaries with id, item_key, entity, category, history, attempts
+    """
+    db = get_db()
+    try:
+        items = db.query(ForecastJobItem).filter(
+            ForecastJobItem.job_id == job_id,
+            ForecastJobItem.status.in_(("pending", "failed")),
+            ForecastJobItem.attempts < max_attempts,
+        ).order_by(ForecastJobItem.attempts, ForecastJobItem.id).limit(limit).all()
+
+        return [
+            {
+                'id': item.id,
+                'item_key': item.item_key,
+                'entity': item.entity,
+                'category': item.category,
+                'history': json.loads(item.history),
+                'attempts': item.attempts,
+            }
+            for item in items
+        ]
+
+    finally:
+        db.close()
+
+
+def requeue_failed_job_items(job_id: int) -> None:
+    """Give a job's failed items a fresh set of attempts"""
+    db = get_db()
+    try:
+        db.query(ForecastJobItem).filter(
+            ForecastJobItem.job_id == job_id,
+            ForecastJobItem.status == "failed",
+        ).update({'status': "pending", 'attempts': 0}, synchronize_session=False)
+        db.query(ForecastJob).filter(ForecastJob.id == job_id).update(
+            {'failed_items': 0, 'updated_at': datetime.utcnow()}
+        )
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+
+def save_forecast_job_results(job_id: int, results: List[Dict]) -> None:
+    """
+    Write a checkpoint of job results in one transaction
+
+    Args:
+        results: List of dictionaries with fields:
+            - id (item ID)
+            - status ("done" or "failed")
+            - attempts
+            - forecast_amount
+            - justification
+            - source
+    """
+    if not results:
+        return
+    db = get_db()
+    try:
+        now = datetime.utcnow()
+        db.bulk_update_mappings(ForecastJobItem, [{**result, 'updated_at': now} for result in results])
+
+        counts = dict(
+            db.query(ForecastJobItem.status, func.count(ForecastJobItem.id))
+            .filter(ForecastJobItem.job_id == job_id)
+            .group_by(ForecastJobItem.status)
+            .all()
+        )
+        db.query(ForecastJob).filter(ForecastJob.id == job_id).update({
+            'done_items': counts.get("done", 0),
+            'failed_items': counts.get("failed", 0),
+            'updated_at': now,
+        })
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+
+def get_forecast_job_items(job_id: int) -> List[Dict]:
+    """
+    Get all items of a job with their results
+
+    Returns:
+        List of dictionaries with item data, in queue order
+    """
+    db = get_db()
+    try:
+        items = db.query(ForecastJobItem).filter(
+            ForecastJobItem.job_id == job_id
+        ).order_by(ForecastJobItem.id).all()
+
+        return [
+            {
+                'entity': item.entity,
+                'category': item.category,
+                'status': item.status,
+                'attempts': item.attempts,
+                'forecast_amount': item.forecast_amount,
+                'justification': item.justification,
+                'source': item.source,
+            }
+            for item in items
+        ]
+
+    finally:
+        db.close()
@@ -0,0 +1,192 @@
+"""
+Content-addressed on-disk cache of normalized history
+
+Uploaded files are keyed by a SHA-256 of their bytes and the loader
+settings; the normalized
+(date, category, amount) frame is stored as an uncompressed Arrow IPC
+(Feather) file, which later loads memory-map instead of re-parsing the
+workbook. The cache directory is bounded in size; the least recently
+used files are evicted first.
+"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import pandas as pd
+
+import config
+from core.io_historical import load_history_from_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - the cache is skipped without pyarrow
+    pa = feather = None
+
+# Bump when the normalized frame changes, to invalidate cached files
+CACHE_FORMAT_VERSION = "2"
+
+# Bytes hashed per read, so large files are never fully loaded to hash them
+_HASH_CHUNK_BYTES = 2**20
+
+
+def _loader_settings() -> bytes:
+    """Settings that change the loaded frame (column names, streaming to monthly totals)"""
+    return "|".join([
+        CACHE_FORMAT_VERSION,
+        config.HIST_COL_DATE,
+        config.HIST_COL_CATEGORY,
+        config.HIST_COL_AMOUNT,
+        config.HIST_CSV_FALLBACK_ENCODING,
+        repr(config.HIST_STREAM_MIN_MB),
+    ]).encode()
+
+
+def file_key(file_path_or_buffer: Union[str, bytes]) -> str:
+    """
+    Cache key of a file: SHA-256 of the loader settings and the content
+
+    Files are hashed in chunks; buffers are hashed in place and keep
+    their position.
+    """
+    digest = hashlib.sha256(_loader_settings())
+    if isinstance(file_path_or_buffer, str):
+        with open(file_path_or_buffer, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+    elif hasattr(file_path_or_buffer, 'getbuffer'):
+        digest.update(file_path_or_buffer.getbuffer())
+    else:
+        position = file_path_or_buffer.tell()
+        for chunk in iter(lambda: file_path_or_buffer.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+        file_path_or_buffer.seek(position)
+    return digest.hexdigest()
+
+
+class HistoryCache:
+    """Size-bounded LRU directory of Feather files keyed by content hash"""
+
+    def __init__(self, directory: Optional[str] = None, max_mb: Optional[float] = None):
+        self.directory = Path(directory or config.HISTORY_CACHE_DIR)
+        self.max_bytes = (config.HISTORY_CACHE_MAX_MB if max_mb is None else max_mb) * 2**20
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.arrow"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Cached frame (memory-mapped) or None; unreadable files are removed"""
+        path = self._path(key)
+        try:
+            df = feather.read_feather(path, memory_map=True)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, pa.ArrowException) as e:
+            if not isinstance(e, FileNotFoundError):
+                # Truncated or corrupt file: drop it so the next load re-parses
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+        with self._lock:
+            self._counters['hits'] += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """Stores a frame, then evicts least recently used files over the size limit"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        # Uncompressed so reads can memory-map the columns
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        files = sorted(self.directory.glob("*.arrow"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self._counters['evictions'] += 1
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.arrow"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss/eviction counters, number of files and size on disk (MB)"""
+        files = list(self.directory.glob("*.arrow")) if self.directory.exists() else []
+        with self._lock:
+            counters = dict(self._counters)
+        counters['files'] = len(files)
+        counters['size_mb'] = sum(p.stat().st_size for p in files) / 2**20
+        return counters
+
+
+_default_cache: Optional[HistoryCache] = None
+
+
+def get_history_cache() -> Optional[HistoryCache]:
+    """Shared HistoryCache (None when HISTORY_CACHE_ENABLED is off or pyarrow is missing)"""
+    global _default_cache
+    if not config.HISTORY_CACHE_ENABLED or feather is None:
+        return None
+    if _default_cache is None:
+        _default_cache = HistoryCache()
+    return _default_cache
+
+
+def load_history_cached(
+    file_path_or_buffer: Union[str, bytes],
+    cache: Optional[HistoryCache] = None,
+) -> pd.DataFrame:
+    """
+    load_history_from_file() through the history cache
+
+    Like load_history_from_file(), stores the path taken ('cache' on a
+    hit) and per-stage timings (ms) in `df.attrs['load_report']`.
+
+    Args:
+        file_path_or_buffer: File path or buffer (for Streamlit uploaded file)
+        cache: Cache to use (the shared one if None)
+
+    Returns:
+        DataFrame with normalized columns: date, category, amount
+
+    Raises:
+        ValueError: If file format is not supported or data is invalid
+    """
+    cache = cache or get_history_cache()
+    if cache is None:
+        return load_history_from_file(file_path_or_buffer)
+
+    started = time.perf_counter()
+    key = file_key(file_path_or_buffer)
+    hashed = time.perf_counter()
+    df = cache.get(key)
+    if df is not None:
+        df.attrs['load_report'] = {'path': 'cache', 'timings_ms': {
+            'hash': round((hashed - started) * 1000, 1),
+            'read': round((time.perf_counter() - hashed) * 1000, 1),
+        }}
+        return df
+
+    df = load_history_from_file(file_path_or_buffer)
+    report = df.attrs.get('load_report')
+    if report:
+        report['timings_ms'] = {'hash': round((hashed - started) * 1000, 1), **report['timings_ms']}
+    try:
+        cache.put(key, df)
+    except OSError as e:
+        print(f"⚠️ History cache write failed: {e}")
+    return df
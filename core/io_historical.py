@@ -1,12 +1,150 @@
 """
 Module for reading and normalizing historical cash flow data
 """
+import codecs
+import csv
+import importlib.util
+import os
+import time
+import warnings
 import pandas as pd
-from typing import Union
+from pandas.tseries.api import guess_datetime_format
+from typing import Dict, List, Optional, Union
 import config
 
+# Bytes read to detect the file format, CSV encoding and delimiter
+SNIFF_BYTES = 64 * 1024
 
-def load_history_from_file(file_path_or_buffer: Union[str, bytes]) -> pd.DataFrame:
+# Distinct date strings checked when inferring a date format
+DATE_FORMAT_SAMPLE = 1000
+
+_ZIP_MAGIC = b'PK\x03\x04'                           # .xlsx (Office Open XML)
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'   # .xls (OLE2 compound file)
+
+# Fastest available readers; pandas falls back to openpyxl (read-only mode) / xlrd
+_EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+_CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+
+def _source_size_mb(file_path_or_buffer: Union[str, bytes]) -> float:
+    """Size of a file path or uploaded buffer in MB (0 if unknown)"""
+    if isinstance(file_path_or_buffer, str):
+        return os.path.getsize(file_path_or_buffer) / 2**20 if os.path.exists(file_path_or_buffer) else 0.0
+    return getattr(file_path_or_buffer, 'size', 0) / 2**20
+
+
+def _source_name(file_path_or_buffer: Union[str, bytes]) -> str:
+    name = file_path_or_buffer if isinstance(file_path_or_buffer, str) else getattr(file_path_or_buffer, 'name', '')
+    return str(name or '')
+
+
+def _read_head(file_path_or_buffer: Union[str, bytes]) -> bytes:
+    """First SNIFF_BYTES of a file path or buffer (the buffer position is kept)"""
+    if isinstance(file_path_or_buffer, str):
+        with open(file_path_or_buffer, 'rb') as f:
+            return f.read(SNIFF_BYTES)
+    position = file_path_or_buffer.tell()
+    head = file_path_or_buffer.read(SNIFF_BYTES)
+    file_path_or_buffer.seek(position)
+    return head if isinstance(head, bytes) else head.encode()
+
+
+def sniff_format(file_path_or_buffer: Union[str, bytes]) -> Dict[str, Optional[str]]:
+    """
+    Detect how a history file should be parsed
+
+    Excel workbooks are recognized by their magic bytes, so a CSV saved
+    with an .xls extension (or an upload without a name) is still read
+    correctly. For text files the encoding (UTF-8, else
+    HIST_CSV_FALLBACK_ENCODING) and the delimiter are detected from the
+    first SNIFF_BYTES.
+
+    Args:
+        file_path_or_buffer: File path or buffer (for Streamlit uploaded file)
+
+    Returns:
+        Dictionary with format ('xlsx', 'xls' or 'csv') and, for CSV,
+        encoding and delimiter
+
+    Raises:
+        ValueError: If file format is not supported
+    """
+    try:
+        head = _read_head(file_path_or_buffer)
+    except OSError as e:
+        raise ValueError(f"Error reading file: {str(e)}")
+
+    if head.startswith(_ZIP_MAGIC):
+        return {'format': 'xlsx', 'encoding': None, 'delimiter': None}
+    if head.startswith(_OLE_MAGIC):
+        return {'format': 'xls', 'encoding': None, 'delimiter': None}
+
+    name = _source_name(file_path_or_buffer)
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in ('', '.csv', '.txt', '.xlsx', '.xls') or b'\x00' in head:
+        raise ValueError(f"Unsupported file format: {name or 'binary data'}")
+
+    if head.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+        head = head[len(codecs.BOM_UTF8):]
+    else:
+        encoding = 'utf-8'
+    try:
+        # Not final: the sample may end in the middle of a character
+        text = codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+    except UnicodeDecodeError:
+        encoding = config.HIST_CSV_FALLBACK_ENCODING
+        text = head.decode(encoding, errors='replace')
+
+    sample = text[:text.rfind('\n')] if '\n' in text else text
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        delimiter = ','
+    return {'format': 'csv', 'encoding': encoding, 'delimiter': delimiter}
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def infer_date_format(values) -> Optional[str]:
+    """
+    strftime format that parses the most sampled date strings
+
+    Month-first and day-first guesses from the first values are tried in
+    turn, so '01/02/2024' next to '13/01/2024' resolves to day-first;
+    stray malformed values don't prevent a format from being chosen.
+    Chunked readers infer the format once and pass it to every chunk, so
+    all chunks agree on it.
+
+    Args:
+        values: Date strings (NaN entries are skipped)
+
+    Returns:
+        Format string, or None if no guessed format parses any value
+    """
+    sample = pd.Series(pd.Series(values).dropna().astype(str).unique()[:DATE_FORMAT_SAMPLE])
+    candidates: List[str] = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        for value in sample[:20]:
+            for dayfirst in (False, True):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt and fmt not in candidates:
+                    candidates.append(fmt)
+    best, best_parsed = None, 0
+    for fmt in candidates:
+        parsed = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if parsed > best_parsed:
+            best, best_parsed = fmt, parsed
+    return best
+
+
+def load_history_from_file(
+    file_path_or_buffer: Union[str, bytes],
+    chunksize: Optional[int] = None,
+) -> pd.DataFrame:
     """
     Load historical data from Excel or CSV file
 
@@ -14,8 +152,17 @@ def load_history_from_file(file_path_or_buffer: Union[str, bytes]) -> pd.DataFra
     1. Old format (date, category, amount) - long format
     2. New format (rows=items, columns=months) - wide format
 
+    The parser is chosen up front with sniff_format(). Long-format CSVs
+    larger than HIST_STREAM_MIN_MB (or any CSV when `chunksize` is given)
+    are read with load_history_streaming(), which returns monthly totals
+    per category instead of the raw rows.
+
+    The chosen path and per-stage timings (ms) are stored in
+    `df.attrs['load_report']`.
+
     Args:
         file_path_or_buffer: File path or buffer (for Streamlit uploaded file)
+        chunksize: Rows per chunk to force streaming (None = by file size)
 
     Returns:
         DataFrame with normalized columns: date, category, amount
@@ -23,30 +170,52 @@ def load_history_from_file(file_path_or_buffer: Union[str, bytes]) -> pd.DataFra
     Raises:
         ValueError: If file format is not supported or data is invalid
     """
+    started = time.perf_counter()
+    report = sniff_format(file_path_or_buffer)
+    timings = {'sniff': _elapsed_ms(started)}
+    is_csv = report['format'] == 'csv'
 
-    # Determine file type and read
-    try:
-        # If it's a file path
-        if isinstance(file_path_or_buffer, str):
-            if file_path_or_buffer.endswith('.csv'):
-                df = pd.read_csv(file_path_or_buffer)
-            elif file_path_or_buffer.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path_or_buffer)
-            else:
-                raise ValueError(f"Unsupported file format: {file_path_or_buffer}")
-
-        # If it's a buffer (uploaded file from Streamlit)
+    if is_csv and (chunksize or _source_size_mb(file_path_or_buffer) > config.HIST_STREAM_MIN_MB):
+        started = time.perf_counter()
+        try:
+            df = load_history_streaming(
+                file_path_or_buffer, chunksize,
+                delimiter=report['delimiter'], encoding=report['encoding'],
+            )
+        except _NotLongFormat:
+            pass
         else:
-            # Try as Excel first
-            try:
-                df = pd.read_excel(file_path_or_buffer)
-            except:
-                # If that fails, try as CSV
-                file_path_or_buffer.seek(0)  # Return pointer to beginning
-                df = pd.read_csv(file_path_or_buffer)
+            timings['parse'] = _elapsed_ms(started)
+            df.attrs['load_report'] = {**report, 'path': 'csv-stream', 'engine': 'c', 'timings_ms': timings}
+            return df
 
+    # Read with the parser for the detected format
+    started = time.perf_counter()
+    if is_csv:
+        engine = _CSV_ENGINE
+        read_kwargs = {'sep': report['delimiter'], 'encoding': report['encoding'], 'engine': engine}
+        reader = pd.read_csv
+    else:
+        engine = _EXCEL_ENGINE or ('openpyxl' if report['format'] == 'xlsx' else 'xlrd')
+        read_kwargs = {'engine': engine}
+        reader = pd.read_excel
+    position = None if isinstance(file_path_or_buffer, str) else file_path_or_buffer.tell()
+    try:
+        try:
+            df = reader(file_path_or_buffer, **read_kwargs)
+        except ValueError:
+            if engine != 'pyarrow':
+                raise
+            # pyarrow rejects short/ragged rows (e.g. dropped trailing empty
+            # fields) that the C engine fills with NaN
+            if position is not None:
+                file_path_or_buffer.seek(position)
+            engine = read_kwargs['engine'] = 'c'
+            df = reader(file_path_or_buffer, **read_kwargs)
     except Exception as e:
         raise ValueError(f"Error reading file: {str(e)}")
+    timings['parse'] = _elapsed_ms(started)
+    started = time.perf_counter()
 
     # Determine file format
     required_cols_old = {
@@ -129,8 +298,108 @@ def load_history_from_file(file_path_or_buffer: Union[str, bytes]) -> pd.DataFra
     # Sort by date
     df = df.sort_values('date').reset_index(drop=True)
 
+    timings['normalize'] = _elapsed_ms(started)
+    path = f"{report['format']}/{engine}"
+    df.attrs['load_report'] = {**report, 'path': path, 'engine': engine, 'timings_ms': timings}
+
     print(f"✅ Loaded {len(df)} records from period {df['date'].min()} - {df['date'].max()}")
     print(f"   Categories: {df['category'].nunique()}")
+    print(f"   Parsed as {path} in {sum(timings.values()):.0f} ms {timings}")
+
+    return df
+
+
+class _NotLongFormat(ValueError):
+    """The CSV header lacks the date/category/amount columns"""
+
+
+def load_history_streaming(
+    file_path_or_buffer: Union[str, bytes],
+    chunksize: Optional[int] = None,
+    delimiter: str = ',',
+    encoding: Optional[str] = None,
+    date_format: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Load a long-format CSV (date, category, amount) in chunks
+
+    Only the three columns are read, with explicit dtypes, and every chunk
+    is summed to (month, category) right away, so memory grows with the
+    number of category-months rather than with the number of rows. The
+    date format is inferred from the first chunk (see infer_date_format())
+    and used for all chunks; unparseable dates are skipped.
+
+    Args:
+        file_path_or_buffer: CSV file path or buffer
+        chunksize: Rows per chunk (config.HIST_CSV_CHUNK_ROWS if None)
+        delimiter, encoding: CSV dialect (see sniff_format())
+        date_format: strftime format of the date column (inferred if None)
+
+    Returns:
+        DataFrame with normalized columns date (first day of month),
+        category, amount (monthly total), sorted by date and category
+
+    Raises:
+        ValueError: If the file lacks the date/category/amount columns or
+            data is invalid
+    """
+    columns = [config.HIST_COL_DATE, config.HIST_COL_CATEGORY, config.HIST_COL_AMOUNT]
+    try:
+        header = pd.read_csv(file_path_or_buffer, nrows=0, sep=delimiter, encoding=encoding).columns
+        if not isinstance(file_path_or_buffer, str):
+            file_path_or_buffer.seek(0)
+    except Exception as e:
+        raise ValueError(f"Error reading file: {str(e)}")
+    if not set(columns).issubset(header):
+        raise _NotLongFormat(f"CSV must contain columns {columns} for streaming")
+
+    reader = pd.read_csv(
+        file_path_or_buffer,
+        usecols=columns,
+        dtype={config.HIST_COL_DATE: str, config.HIST_COL_CATEGORY: str, config.HIST_COL_AMOUNT: 'float64'},
+        sep=delimiter,
+        encoding=encoding,
+        chunksize=chunksize or config.HIST_CSV_CHUNK_ROWS,
+    )
+
+    partials: List[pd.Series] = []
+    try:
+        for chunk in reader:
+            # A ledger repeats few distinct dates: parse each once
+            codes, dates = pd.factorize(chunk[config.HIST_COL_DATE])
+            if date_format is None:
+                # 'mixed' parses each value on its own when no single format fits
+                date_format = infer_date_format(dates) or 'mixed'
+            months = (
+                pd.to_datetime(pd.Series(dates), format=date_format, errors='coerce')
+                .dt.to_period('M').to_numpy()
+            )
+            month = pd.Series(months[codes], index=chunk.index).where(codes >= 0)
+
+            partials.append(
+                chunk[config.HIST_COL_AMOUNT]
+                .groupby([month, chunk[config.HIST_COL_CATEGORY]], sort=False)
+                .sum(min_count=1)
+            )
+            # Fold the partial sums so only one row per category-month is kept
+            if len(partials) >= 16:
+                partials = [pd.concat(partials).groupby(level=[0, 1], sort=False).sum(min_count=1)]
+    except Exception as e:
+        raise ValueError(f"Error converting data types: {str(e)}")
+
+    if not partials:
+        return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'category': [], 'amount': []})
+
+    totals = pd.concat(partials).groupby(level=[0, 1]).sum(min_count=1).dropna()
+    df = pd.DataFrame({
+        'date': totals.index.get_level_values(0).to_timestamp(),
+        'category': totals.index.get_level_values(1).astype(str),
+        'amount': totals.to_numpy(dtype=float),
+    })
+    df = df.sort_values(['date', 'category']).reset_index(drop=True)
+
+    print(f"✅ Loaded {len(df)} monthly totals from period {df['date'].min()} - {df['date'].max()}")
+    print(f"   Categories: {df['category'].nunique()}")
 
     return df
 
@@ -0,0 +1,177 @@
+"""
+Module for reading open/closed AR and AP invoice ledgers
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Dict, Iterator, Optional, Union
+
+from core.io_historical import infer_date_format
+
+# Normalized column names of an invoice ledger
+LEDGER_COLUMNS = ['invoice_id', 'counterparty', 'amount', 'issue_date', 'due_date', 'paid_date']
+REQUIRED_COLUMNS = {'counterparty', 'amount', 'issue_date', 'due_date'}
+DATE_COLUMNS = ['issue_date', 'due_date', 'paid_date']
+
+
+def _normalize_chunk(
+    chunk: pd.DataFrame,
+    column_map: Dict[str, str],
+    date_format: Optional[str],
+) -> pd.DataFrame:
+    """Rename columns, convert types and drop unusable rows of one chunk"""
+    chunk = chunk.rename(columns=column_map)
+
+    for col in DATE_COLUMNS:
+        if col not in chunk.columns:
+            chunk[col] = pd.NaT
+        elif not pd.api.types.is_datetime64_any_dtype(chunk[col]):
+            chunk[col] = pd.to_datetime(chunk[col], format=date_format, errors='coerce')
+
+    if 'invoice_id' in chunk.columns:
+        chunk['invoice_id'] = chunk['invoice_id'].astype(str)
+    chunk['amount'] = pd.to_numeric(chunk['amount'], errors='coerce')
+    if not isinstance(chunk['counterparty'].dtype, pd.CategoricalDtype):
+        chunk['counterparty'] = chunk['counterparty'].astype(str).astype('category')
+
+    # Invoices without amount or dates cannot be aged
+    chunk = chunk.dropna(subset=['amount', 'issue_date', 'due_date'])
+    return chunk[[c for c in LEDGER_COLUMNS if c in chunk.columns]]
+
+
+def _chunk_date_format(chunk: pd.DataFrame) -> Optional[str]:
+    """Date format shared by the text date columns of a chunk (None if it has no dates)
+
+    Inferred once from the first chunk and reused for the rest, so
+    every chunk is parsed the same way.
+    """
+    values = [chunk[c] for c in DATE_COLUMNS if c in chunk and not pd.api.types.is_datetime64_any_dtype(chunk[c])]
+    values = pd.concat(values).dropna() if values else pd.Series(dtype=object)
+    if values.empty:
+        return None
+    # 'mixed' parses each value on its own when no format fits
+    return infer_date_format(values) or 'mixed'
+
+
+def _read_csv_chunks(
+    file_path_or_buffer: Union[str, bytes],
+    column_map: Dict[str, str],
+    chunksize: int,
+    date_format: Optional[str],
+) -> Iterator[pd.DataFrame]:
+    """Yield raw CSV chunks restricted to ledger columns with explicit dtypes
+
+    Uses the multithreaded pyarrow streaming reader when pyarrow is
+    installed and falls back to pandas chunked reading otherwise.
+    """
+    header = pd.read_csv(file_path_or_buffer, nrows=0).columns
+    if not isinstance(file_path_or_buffer, str):
+        file_path_or_buffer.seek(0)
+
+    usecols = [c for c in header if column_map.get(c, c) in LEDGER_COLUMNS]
+    normalized = {c: column_map.get(c, c) for c in usecols}
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        arrow_types = {
+            'invoice_id': pa.string(),
+            'counterparty': pa.dictionary(pa.int32(), pa.string()),
+            'amount': pa.float64(),
+            # Parsed by _normalize_chunk(), which coerces bad dates to NaT
+            # like the pandas path instead of failing the whole file
+            **{col: pa.string() for col in DATE_COLUMNS},
+        }
+        reader = pa_csv.open_csv(
+            file_path_or_buffer,
+            # ~100 bytes per ledger row
+            read_options=pa_csv.ReadOptions(block_size=chunksize * 100),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types={c: arrow_types[n] for c, n in normalized.items()},
+            ),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+        return
+
+    except ImportError:
+        pass
+
+    dtypes = {'invoice_id': 'str', 'counterparty': 'str', 'amount': 'float64'}
+    yield from pd.read_csv(
+        file_path_or_buffer,
+        usecols=usecols,
+        dtype={c: dtypes[n] for c, n in normalized.items() if n in dtypes},
+        chunksize=chunksize,
+    )
+
+
+def load_invoice_ledger(
+    file_path_or_buffer: Union[str, bytes],
+    column_map: Optional[Dict[str, str]] = None,
+    chunksize: int = 500_000,
+    date_format: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Load an invoice ledger (AR or AP) from CSV, Parquet or Excel
+
+    CSV files are read in chunks with explicit dtypes and every chunk is
+    normalized (dates parsed, counterparty as category) before the next
+    one is read, so peak memory stays close to the size of the result.
+
+    Args:
+        file_path_or_buffer: File path or buffer (for Streamlit uploaded file)
+        column_map: Mapping of file column names to normalized names
+            (invoice_id, counterparty, amount, issue_date, due_date, paid_date)
+        chunksize: Rows per chunk when reading CSV
+        date_format: Optional strftime format of the date columns (inferred
+            from the first chunk if None)
+
+    Returns:
+        DataFrame with columns counterparty (category), amount, issue_date,
+        due_date, paid_date (NaT for open invoices) and invoice_id if present
+
+    Raises:
+        ValueError: If the file format is not supported or required columns are missing
+    """
+    column_map = column_map or {}
+    name = file_path_or_buffer if isinstance(file_path_or_buffer, str) else getattr(file_path_or_buffer, 'name', '')
+
+    chunks = []
+    try:
+        if name.endswith('.parquet'):
+            frames = [pd.read_parquet(file_path_or_buffer)]
+        elif name.endswith(('.xlsx', '.xls')):
+            frames = [pd.read_excel(file_path_or_buffer)]
+        else:
+            frames = _read_csv_chunks(file_path_or_buffer, column_map, chunksize, date_format)
+
+        for frame in frames:
+            missing = REQUIRED_COLUMNS - set(frame.rename(columns=column_map).columns)
+            if missing:
+                raise ValueError(f"Ledger is missing columns: {sorted(missing)}")
+            if date_format is None:
+                date_format = _chunk_date_format(frame.rename(columns=column_map))
+            chunks.append(_normalize_chunk(frame, column_map, date_format))
+
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error reading ledger: {str(e)}")
+
+    if not chunks:
+        raise ValueError("Ledger file is empty")
+
+    # Chunks carry different category sets - unify before concatenating
+    counterparty = union_categoricals([c['counterparty'] for c in chunks])
+    ledger = pd.concat(
+        [c.drop(columns='counterparty') for c in chunks], ignore_index=True
+    )
+    ledger.insert(0 if 'invoice_id' not in ledger.columns else 1, 'counterparty', counterparty)
+
+    open_count = int(ledger['paid_date'].isna().sum())
+    print(f"✅ Loaded {len(ledger)} invoices ({open_count} open)")
+    print(f"   Counterparties: {len(ledger['counterparty'].cat.categories)}")
+
+    return ledger
@@ -2,7 +2,7 @@
 SQLAlchemy models for database
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
@@ -72,3 +72,50 @@ class ScenarioDrivers(Base):
 
     def __repr__(self):
         return f"<ScenarioDrivers(scenario_id={self.scenario_id}, ccc={self.ccc_days})>"
+
+
+class ForecastJob(Base):
+    """Bulk AI forecast job (work queue in forecast_job_items)"""
+    __tablename__ = 'forecast_jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    status = Column(String, nullable=False, default="queued")  # queued, running, paused, completed, completed_with_errors, cancelled
+    description = Column(String, nullable=True)
+    options = Column(Text, nullable=False, default="{}")  # JSON: history columns, batch, triage
+    total_items = Column(Integer, nullable=False, default=0)
+    done_items = Column(Integer, nullable=False, default=0)
+    failed_items = Column(Integer, nullable=False, default=0)
+
+    items = relationship("ForecastJobItem", back_populates="job", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<ForecastJob(id={self.id}, status={self.status}, done={self.done_items}/{self.total_items})>"
+
+
+class ForecastJobItem(Base):
+    """One entity x category of a forecast job"""
+    __tablename__ = 'forecast_job_items'
+    __table_args__ = (
+        UniqueConstraint('job_id', 'item_key'),
+        Index('ix_forecast_job_items_job_status', 'job_id', 'status'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey('forecast_jobs.id'), nullable=False)
+    item_key = Column(String, nullable=False)  # "entity|category"
+    entity = Column(String, nullable=True)
+    category = Column(String, nullable=False)
+    history = Column(Text, nullable=False)  # JSON list of monthly values
+    status = Column(String, nullable=False, default="pending")  # pending, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    forecast_amount = Column(Float, nullable=True)
+    justification = Column(String, nullable=True)
+    source = Column(String, nullable=True)  # 'llm' or 'baseline'
+    updated_at = Column(DateTime, nullable=True)
+
+    job = relationship("ForecastJob", back_populates="items")
+
+    def __repr__(self):
+        return f"<ForecastJobItem(job_id={self.job_id}, key={self.item_key}, status={self.status})>"
@@ -1,7 +1,8 @@
 """
 Financial drivers package for driver-based forecasting.
 
-Contains Pydantic models, calculator, validator, and industry defaults.
+Contains Pydantic models, calculator, validator, industry defaults
+and calibration from history.
 """
 
 from drivers.models import (
@@ -22,6 +23,7 @@ from drivers.calculator import (
 )
 from drivers.validator import validate_drivers
 from drivers.defaults import get_industry_defaults
+from drivers.calibration import calibrate_drivers, estimate_driver_table
 
 __all__ = [
     "Industry",
@@ -38,4 +40,6 @@ __all__ = [
     "calculate_working_capital_from_drivers",
     "validate_drivers",
     "get_industry_defaults",
+    "calibrate_drivers",
+    "estimate_driver_table",
 ]
@@ -0,0 +1,223 @@
+"""
+Automatic driver calibration from historical data.
+
+Estimates revenue growth, gross margin, seasonality factors and (when
+balances are provided) DSO/DPO/DIO for every entity or category of a
+long-format history at once. Estimation is done with grouped sums and
+grouped means, so thousands of series are calibrated in one pass.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from drivers.calculator import DAYS_IN_YEAR
+from drivers.defaults import get_industry_defaults
+from drivers.models import (
+    ForecastDrivers,
+    Industry,
+    RevenueDrivers,
+    WorkingCapitalDrivers,
+)
+
+TOTAL_GROUP = "total"
+
+
+def _monthly_frame(
+    history: pd.DataFrame,
+    group_col: Optional[str],
+    revenue_categories: Optional[Sequence[str]],
+    cogs_categories: Optional[Sequence[str]],
+) -> pd.DataFrame:
+    """Monthly revenue/COGS per group, indexed by (group, month)."""
+    if group_col is not None and group_col not in history.columns:
+        raise ValueError(f"Column '{group_col}' not found in history")
+
+    group = history[group_col].astype(str) if group_col else pd.Series(TOTAL_GROUP, index=history.index)
+    amount = history["amount"].astype(float)
+
+    if group_col == "category":
+        # Every category is its own line: its amounts are the "revenue" series
+        revenue, cogs = amount, pd.Series(np.nan, index=history.index)
+    else:
+        is_revenue = (
+            history["category"].isin(revenue_categories)
+            if revenue_categories is not None else amount > 0
+        )
+        revenue = amount.where(is_revenue, 0.0)
+        cogs = (
+            amount.abs().where(history["category"].isin(cogs_categories), 0.0)
+            if cogs_categories is not None else pd.Series(np.nan, index=history.index)
+        )
+
+    frame = pd.DataFrame({
+        "group": group,
+        "month": history["date"].dt.to_period("M"),
+        "revenue": revenue,
+        "cogs": cogs,
+    })
+    return frame.groupby(["group", "month"]).sum(min_count=1)
+
+
+def _grouped_trend(t: pd.Series, y: pd.Series) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Per-group OLS of y on t from grouped sums: (slope, intercept, mean |y|)."""
+    sums = pd.DataFrame({
+        "n": 1.0, "t": t, "y": y, "ty": t * y, "tt": t * t, "abs_y": y.abs(),
+    }).groupby(level="group").sum()
+    var_t = sums["tt"] - sums["t"] ** 2 / sums["n"]
+    slope = (sums["ty"] - sums["t"] * sums["y"] / sums["n"]) / var_t.where(var_t > 0)
+    intercept = (sums["y"] - slope.fillna(0) * sums["t"]) / sums["n"]
+    return slope, intercept, sums["abs_y"] / sums["n"]
+
+
+def _trend_values(slope: pd.Series, intercept: pd.Series, t: pd.Series) -> np.ndarray:
+    """Fitted trend for every (group, month) row."""
+    group_idx = t.index.get_level_values("group")
+    return (
+        intercept.reindex(group_idx).to_numpy()
+        + slope.fillna(0).reindex(group_idx).to_numpy() * t.to_numpy()
+    )
+
+
+def _seasonal_index(y: pd.Series, trend: np.ndarray, month_of_year: pd.Index) -> pd.DataFrame:
+    """Group x 12 seasonal factors (mean actual/trend per calendar month, sum 12)."""
+    ratio = pd.Series(
+        np.where(trend > 0, y.to_numpy() / np.where(trend > 0, trend, 1), np.nan),
+        index=y.index,
+    )
+    group_idx = y.index.get_level_values("group")
+    seasonal = ratio.groupby([group_idx, month_of_year]).mean().unstack().reindex(columns=range(1, 13))
+    # Calendar months without data get the group's mean factor
+    seasonal = seasonal.T.fillna(seasonal.mean(axis=1)).T
+    return seasonal.div(seasonal.sum(axis=1), axis=0) * 12
+
+
+def estimate_driver_table(
+    history: pd.DataFrame,
+    group_col: Optional[str] = "category",
+    revenue_categories: Optional[Sequence[str]] = None,
+    cogs_categories: Optional[Sequence[str]] = None,
+    balances: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Estimate drivers for every group of a long-format history.
+
+    Args:
+        history: DataFrame with date, category, amount (and group_col).
+        group_col: Column defining the series ('category', an entity
+            column, or None for one total series).
+        revenue_categories: Categories that make up revenue (entity mode);
+            default is all inflows (positive amounts).
+        cogs_categories: Categories that make up COGS (entity mode);
+            without them gross margin is not estimated.
+        balances: Optional DataFrame with date, group_col (unless None) and
+            any of accounts_receivable, accounts_payable, inventory.
+
+    Returns:
+        DataFrame indexed by group with columns months, revenue_growth_pct,
+        gross_margin_pct, dso_days, dpo_days, dio_days (NaN when not
+        estimable) and seasonality_factors (list of 12 or None).
+    """
+    monthly = _monthly_frame(history, group_col, revenue_categories, cogs_categories)
+    month = monthly.index.get_level_values("month")
+    t = pd.Series(month.year * 12 + month.month, index=monthly.index, dtype=float)
+    # Fit on magnitudes: an outflow category growing from -1000 to -1350
+    # has positive growth and gets seasonality like an inflow would
+    y = monthly["revenue"].fillna(0.0).abs()
+
+    slope, intercept, mean_level = _grouped_trend(t, y)
+
+    # Seasonal index: grouped mean of actual / trend by calendar month
+    group_idx = monthly.index.get_level_values("group")
+    seasonal = _seasonal_index(y, _trend_values(slope, intercept, t), month.month)
+    n_months = y.groupby(level="group").size()
+    has_year = (n_months >= 12) & seasonal.notna().all(axis=1).reindex(n_months.index, fill_value=False)
+
+    # Refit the trend on deseasonalized values so seasonal swings do not bias growth
+    factor = seasonal.where(has_year, axis=0).fillna(1.0)
+    lookup = factor.to_numpy()[factor.index.get_indexer(group_idx), month.month - 1]
+    slope, intercept, mean_level = _grouped_trend(t, y / np.where(lookup > 0, lookup, 1.0))
+    seasonal = _seasonal_index(y, _trend_values(slope, intercept, t), month.month)
+
+    table = pd.DataFrame(index=n_months.index)
+    table["months"] = n_months
+    table["revenue_growth_pct"] = (
+        (slope / mean_level.where(mean_level > 0) * 12 * 100).clip(-100, 500)
+    )
+
+    # Gross margin over the whole history
+    totals = monthly.groupby(level="group")[["revenue", "cogs"]].sum(min_count=1)
+    margin = (totals["revenue"] - totals["cogs"]) / totals["revenue"].where(totals["revenue"] > 0) * 100
+    table["gross_margin_pct"] = margin.clip(0, 100)
+
+    table["seasonality_factors"] = [
+        [round(v, 4) for v in seasonal.loc[g]] if has_year[g] else None
+        for g in table.index
+    ]
+
+    # Working capital days from average balances
+    for col in ("dso_days", "dpo_days", "dio_days"):
+        table[col] = np.nan
+    if balances is not None:
+        key = balances[group_col].astype(str) if group_col else pd.Series(TOTAL_GROUP, index=balances.index)
+        avg = balances.drop(columns=[c for c in ("date", group_col) if c in balances]).groupby(key).mean()
+
+        annual_revenue = totals["revenue"] / n_months * 12
+        annual_cogs = (totals["cogs"] / n_months * 12).fillna(
+            annual_revenue * (1 - table["gross_margin_pct"].fillna(0) / 100)
+        )
+        ratios = {
+            "dso_days": ("accounts_receivable", annual_revenue),
+            "dpo_days": ("accounts_payable", annual_cogs),
+            "dio_days": ("inventory", annual_cogs),
+        }
+        for col, (balance_col, base) in ratios.items():
+            if balance_col in avg:
+                days = avg[balance_col].reindex(table.index) / base.where(base > 0) * DAYS_IN_YEAR
+                table[col] = days.clip(0, 365)
+
+    return table
+
+
+def calibrate_drivers(
+    history: pd.DataFrame,
+    group_col: Optional[str] = "category",
+    revenue_categories: Optional[Sequence[str]] = None,
+    cogs_categories: Optional[Sequence[str]] = None,
+    balances: Optional[pd.DataFrame] = None,
+    base: Optional[ForecastDrivers] = None,
+) -> Dict[str, ForecastDrivers]:
+    """Ready ForecastDrivers per group, estimated from history.
+
+    Values that cannot be estimated (e.g. DSO without balances, margin
+    without COGS) are taken from `base` (services defaults if omitted).
+    See estimate_driver_table() for the arguments.
+    """
+    base = base or get_industry_defaults(Industry.SERVICES)
+    table = estimate_driver_table(
+        history, group_col, revenue_categories, cogs_categories, balances
+    )
+
+    def pick(value: float, fallback: float) -> float:
+        return fallback if pd.isna(value) else round(float(value), 2)
+
+    wc, rev = base.working_capital, base.revenue
+    result = {}
+    for group, row in zip(table.index, table.itertuples(index=False)):
+        result[group] = ForecastDrivers(
+            working_capital=WorkingCapitalDrivers(
+                dso_days=pick(row.dso_days, wc.dso_days),
+                dpo_days=pick(row.dpo_days, wc.dpo_days),
+                dio_days=pick(row.dio_days, wc.dio_days),
+            ),
+            revenue=RevenueDrivers(
+                revenue_growth_pct=pick(row.revenue_growth_pct, rev.revenue_growth_pct),
+                gross_margin_pct=pick(row.gross_margin_pct, rev.gross_margin_pct),
+                seasonality_factors=row.seasonality_factors,
+            ),
+            capex=base.capex,
+            financing=base.financing,
+            industry=base.industry,
+        )
+    return result
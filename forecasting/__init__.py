@@ -1,17 +1,27 @@
 """
 Forecasting package for Cash Flow Planner v2.0.
 
-Implements driver-based forecasting, scenario modeling,
-and sensitivity analysis.
+Implements driver-based forecasting (single and vectorized), statistical baselines,
+scenario modeling, sensitivity analysis and forecast backtesting.
 """
 
+from .backtest import Backtester, BacktestResult
+from .baseline import BaselineForecaster, baseline_forecast
+from .batch import BatchDriverForecaster
 from .driver_based import DriverBasedForecaster
 from .scenarios import Scenario, ScenarioEngine
 from .sensitivity import SensitivityAnalyzer
+from .weekly import WeeklyCashForecaster
 
 __all__ = [
+    "Backtester",
+    "BacktestResult",
+    "BaselineForecaster",
+    "baseline_forecast",
+    "BatchDriverForecaster",
     "DriverBasedForecaster",
     "Scenario",
     "ScenarioEngine",
     "SensitivityAnalyzer",
+    "WeeklyCashForecaster",
 ]
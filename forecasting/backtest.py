@@ -0,0 +1,245 @@
+"""
+Rolling-origin (walk-forward) backtesting of forecast accuracy.
+
+For every cut-off month in the history, a forecast function sees only
+the data up to that month, forecasts H months ahead and is scored
+against the actuals (MAPE, bias, pinball loss). All cut-offs x series
+are stacked into one matrix and forecast in a single batched call (or
+fanned out over a process pool), and re-runs only score origins that
+were not complete in the previous result.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from statistics import NormalDist
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# forecast_fn(windows (N, W), horizon) -> point (N, H)
+# or (point (N, H), quantiles (N, H, Q))
+ForecastFn = Callable[[np.ndarray, int], object]
+
+
+def history_to_matrix(history: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, pd.PeriodIndex]:
+    """Long history (date, category, amount) -> series x months matrix.
+
+    Months without data are NaN.
+    """
+    monthly = (
+        history.assign(month=history["date"].dt.to_period("M"))
+        .groupby(["category", "month"])["amount"].sum()
+        .unstack("month")
+    )
+    months = pd.period_range(monthly.columns.min(), monthly.columns.max(), freq="M")
+    monthly = monthly.reindex(columns=months)
+    return monthly.to_numpy(dtype=float), monthly.index, months
+
+
+def growth_forecast(
+    windows: np.ndarray,
+    horizon: int,
+    quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Driver-style baseline: last level compounded by the derived growth rate.
+
+    The monthly growth driver is the OLS slope of each window divided by
+    its mean level; intervals come from the spread of month-on-month changes.
+    """
+    n, w = windows.shape
+    t = np.arange(w, dtype=float)
+    observed = ~np.isnan(windows)
+    count = observed.sum(axis=1)
+
+    y = np.where(observed, windows, 0.0)
+    t_mean = (t * observed).sum(axis=1) / np.maximum(count, 1)
+    y_mean = y.sum(axis=1) / np.maximum(count, 1)
+    dt = np.where(observed, t - t_mean[:, None], 0.0)
+    slope = (dt * (y - y_mean[:, None])).sum(axis=1) / np.maximum((dt ** 2).sum(axis=1), 1e-12)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.where(np.abs(y_mean) > 0, slope / np.abs(y_mean), 0.0)
+    growth = np.clip(growth, -0.5, 0.5)
+
+    # Last observed value of every window
+    last_idx = w - 1 - np.argmax(observed[:, ::-1], axis=1)
+    level = windows[np.arange(n), last_idx]
+    level = np.where(count > 0, level, 0.0)
+
+    steps = np.arange(1, horizon + 1)
+    point = level[:, None] * (1 + growth[:, None]) ** steps[None, :]
+
+    sigma = np.nan_to_num(np.nanstd(np.diff(windows, axis=1), axis=1)) if w > 1 else np.zeros(n)
+    z = np.array([NormalDist().inv_cdf(q) for q in quantiles])
+    bands = point[:, :, None] + sigma[:, None, None] * np.sqrt(steps)[None, :, None] * z[None, None, :]
+    return point, bands
+
+
+def _pinball(actual: np.ndarray, bands: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """Mean pinball loss over the quantile levels."""
+    tau = np.asarray(quantiles)
+    diff = actual[..., None] - bands
+    return np.maximum(tau * diff, (tau - 1) * diff).mean(axis=-1)
+
+
+@dataclass
+class BacktestResult:
+    """Scored forecasts: one row per (series, origin, step) with an actual."""
+    errors: pd.DataFrame
+    last_period: pd.Period
+    horizon: int
+
+    def summary(self, by: str = "series") -> pd.DataFrame:
+        """Accuracy per series (by='series'), per step ('step') or overall ('all').
+
+        Returns columns: mape (%, zero actuals skipped), bias (% of mean
+        absolute actual, positive = over-forecast), pinball, n.
+        """
+        df = self.errors.assign(
+            ape=lambda d: np.where(d["actual"] != 0, (d["forecast"] - d["actual"]).abs() / d["actual"].abs(), np.nan),
+            error=lambda d: d["forecast"] - d["actual"],
+            abs_actual=lambda d: d["actual"].abs(),
+        )
+        groups = df.assign(all="all").groupby(by)
+        sums = groups[["error", "abs_actual"]].sum()
+        return pd.DataFrame({
+            "mape": groups["ape"].mean() * 100,
+            "bias": sums["error"] / sums["abs_actual"].where(sums["abs_actual"] > 0) * 100,
+            "pinball": groups["pinball"].mean(),
+            "n": groups.size(),
+        })
+
+
+class Backtester:
+    """Walk-forward evaluation of a forecast function over many series."""
+
+    def __init__(
+        self,
+        forecast_fn: Optional[ForecastFn] = None,
+        horizon: int = 3,
+        window: int = 12,
+        min_train: int = 6,
+        quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+        n_jobs: int = 1,
+        chunk_rows: int = 50_000,
+    ):
+        """
+        Args:
+            forecast_fn: Batched forecaster taking windows (N, W) and horizon,
+                returning point forecasts (N, H) or (point, quantiles (N, H, Q)).
+                Must be picklable when n_jobs > 1. Defaults to growth_forecast.
+            horizon: Months ahead to forecast at each origin.
+            window: Months of history passed to forecast_fn (NaN-padded).
+            min_train: Minimum observed months before an origin is scored.
+            quantiles: Quantile levels for pinball loss.
+            n_jobs: Processes used to evaluate chunks of windows.
+            chunk_rows: Windows per chunk when n_jobs > 1.
+        """
+        self.forecast_fn = forecast_fn or partial(growth_forecast, quantiles=tuple(quantiles))
+        self.horizon = horizon
+        self.window = window
+        self.min_train = min_train
+        self.quantiles = tuple(quantiles)
+        self.n_jobs = n_jobs
+        self.chunk_rows = chunk_rows
+
+    def _call(self, windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        out = self.forecast_fn(windows, self.horizon)
+        if isinstance(out, tuple):
+            return out
+        # Point forecasts only: pinball degenerates to the median loss
+        return out, np.repeat(out[:, :, None], len(self.quantiles), axis=2)
+
+    def _forecast(self, windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.n_jobs <= 1 or len(windows) <= self.chunk_rows:
+            return self._call(windows)
+
+        chunks = [windows[i:i + self.chunk_rows] for i in range(0, len(windows), self.chunk_rows)]
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+            parts = list(pool.map(self._call, chunks))
+        return (
+            np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+        )
+
+    def _score(
+        self,
+        values: np.ndarray,
+        series: pd.Index,
+        months: pd.PeriodIndex,
+        rows: np.ndarray,
+        origins: np.ndarray,
+    ) -> pd.DataFrame:
+        """Forecast and score the (row, origin) pairs in one batch."""
+        if len(rows) == 0:
+            return pd.DataFrame(columns=["series", "origin", "step", "actual", "forecast", "pinball"])
+
+        h, w = self.horizon, self.window
+        padded = np.concatenate(
+            [np.full((len(values), w - 1), np.nan), values, np.full((len(values), h), np.nan)],
+            axis=1,
+        )
+        # Window ending at origin t starts at padded column t
+        windows = sliding_window_view(padded, w, axis=1)[rows, origins]
+        actual = sliding_window_view(padded[:, w:], h, axis=1)[rows, origins]
+
+        point, bands = self._forecast(windows)
+        pinball = _pinball(actual, bands, self.quantiles)
+
+        steps = np.arange(1, h + 1)
+        frame = pd.DataFrame({
+            "series": np.repeat(np.asarray(series)[rows], h),
+            "origin": np.repeat(months[origins], h),
+            "step": np.tile(steps, len(rows)),
+            "actual": actual.ravel(),
+            "forecast": point.ravel(),
+            "pinball": pinball.ravel(),
+        })
+        return frame[frame["actual"].notna()].reset_index(drop=True)
+
+    def run(
+        self,
+        history: pd.DataFrame,
+        previous: Optional[BacktestResult] = None,
+    ) -> BacktestResult:
+        """Backtest every origin of every category in a long history.
+
+        Args:
+            history: DataFrame with date, category, amount.
+            previous: Earlier result on the same (shorter) history; its
+                complete origins are reused and only new or partially
+                scored origins are forecast.
+
+        Raises:
+            ValueError: If `previous` was scored with a different horizon.
+        """
+        if previous is not None and previous.horizon != self.horizon:
+            raise ValueError(
+                f"Previous backtest has horizon {previous.horizon}, expected {self.horizon}"
+            )
+
+        values, series, months = history_to_matrix(history)
+        n_series, n_months = values.shape
+
+        observed = np.cumsum(~np.isnan(values), axis=1)
+        eligible = observed[:, :-1] >= self.min_train
+        rows, origins = np.nonzero(eligible)
+
+        kept: List[pd.DataFrame] = []
+        if previous is not None:
+            # An origin is complete once all H actuals were available
+            complete_until = previous.last_period - self.horizon
+            old = previous.errors
+            reuse = old["origin"] <= complete_until
+            kept.append(old[reuse])
+
+            known = series.isin(old.loc[reuse, "series"].unique())
+            skip = known[rows] & (months[origins] <= complete_until)
+            rows, origins = rows[~skip], origins[~skip]
+
+        fresh = self._score(values, series, months, rows, origins)
+        errors = pd.concat(kept + [fresh], ignore_index=True) if kept else fresh
+        return BacktestResult(errors=errors, last_period=months[-1], horizon=self.horizon)
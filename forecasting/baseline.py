@@ -0,0 +1,280 @@
+"""
+Statistical baseline forecasts for every category at once.
+
+Fits naive, seasonal naive, drift, exponential smoothing (SES, Holt,
+damped trend, additive Holt-Winters) to all rows of the wide matrix
+from core.data_transform.pivot_to_wide_format simultaneously: the
+smoothing recursions run over months, vectorized across rows and a
+parameter grid. Used to pre-fill the forecast column instantly and as a
+fallback when the AI forecast is unavailable.
+"""
+
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("naive", "seasonal_naive", "drift", "ses", "holt", "damped", "holt_winters")
+SEASONAL_METHODS = ("seasonal_naive", "holt_winters")
+
+# (point (N, H), one-step errors (N, T) with NaN where undefined)
+_Fit = Tuple[np.ndarray, np.ndarray]
+
+
+def wide_to_matrix(df_wide: pd.DataFrame) -> Tuple[np.ndarray, pd.Series]:
+    """Month columns of a wide table -> (values (N, T), categories).
+
+    Forecast/Comments/Adjustments/Total columns are ignored. Gaps are
+    forward-filled, leading gaps back-filled, empty rows set to 0.
+    """
+    month_cols = [
+        col for col in df_wide.columns
+        if col != "category" and not pd.isna(pd.to_datetime(str(col), format="%b %Y", errors="coerce"))
+    ]
+    values = df_wide[month_cols].apply(pd.to_numeric, errors="coerce")
+    values = values.ffill(axis=1).bfill(axis=1).fillna(0.0)
+    return values.to_numpy(dtype=float), df_wide["category"]
+
+
+def _mse(errors: np.ndarray) -> np.ndarray:
+    """Mean squared error per row over defined (non-NaN) entries."""
+    count = (~np.isnan(errors)).sum(axis=1)
+    total = np.nansum(errors ** 2, axis=1)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _naive(y: np.ndarray, horizon: int, m: int) -> _Fit:
+    errors = np.full_like(y, np.nan)
+    errors[:, 1:] = np.diff(y, axis=1)
+    return np.repeat(y[:, -1:], horizon, axis=1), errors
+
+
+def _seasonal_naive(y: np.ndarray, horizon: int, m: int) -> _Fit:
+    t = y.shape[1]
+    errors = np.full_like(y, np.nan)
+    errors[:, m:] = y[:, m:] - y[:, :-m]
+    idx = t - m + (np.arange(horizon) % m)
+    return y[:, idx], errors
+
+
+def _drift(y: np.ndarray, horizon: int, m: int) -> _Fit:
+    t = y.shape[1]
+    slope = (y[:, -1] - y[:, 0]) / max(t - 1, 1)
+    # One-step errors with the slope of the months before each point
+    errors = np.full_like(y, np.nan)
+    if t > 2:
+        past = np.arange(1, t - 1)
+        fitted = y[:, 1:-1] + (y[:, 1:-1] - y[:, :1]) / past[None, :]
+        errors[:, 2:] = y[:, 2:] - fitted
+    steps = np.arange(1, horizon + 1)
+    return y[:, -1:] + slope[:, None] * steps[None, :], errors
+
+
+def _ets_grid(
+    y: np.ndarray,
+    horizon: int,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    phi: np.ndarray,
+    gamma: Optional[np.ndarray] = None,
+    m: int = 12,
+) -> _Fit:
+    """Additive error-correction ETS over a parameter grid; best SSE per row.
+
+    Grid arrays have shape (G,). Every row is filtered with every
+    parameter set at once (state shape (N, G)) and the set with the
+    lowest one-step squared error is kept.
+    """
+    n, t = y.shape
+    seasonal = gamma is not None
+    a, b_, p = alpha[None, :], beta[None, :], phi[None, :]
+
+    if seasonal:
+        # Level/trend at the end of the first cycle, detrended seasonal states
+        start = m
+        first = y[:, :m].mean(axis=1)
+        trend = (y[:, m:2 * m].mean(axis=1) - first) / m if t >= 2 * m else np.zeros(n)
+        offsets = np.arange(m) - (m - 1) / 2
+        level = first + trend * (m - 1) / 2
+        init = y[:, :m] - (first[:, None] + trend[:, None] * offsets[None, :])
+        season = np.repeat(init[:, None, :], len(alpha), axis=1)
+        g = gamma[None, :]
+    else:
+        start = 1
+        level = y[:, 0]
+        trend = y[:, 1] - y[:, 0] if t > 1 else np.zeros(n)
+    level = np.repeat(level[:, None], len(alpha), axis=1)
+    # Parameter sets without a trend (beta = 0) keep a flat trend
+    trend = np.where(b_ > 0, trend[:, None], 0.0)
+
+    sse = np.zeros_like(level)
+    errors = np.full((n, len(alpha), t), np.nan)
+    for i in range(start, t):
+        s = season[:, :, i % m] if seasonal else 0.0
+        err = y[:, i:i + 1] - (level + p * trend + s)
+        errors[:, :, i] = err
+        sse += err ** 2
+        level = level + p * trend + a * err
+        trend = p * trend + b_ * err
+        if seasonal:
+            season[:, :, i % m] = s + g * err
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n)
+    level, trend, phi_best = level[rows, best], trend[rows, best], phi[best]
+
+    steps = np.arange(1, horizon + 1)
+    # Damped trend multiplier: phi + phi^2 + ... + phi^h
+    damping = np.cumsum(phi_best[:, None] ** steps[None, :], axis=1)
+    point = level[:, None] + damping * trend[:, None]
+    if seasonal:
+        point = point + season[rows, best][:, (t + steps - 1) % m]
+    return point, errors[rows, best]
+
+
+@dataclass
+class BaselineForecast:
+    """Point forecasts and prediction intervals for every category."""
+    categories: pd.Series
+    point: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    method: np.ndarray
+    sigma: np.ndarray
+
+    def to_frame(self, step: int = 1) -> pd.DataFrame:
+        """One row per category for forecast step `step` (1-based).
+
+        Index matches the wide table the forecast was built from, so
+        the 'forecast' column can be passed to add_forecast_columns().
+        """
+        j = step - 1
+        return pd.DataFrame({
+            "category": self.categories.to_numpy(),
+            "method": self.method,
+            "forecast": self.point[:, j],
+            "lower": self.lower[:, j],
+            "upper": self.upper[:, j],
+        }, index=self.categories.index)
+
+
+class BaselineForecaster:
+    """Vectorized statistical baselines over the categories x months matrix."""
+
+    def __init__(
+        self,
+        method: str = "auto",
+        season_length: int = 12,
+        confidence: float = 0.8,
+        alphas: Sequence[float] = (0.1, 0.3, 0.5, 0.7, 0.9),
+        betas: Sequence[float] = (0.01, 0.1, 0.3),
+        phis: Sequence[float] = (0.8, 0.9, 0.98),
+        gammas: Sequence[float] = (0.05, 0.2, 0.5),
+    ):
+        """
+        Args:
+            method: One of METHODS, or 'auto' to pick the method with the
+                lowest in-sample one-step error for each row.
+            season_length: Months per seasonal cycle; seasonal methods
+                need at least two full cycles.
+            confidence: Coverage of the prediction interval.
+            alphas, betas, phis, gammas: Smoothing parameter grids.
+        """
+        if method != "auto" and method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'. Use 'auto' or one of {METHODS}")
+        self.method = method
+        self.m = season_length
+        self.confidence = confidence
+        self.alphas = np.asarray(alphas, dtype=float)
+        self.betas = np.asarray(betas, dtype=float)
+        self.phis = np.asarray(phis, dtype=float)
+        self.gammas = np.asarray(gammas, dtype=float)
+
+    def _fit(self, name: str, y: np.ndarray, horizon: int) -> _Fit:
+        if name == "naive":
+            return _naive(y, horizon, self.m)
+        if name == "seasonal_naive":
+            return _seasonal_naive(y, horizon, self.m)
+        if name == "drift":
+            return _drift(y, horizon, self.m)
+
+        if name == "ses":
+            grid = [self.alphas, [0.0], [1.0]]
+        elif name == "holt":
+            grid = [self.alphas, self.betas, [1.0]]
+        elif name == "damped":
+            grid = [self.alphas, self.betas, self.phis]
+        else:
+            grid = [self.alphas, self.betas, [1.0], self.gammas]
+        mesh = [g.ravel() for g in np.meshgrid(*grid, indexing="ij")]
+        if name == "holt_winters":
+            return _ets_grid(y, horizon, mesh[0], mesh[1], mesh[2], gamma=mesh[3], m=self.m)
+        return _ets_grid(y, horizon, *mesh)
+
+    def candidates(self, n_months: int) -> Tuple[str, ...]:
+        """Methods that can be fitted on a history of n_months."""
+        if n_months < 3:
+            return ("naive",)
+        names = METHODS if self.method == "auto" else (self.method,)
+        if n_months < 2 * self.m:
+            names = tuple(name for name in names if name not in SEASONAL_METHODS) or ("naive",)
+        return names
+
+    def fit_predict(self, values: np.ndarray, horizon: int = 1) -> Dict[str, np.ndarray]:
+        """Forecast every row of a (N, T) matrix without gaps.
+
+        Returns:
+            Dict with point, lower, upper (N, horizon), method (N,), sigma (N,)
+        """
+        y = np.asarray(values, dtype=float)
+        n, t = y.shape
+        names = self.candidates(t)
+        # Compare methods on the months every candidate can forecast
+        start = self.m if any(name in SEASONAL_METHODS for name in names) else min(2, t - 1)
+
+        points, scores, sigmas = [], [], []
+        for name in names:
+            point, errors = self._fit(name, y, horizon)
+            scores.append(_mse(errors[:, start:]))
+            sigmas.append(np.sqrt(np.nan_to_num(_mse(errors))))
+            points.append(point)
+
+        choice = np.argmin(np.nan_to_num(np.stack(scores), nan=np.inf), axis=0)
+        rows = np.arange(n)
+        point = np.stack(points)[choice, rows]
+        sigma = np.stack(sigmas)[choice, rows]
+
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        spread = z * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))[None, :]
+        return {
+            "point": point,
+            "lower": point - spread,
+            "upper": point + spread,
+            "method": np.asarray(names)[choice],
+            "sigma": sigma,
+        }
+
+    def forecast(self, df_wide: pd.DataFrame, horizon: int = 1) -> BaselineForecast:
+        """Forecast every category of a wide table (see wide_to_matrix)."""
+        values, categories = wide_to_matrix(df_wide)
+        if values.shape[1] == 0:
+            raise ValueError("No month columns found in wide table")
+        return BaselineForecast(categories=categories, **self.fit_predict(values, horizon))
+
+
+def baseline_forecast(df_wide: pd.DataFrame, method: str = "auto", step: int = 1) -> pd.DataFrame:
+    """
+    Next-month baseline for every category of a wide table.
+
+    Args:
+        df_wide: Result of pivot_to_wide_format (forecast columns allowed)
+        method: Baseline method or 'auto'
+        step: Months ahead
+
+    Returns:
+        DataFrame with category, method, forecast, lower, upper
+        (index aligned with df_wide)
+    """
+    return BaselineForecaster(method=method).forecast(df_wide, horizon=step).to_frame(step)
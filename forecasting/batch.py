@@ -0,0 +1,215 @@
+"""
+Vectorized driver-based forecasting over many driver sets at once.
+
+BatchDriverForecaster reproduces DriverBasedForecaster.generate_forecast()
+for S driver sets x P periods with NumPy arrays instead of a Python loop
+per period and per set, so sensitivity grids and Monte Carlo runs take
+milliseconds.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from drivers.calculator import DAYS_IN_YEAR
+from drivers.models import ForecastDrivers
+
+# Output columns in the order of DriverBasedForecaster.generate_forecast()
+FORECAST_COLUMNS = [
+    "period", "revenue", "cogs", "accounts_receivable", "accounts_payable",
+    "inventory", "net_working_capital", "ccc_days", "gross_profit",
+    "depreciation", "delta_working_capital", "delta_ar", "delta_ap",
+    "delta_inventory", "operating_cashflow", "capex", "free_cashflow",
+]
+
+SENSITIVITY_DRIVERS = [
+    "dso_days", "dpo_days", "dio_days", "revenue_growth_pct", "gross_margin_pct",
+]
+
+
+class BatchDriverForecaster:
+    """Driver-based forecasts for many driver sets from one history."""
+
+    def __init__(self, historical_data: pd.DataFrame):
+        """
+        Args:
+            historical_data: DataFrame with 'revenue' column (and optionally 'cogs')
+        """
+        self.last_revenue = float(historical_data["revenue"].iloc[-1])
+        self.last_cogs = (
+            float(historical_data["cogs"].iloc[-1])
+            if "cogs" in historical_data
+            else self.last_revenue * 0.65
+        )
+
+    @staticmethod
+    def driver_arrays(drivers: Sequence[ForecastDrivers]) -> Dict[str, np.ndarray]:
+        """Stacks driver sets into arrays (S,) and seasonality (S, 12)."""
+        return {
+            "dso_days": np.array([d.working_capital.dso_days for d in drivers], dtype=float),
+            "dpo_days": np.array([d.working_capital.dpo_days for d in drivers], dtype=float),
+            "dio_days": np.array([d.working_capital.dio_days for d in drivers], dtype=float),
+            "revenue_growth_pct": np.array([d.revenue.revenue_growth_pct for d in drivers], dtype=float),
+            "gross_margin_pct": np.array([d.revenue.gross_margin_pct for d in drivers], dtype=float),
+            "capex_pct": np.array(
+                [d.capex.capex_pct_of_revenue if d.capex else 0.0 for d in drivers], dtype=float
+            ),
+            "seasonality": np.array(
+                [d.revenue.seasonality_factors or [1.0] * 12 for d in drivers], dtype=float
+            ),
+        }
+
+    def run_arrays(
+        self,
+        dso_days: np.ndarray,
+        dpo_days: np.ndarray,
+        dio_days: np.ndarray,
+        revenue_growth_pct: np.ndarray,
+        gross_margin_pct: np.ndarray,
+        capex_pct: np.ndarray,
+        seasonality: Optional[np.ndarray] = None,
+        periods: int = 12,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Forecasts S driver sets given as arrays.
+
+        Args:
+            dso_days, dpo_days, dio_days, revenue_growth_pct, gross_margin_pct,
+            capex_pct: Driver values, shape (S,)
+            seasonality: Monthly factors (S, 12); None = no seasonality
+            periods: Forecast periods
+
+        Returns:
+            Dict of FORECAST_COLUMNS (except period) to arrays (S, periods)
+        """
+        dso, dpo, dio = (np.asarray(x, dtype=float)[:, None] for x in (dso_days, dpo_days, dio_days))
+        margin = np.asarray(gross_margin_pct, dtype=float)[:, None] / 100
+        capex_share = np.asarray(capex_pct, dtype=float)[:, None] / 100
+        growth = 1 + (np.asarray(revenue_growth_pct, dtype=float)[:, None] / 100) / 12
+        s = dso.shape[0]
+
+        steps = np.arange(periods)
+        if seasonality is None:
+            factors = np.ones((s, periods))
+        else:
+            factors = np.asarray(seasonality, dtype=float)[:, steps % 12]
+
+        # revenue_i = revenue_(i-1) * growth * factor_i (seasonality compounds)
+        revenue = self.last_revenue * growth ** (steps + 1) * np.cumprod(factors, axis=1)
+        previous_revenue = np.concatenate([np.full((s, 1), self.last_revenue), revenue[:, :-1]], axis=1)
+        # COGS follows the revenue before this month's seasonality
+        cogs = previous_revenue * growth * (1 - margin)
+        previous_cogs = np.concatenate([np.full((s, 1), self.last_cogs), cogs[:, :-1]], axis=1)
+
+        ar = (revenue / DAYS_IN_YEAR) * dso
+        ap = (cogs / DAYS_IN_YEAR) * dpo
+        inventory = (cogs / DAYS_IN_YEAR) * dio
+        nwc = ar + inventory - ap
+        previous_ar = (previous_revenue / DAYS_IN_YEAR) * dso
+        previous_ap = (previous_cogs / DAYS_IN_YEAR) * dpo
+        previous_inventory = (previous_cogs / DAYS_IN_YEAR) * dio
+        delta_wc = nwc - (previous_ar + previous_inventory - previous_ap)
+
+        gross_profit = revenue * margin
+        depreciation = revenue * 0.02
+        operating_cf = gross_profit + depreciation - delta_wc
+        capex = revenue * capex_share
+
+        return {
+            "revenue": revenue,
+            "cogs": cogs,
+            "accounts_receivable": ar,
+            "accounts_payable": ap,
+            "inventory": inventory,
+            "net_working_capital": nwc,
+            "ccc_days": np.broadcast_to(dso + dio - dpo, revenue.shape),
+            "gross_profit": gross_profit,
+            "depreciation": depreciation,
+            "delta_working_capital": delta_wc,
+            "delta_ar": ar - previous_ar,
+            "delta_ap": ap - previous_ap,
+            "delta_inventory": inventory - previous_inventory,
+            "operating_cashflow": operating_cf,
+            "capex": capex,
+            "free_cashflow": operating_cf - capex,
+        }
+
+    def run(self, drivers: Sequence[ForecastDrivers], periods: int = 12) -> Dict[str, np.ndarray]:
+        """Forecasts a list of driver sets (see run_arrays())."""
+        arrays = self.driver_arrays(drivers)
+        if not any(d.revenue.seasonality_factors for d in drivers):
+            arrays["seasonality"] = None
+        return self.run_arrays(**arrays, periods=periods)
+
+    @staticmethod
+    def to_frame(result: Dict[str, np.ndarray], row: int = 0) -> pd.DataFrame:
+        """One driver set's forecast as generate_forecast() returns it."""
+        periods = result["revenue"].shape[1]
+        data = {"period": np.arange(1, periods + 1)}
+        data.update({name: values[row] for name, values in result.items()})
+        return pd.DataFrame(data, columns=FORECAST_COLUMNS)
+
+    def sensitivity(
+        self,
+        base: ForecastDrivers,
+        driver_name: str,
+        variations: Optional[List[float]] = None,
+        periods: int = 12,
+    ) -> Dict[float, float]:
+        """
+        Total FCF per % change of one driver (as SensitivityAnalyzer.analyze_driver_sensitivity()).
+
+        Raises:
+            ValueError: For an unknown driver
+        """
+        if driver_name not in SENSITIVITY_DRIVERS:
+            raise ValueError(f"Unknown driver: {driver_name}")
+        if variations is None:
+            variations = [-20, -10, 0, 10, 20]
+
+        arrays = self.driver_arrays([base] * len(variations))
+        multipliers = 1 + np.asarray(variations, dtype=float) / 100
+        arrays[driver_name] = arrays[driver_name] * multipliers
+        if driver_name == "gross_margin_pct":
+            arrays[driver_name] = np.minimum(100, arrays[driver_name])
+        if not base.revenue.seasonality_factors:
+            arrays["seasonality"] = None
+
+        fcf = self.run_arrays(**arrays, periods=periods)["free_cashflow"].sum(axis=1)
+        return {pct: float(total) for pct, total in zip(variations, fcf)}
+
+    def monte_carlo(
+        self,
+        base: ForecastDrivers,
+        n_simulations: int = 1000,
+        periods: int = 12,
+        seed: Optional[int] = None,
+    ) -> Dict[str, float]:
+        """
+        Total FCF percentiles under random driver variations
+        (the distributions of ScenarioEngine.run_monte_carlo()).
+        """
+        rng = np.random.default_rng(seed)
+        arrays = self.driver_arrays([base])
+        arrays = {
+            name: np.repeat(values, n_simulations, axis=0) for name, values in arrays.items()
+        }
+        for name in ("dso_days", "dpo_days", "dio_days"):
+            arrays[name] = arrays[name] * rng.uniform(0.8, 1.2, n_simulations)
+        arrays["revenue_growth_pct"] = arrays["revenue_growth_pct"] * rng.uniform(0.5, 1.5, n_simulations)
+        if not base.revenue.seasonality_factors:
+            arrays["seasonality"] = None
+
+        totals = self.run_arrays(**arrays, periods=periods)["free_cashflow"].sum(axis=1)
+        return {
+            "mean": float(totals.mean()),
+            "std": float(totals.std()),
+            "p5": float(np.percentile(totals, 5)),
+            "p25": float(np.percentile(totals, 25)),
+            "p50": float(np.percentile(totals, 50)),
+            "p75": float(np.percentile(totals, 75)),
+            "p95": float(np.percentile(totals, 95)),
+            "min": float(totals.min()),
+            "max": float(totals.max()),
+        }
@@ -2,16 +2,92 @@
 Scenario modeling engine for what-if analysis.
 
 Creates Base/Optimistic/Pessimistic scenarios by adjusting drivers,
+evaluates custom (e.g. AI-suggested) scenarios in one batched forecast,
 and runs Monte Carlo simulations for risk assessment.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import Container, List, Dict, Optional, Tuple
 import numpy as np
+from pydantic import ValidationError
 
 from drivers.models import ForecastDrivers
+from drivers.validator import validate_drivers
+from .batch import BatchDriverForecaster
 from .driver_based import DriverBasedForecaster
 
+# Adjustable driver -> (section of ForecastDrivers, field); keys also accept
+# the short names (dso, dpo, dio, growth, margin, capex)
+ADJUSTABLE_DRIVERS = {
+    "dso_days": ("working_capital", "dso_days"),
+    "dpo_days": ("working_capital", "dpo_days"),
+    "dio_days": ("working_capital", "dio_days"),
+    "revenue_growth_pct": ("revenue", "revenue_growth_pct"),
+    "gross_margin_pct": ("revenue", "gross_margin_pct"),
+    "capex_pct_of_revenue": ("capex", "capex_pct_of_revenue"),
+}
+_DRIVER_ALIASES = {
+    "dso": "dso_days",
+    "dpo": "dpo_days",
+    "dio": "dio_days",
+    "growth": "revenue_growth_pct",
+    "revenue_growth": "revenue_growth_pct",
+    "margin": "gross_margin_pct",
+    "gross_margin": "gross_margin_pct",
+    "capex": "capex_pct_of_revenue",
+    "capex_pct": "capex_pct_of_revenue",
+}
+
+WEIGHTED_SCENARIO = "Probability-weighted"
+
+
+def unique_name(name: str, taken: Container[str]) -> str:
+    """`name`, or "name (2)", "name (3)", ... if already in `taken`."""
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{name} ({n})"
+    return candidate
+
+
+def apply_adjustments(
+    base: ForecastDrivers, adjustments: Dict[str, float]
+) -> Tuple[ForecastDrivers, List[str]]:
+    """Apply driver multipliers (e.g. {'dso_days': 0.85}) to base drivers.
+
+    Unknown drivers and non-positive multipliers are skipped with a
+    warning; validate_drivers() warnings of the result are appended.
+
+    Raises:
+        ValueError: If the adjusted drivers are out of range
+            (e.g. DSO above 365 days).
+    """
+    warnings: List[str] = []
+    data = base.model_dump()
+    for key, multiplier in adjustments.items():
+        name = str(key).strip().lower().replace(" ", "_")
+        name = _DRIVER_ALIASES.get(name, name)
+        if name not in ADJUSTABLE_DRIVERS:
+            warnings.append(f"Unknown driver '{key}' ignored")
+            continue
+        if multiplier is None or not np.isfinite(multiplier) or multiplier <= 0:
+            warnings.append(f"Invalid multiplier {multiplier} for {name} ignored")
+            continue
+        section, field_name = ADJUSTABLE_DRIVERS[name]
+        if data.get(section) is None:
+            warnings.append(f"No {section} drivers to adjust, {name} ignored")
+            continue
+        data[section][field_name] *= float(multiplier)
+
+    try:
+        drivers = ForecastDrivers.model_validate(data)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+        raise ValueError(f"Adjusted drivers out of range: {problems}") from None
+    return drivers, warnings + validate_drivers(drivers)
+
 
 @dataclass
 class Scenario:
@@ -20,6 +96,7 @@ class Scenario:
     description: str
     drivers: ForecastDrivers
     probability: float = 0.33
+    warnings: List[str] = field(default_factory=list)
 
 
 class ScenarioEngine:
@@ -88,6 +165,63 @@ class ScenarioEngine:
             }
         return results
 
+    def evaluate_scenarios(
+        self,
+        historical_data,
+        scenarios: List[Scenario],
+        periods: int = 12,
+        n_simulations: int = 0,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Dict]:
+        """Run custom scenarios in one batched forecast.
+
+        Returns the run_scenarios() result format, plus a
+        'Probability-weighted' entry (probabilities normalized to 1),
+        each scenario's warnings and, when n_simulations > 0, a
+        'monte_carlo' dict per scenario. Repeated scenario names get a
+        " (2)", " (3)", ... suffix so no result is overwritten.
+        """
+        if not scenarios:
+            return {}
+        batch = BatchDriverForecaster(historical_data)
+        forecasts = batch.run([s.drivers for s in scenarios], periods)
+        fcf = forecasts["free_cashflow"].sum(axis=1)
+        ocf = forecasts["operating_cashflow"].sum(axis=1)
+        ccc = forecasts["ccc_days"].mean(axis=1)
+
+        names: List[str] = []
+        for scenario in scenarios:
+            names.append(unique_name(scenario.name, [*names, WEIGHTED_SCENARIO]))
+
+        results = {}
+        for row, (name, scenario) in enumerate(zip(names, scenarios)):
+            results[name] = {
+                "total_fcf": float(fcf[row]),
+                "total_ocf": float(ocf[row]),
+                "avg_ccc": float(ccc[row]),
+                "forecast_df": batch.to_frame(forecasts, row),
+                "probability": scenario.probability,
+                "description": scenario.description,
+                "warnings": scenario.warnings,
+            }
+            if n_simulations > 0:
+                results[name]["monte_carlo"] = batch.monte_carlo(
+                    scenario.drivers, n_simulations, periods, seed
+                )
+
+        probabilities = np.array([max(s.probability, 0) for s in scenarios], dtype=float)
+        if probabilities.sum() > 0:
+            weights = probabilities / probabilities.sum()
+            results[WEIGHTED_SCENARIO] = {
+                "total_fcf": float(weights @ fcf),
+                "total_ocf": float(weights @ ocf),
+                "avg_ccc": float(weights @ ccc),
+                "probability": 1.0,
+                "description": "Expected value across scenarios",
+                "warnings": [],
+            }
+        return results
+
     def run_monte_carlo(
         self,
         historical_data,
@@ -0,0 +1,142 @@
+"""
+Agent pipeline benchmark on the offline StubRunner.
+
+Measures throughput and tail latency of the AI category forecast and of
+the full analysis pipeline with simulated provider latency and failures,
+going through the same scheduler/resilience layers as real calls:
+
+    python scripts/benchmark_agents.py --categories 200 --median-ms 400 --failure-rate 0.02
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+import config
+from ai_agents.forecast_agent import ForecastAgent
+from ai_agents.orchestrator import AnalysisPipeline
+from ai_agents.resilience import reset_breakers
+from ai_agents.runner import set_runner
+from ai_agents.stub import StubLatency, StubRunner
+from drivers.defaults import get_industry_defaults
+from drivers.models import Industry
+
+
+def synthetic_history(n_categories: int, months: int = 24, seed: int = 0) -> pd.DataFrame:
+    """Wide history: category + one column per month."""
+    rng = np.random.default_rng(seed)
+    columns = pd.date_range("2023-01-01", periods=months, freq="MS").strftime("%b %Y")
+    level = rng.uniform(1_000, 100_000, (n_categories, 1))
+    values = level * (1 + rng.normal(0, 0.1, (n_categories, months))).cumprod(axis=1)
+    df = pd.DataFrame(values.round(), columns=columns)
+    df.insert(0, "category", [f"Category {i}" for i in range(n_categories)])
+    return df
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms)
+    return {f"p{q}_ms": float(np.percentile(values, q)) for q in (50, 95, 99)}
+
+
+def _call_latency(runner: StubRunner) -> pd.DataFrame:
+    summary = runner.latencies.summary()
+    failures = pd.Series(runner.failures, dtype=int)
+    summary["failures"] = summary["agent"].map(failures).fillna(0).astype(int)
+    return summary
+
+
+def benchmark_forecast(
+    n_categories: int = 100,
+    batch: bool = False,
+    max_concurrency: Optional[int] = None,
+    rounds: int = 3,
+) -> Dict[str, float]:
+    """Throughput and per-round latency of ForecastAgent.build_cashflow_forecast()."""
+    df = synthetic_history(n_categories)
+    agent = ForecastAgent()
+    round_ms = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        # build_cashflow_forecast() adds its result columns to the frame it gets
+        asyncio.run(agent.build_cashflow_forecast(df.copy(), None, max_concurrency=max_concurrency, batch=batch))
+        round_ms.append((time.perf_counter() - start) * 1000)
+    return {
+        "categories_per_s": n_categories * rounds / (sum(round_ms) / 1000),
+        **_percentiles(round_ms),
+    }
+
+
+def benchmark_analysis(runs: int = 20, concurrency: int = 4) -> Dict[str, float]:
+    """Throughput and end-to-end latency of the full analysis pipeline."""
+    history = synthetic_history(1, months=24).melt(id_vars="category", var_name="date", value_name="amount")
+    history["date"] = pd.to_datetime(history["date"], format="%b %Y")
+    drivers = get_industry_defaults(Industry.SERVICES)
+    run_ms: List[float] = []
+
+    async def one(i: int, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            # A fresh pipeline per run so the node cache doesn't hide the agents
+            result = await AnalysisPipeline().run(
+                {"df_history": history, "drivers": drivers, "industry": "services", "periods": 12}
+            )
+            run_ms.append((time.perf_counter() - start) * 1000)
+            for node, error in result.errors.items():
+                print(f"   run {i}: {node} {error}")
+
+    async def main() -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i, semaphore) for i in range(runs)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return {"runs_per_s": runs / elapsed, **_percentiles(run_ms)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--analysis-runs", type=int, default=20)
+    parser.add_argument("--median-ms", type=float, default=300)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=config.FORECAST_MAX_CONCURRENCY)
+    parser.add_argument("--batch", action="store_true", help="Batched category prompts")
+    parser.add_argument("--scheduler", action="store_true", help="Rate limit with the request scheduler")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency = StubLatency(args.median_ms, args.sigma, args.stall_rate)
+    runner = StubRunner(latency, failure_rate=args.failure_rate, seed=args.seed)
+    previous = set_runner(runner, use_scheduler=args.scheduler, use_resilience=True)
+    reset_breakers()
+    try:
+        print(f"AI forecast: {args.categories} categories x {args.rounds} rounds")
+        for name, value in benchmark_forecast(
+            args.categories, args.batch, args.concurrency, args.rounds
+        ).items():
+            print(f"   {name:>16}: {value:,.1f}")
+
+        print(f"Full analysis: {args.analysis_runs} runs")
+        for name, value in benchmark_analysis(args.analysis_runs).items():
+            print(f"   {name:>16}: {value:,.1f}")
+
+        print("Stub call latency per agent:")
+        print(_call_latency(runner).to_string(index=False))
+    finally:
+        set_runner(previous)
+
+
+if __name__ == "__main__":
+    main()
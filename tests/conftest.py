@@ -0,0 +1,23 @@
+"""
+Shared pytest fixtures
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+import config
+from ai_agents.telemetry import set_telemetry
+
+
+@pytest.fixture(autouse=True)
+def telemetry_files(tmp_path, monkeypatch):
+    """Agent call telemetry goes to the test's tmp dir, not the repo's .cache/"""
+    monkeypatch.setattr(config, "TELEMETRY_JSONL_PATH", str(tmp_path / "agent_calls.jsonl"))
+    monkeypatch.setattr(config, "TELEMETRY_PROMETHEUS_PATH", str(tmp_path / "agent_metrics.prom"))
+    previous = set_telemetry(None)   # recreated from the patched paths on first use
+    yield tmp_path
+    set_telemetry(previous)
@@ -0,0 +1,84 @@
+"""
+Tests for the AI response cache
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+from types import SimpleNamespace
+
+from agents import Agent
+
+from ai_agents.cache import ResponseCache, cache_key
+from ai_agents.forecast_agent import ForecastAgentResponse
+from ai_agents import cache as cache_module
+from ai_agents.runner import run_agent, set_runner
+
+AGENT = Agent(name="a", model="m", instructions="Forecast.", output_type=ForecastAgentResponse)
+
+
+class CountingRunner:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, agent, message):
+        self.calls += 1
+        return SimpleNamespace(final_output=ForecastAgentResponse(amount=self.calls, justification=message))
+
+
+def test_key_ignores_whitespace_but_not_content():
+    assert cache_key(AGENT, "Category: Rent\n  values: 1, 2") == cache_key(AGENT, "Category: Rent values: 1, 2 ")
+    assert cache_key(AGENT, "Category: Rent") != cache_key(AGENT, "Category: Sales")
+    other = Agent(name="a", model="other", instructions="Forecast.", output_type=ForecastAgentResponse)
+    assert cache_key(AGENT, "x") != cache_key(other, "x")
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = ResponseCache(path=str(path), memory_items=1, ttl_hours=1, max_disk_mb=1)
+    cache.set("k1", ForecastAgentResponse(amount=1, justification="a"))
+    cache.set("k2", ForecastAgentResponse(amount=2, justification="b"))
+
+    assert cache.get("k2", ForecastAgentResponse).amount == 2   # memory
+    assert cache.get("k1", ForecastAgentResponse).amount == 1   # disk (evicted from memory)
+    assert cache.get("k3") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+
+    # A new instance (e.g. after a restart) reads the disk tier
+    assert ResponseCache(path=str(path)).get("k2", ForecastAgentResponse).amount == 2
+    # Expired entries are not served
+    assert ResponseCache(path=str(path), ttl_hours=0).get("k2") is None
+
+
+def test_size_eviction_keeps_recent_entries(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "c.db"), memory_items=0, max_disk_mb=0.001)
+    for i in range(50):
+        cache.set(f"k{i}", {"text": "x" * 100})
+
+    assert cache.stats()["disk_entries"] < 50
+    assert cache.get("k49") is not None
+    assert cache.get("k0") is None
+
+
+def test_run_agent_serves_repeats_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "_default_cache", ResponseCache(path=str(tmp_path / "r.db")))
+    runner = CountingRunner()
+    previous = set_runner(runner, use_cache=True)
+    try:
+        first = asyncio.run(run_agent(AGENT, "Category: Rent"))
+        second = asyncio.run(run_agent(AGENT, "Category:   Rent"))
+    finally:
+        set_runner(previous)
+
+    assert runner.calls == 1
+    assert second.final_output == first.final_output
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
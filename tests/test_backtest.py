@@ -0,0 +1,67 @@
+"""
+Tests for rolling-origin backtesting
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting.backtest import Backtester
+
+
+def _history(months: int = 24) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2023-01-01', periods=months, freq='MS')
+    frames = [
+        pd.DataFrame({'date': dates, 'category': name, 'amount': level * (1.02 ** np.arange(months)) + rng.normal(0, 5, months)})
+        for name, level in [('Sales', 1000.0), ('Rent', -300.0), ('Payroll', -500.0)]
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _naive(windows, horizon):
+    return np.repeat(windows[:, -1:], horizon, axis=1)
+
+
+def test_incremental_run_matches_full_run():
+    history = _history()
+    backtester = Backtester(horizon=3, window=6, min_train=4)
+
+    full = backtester.run(history)
+    earlier = backtester.run(history[history['date'] < '2024-07-01'])
+    incremental = backtester.run(history, previous=earlier)
+
+    key = ['series', 'origin', 'step']
+    pd.testing.assert_frame_equal(
+        incremental.errors.sort_values(key).reset_index(drop=True),
+        full.errors.sort_values(key).reset_index(drop=True),
+    )
+
+    with pytest.raises(ValueError, match="horizon"):
+        Backtester(horizon=6, window=6, min_train=4).run(history, previous=earlier)
+
+
+def test_summary_by_step():
+    dates = pd.date_range('2024-01-01', periods=12, freq='MS')
+    history = pd.DataFrame({'date': dates, 'category': 'Sales', 'amount': 10.0 * np.arange(1, 13)})
+    result = Backtester(_naive, horizon=2, window=3, min_train=3).run(history)
+
+    by_step = result.summary(by='step')
+    assert list(by_step.columns) == ['mape', 'bias', 'pinball', 'n']
+    assert list(by_step['n']) == [9, 8]
+    # Naive forecast of a rising line under-forecasts by 10 per step ahead
+    assert np.allclose(by_step['pinball'], [5.0, 10.0])
+    assert (by_step['bias'] < 0).all()
+
+    overall = result.summary(by='all')
+    assert list(overall.index) == ['all'] and overall.loc['all', 'n'] == 17
+    assert list(result.summary().index) == ['Sales']
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
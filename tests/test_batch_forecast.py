@@ -0,0 +1,105 @@
+"""
+Tests for the vectorized driver-based forecaster and the agent forecast tools
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from ai_agents.driver_agent import DriverAgent
+from ai_agents.tools import (
+    ForecastToolContext, compute_sensitivity, forecast_scope, lookup_benchmark,
+    run_forecast, run_monte_carlo, tool_latency_summary,
+)
+from drivers.models import CapExDrivers, ForecastDrivers, RevenueDrivers, WorkingCapitalDrivers
+from forecasting.batch import BatchDriverForecaster
+from forecasting.driver_based import DriverBasedForecaster
+from forecasting.sensitivity import SensitivityAnalyzer
+
+
+def _drivers(seasonal: bool = True, capex: bool = True) -> ForecastDrivers:
+    factors = np.linspace(0.7, 1.3, 12)
+    return ForecastDrivers(
+        working_capital=WorkingCapitalDrivers(dso_days=45, dpo_days=30, dio_days=25),
+        revenue=RevenueDrivers(
+            revenue_growth_pct=15,
+            gross_margin_pct=40,
+            seasonality_factors=list(factors * 12 / factors.sum()) if seasonal else None,
+        ),
+        capex=CapExDrivers(capex_pct_of_revenue=5, depreciation_years=5) if capex else None,
+    )
+
+
+def test_batch_matches_driver_based_forecaster():
+    with_cogs = pd.DataFrame({'revenue': [900.0, 1000.0], 'cogs': [500.0, 550.0]})
+    revenue_only = pd.DataFrame({'revenue': [900.0, 1000.0]})
+    for history in (with_cogs, revenue_only):
+        drivers = [_drivers(), _drivers(seasonal=False, capex=False)]
+        batch = BatchDriverForecaster(history)
+        result = batch.run(drivers, periods=18)
+        for row, d in enumerate(drivers):
+            expected = DriverBasedForecaster(d).generate_forecast(history, 18)
+            pd.testing.assert_frame_equal(batch.to_frame(result, row), expected, check_dtype=False)
+
+
+def test_sensitivity_and_monte_carlo():
+    history = pd.DataFrame({'revenue': [1000.0]})
+    drivers = _drivers()
+    batch = BatchDriverForecaster(history)
+
+    expected = SensitivityAnalyzer(drivers).analyze_driver_sensitivity(history, 'dso_days')
+    got = batch.sensitivity(drivers, 'dso_days')
+    assert got.keys() == expected.keys()
+    assert np.allclose(list(got.values()), list(expected.values()))
+
+    mc = batch.monte_carlo(drivers, n_simulations=2000, seed=1)
+    assert mc['p5'] <= mc['p50'] <= mc['p95']
+    assert mc == batch.monte_carlo(drivers, n_simulations=2000, seed=1)
+
+
+def test_tools_use_scoped_context():
+    assert 'error' in run_forecast()
+    assert lookup_benchmark('retail')['dso_days'] > 0
+
+    context = ForecastToolContext(drivers=_drivers(), last_revenue=1000.0)
+    history = pd.DataFrame({'revenue': [1000.0]})
+    expected = DriverBasedForecaster(_drivers()).generate_forecast(history, 12)
+    changed = _drivers()
+    changed.working_capital.dso_days = 20
+    expected_changed = DriverBasedForecaster(changed).generate_forecast(history, 12)
+    with forecast_scope(context):
+        totals = run_forecast()
+        faster = run_forecast(dso_days=20)
+        invalid = run_forecast(dso_days=-5)
+        tornado = compute_sensitivity()
+        mc = run_monte_carlo(n_simulations=100)
+        too_long = run_forecast(periods=10_000)
+        no_months = compute_sensitivity(periods=0)
+
+    assert totals['total_free_cashflow'] == round(expected['free_cashflow'].sum())
+    assert faster['total_free_cashflow'] == round(expected_changed['free_cashflow'].sum())
+    assert len(tornado['drivers']) == 5
+    assert 'error' in invalid and 'dso_days' in invalid['error']
+    assert set(mc) >= {'p5', 'p50', 'p95'}
+    assert 'periods' in too_long['error'] and 'periods' in no_months['error']
+
+    seasonal = _drivers()
+    seasonal.revenue.seasonality_factors = [1.2] * 6 + [0.8] * 6
+    assert ForecastToolContext(seasonal, 1000.0).summary() != context.summary()
+
+    summary = tool_latency_summary().set_index('tool')
+    assert summary.loc['run_forecast', 'calls'] >= 3
+    assert {t.name for t in DriverAgent().agent.tools} == {
+        'run_forecast', 'compute_sensitivity', 'run_monte_carlo', 'lookup_benchmark',
+    }
+
+
+if __name__ == "__main__":
+    test_batch_matches_driver_based_forecaster()
+    test_sensitivity_and_monte_carlo()
+    test_tools_use_scoped_context()
+    print("✅ Batch forecast and tool tests passed")
@@ -0,0 +1,76 @@
+"""
+Tests for driver calibration from history
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from drivers.calibration import calibrate_drivers
+
+MONTHS = pd.date_range('2022-01-01', periods=36, freq='MS')
+SEASON = 1 + 0.2 * np.sin(2 * np.pi * np.arange(12) / 12)
+
+
+def test_growth_and_seasonality_per_category():
+    n = 200
+    t = np.tile(np.arange(36), n)
+    history = pd.DataFrame({
+        'date': np.tile(MONTHS, n),
+        'category': np.repeat([f"c{i}" for i in range(n)], 36),
+        'amount': 1000 * (1 + 0.01 * t) * SEASON[np.tile(MONTHS.month - 1, n)],
+    })
+    drivers = calibrate_drivers(history)
+
+    assert len(drivers) == n
+    revenue = drivers['c0'].revenue
+    # 10/month on a mean level of ~1175 -> ~10% a year
+    assert 9 < revenue.revenue_growth_pct < 11
+    assert np.allclose(revenue.seasonality_factors, SEASON / SEASON.sum() * 12, atol=0.02)
+
+
+def test_growing_outflow_keeps_positive_growth():
+    t = np.arange(36)
+    history = pd.DataFrame({
+        'date': MONTHS,
+        'category': 'Payroll',
+        'amount': -1000 * (1 + 0.01 * t) * SEASON[MONTHS.month - 1],
+    })
+    revenue = calibrate_drivers(history)['Payroll'].revenue
+
+    assert 9 < revenue.revenue_growth_pct < 11
+    assert np.allclose(revenue.seasonality_factors, SEASON / SEASON.sum() * 12, atol=0.02)
+
+
+def test_margin_and_working_capital_per_entity():
+    history = pd.DataFrame({
+        'date': np.tile(MONTHS[:6], 2),
+        'entity': 'E1',
+        'category': ['Revenue'] * 6 + ['COGS'] * 6,
+        'amount': np.r_[np.full(6, 100.0), np.full(6, -60.0)],
+    })
+    balances = pd.DataFrame({
+        'date': MONTHS[:6], 'entity': 'E1',
+        'accounts_receivable': 120.0, 'accounts_payable': 60.0,
+    })
+    drivers = calibrate_drivers(
+        history, group_col='entity',
+        revenue_categories=['Revenue'], cogs_categories=['COGS'],
+        balances=balances,
+    )['E1']
+
+    assert drivers.revenue.gross_margin_pct == 40.0
+    assert drivers.revenue.seasonality_factors is None
+    assert drivers.working_capital.dso_days == 36.5
+    assert abs(drivers.working_capital.dpo_days - 60 / 720 * 365) < 0.01
+
+
+if __name__ == "__main__":
+    test_growth_and_seasonality_per_category()
+    test_growing_outflow_keeps_positive_growth()
+    test_margin_and_working_capital_per_entity()
+    print("✅ Calibration tests passed")
@@ -0,0 +1,67 @@
+"""
+Tests for the shared background event loop used by sync agent wrappers
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+
+from ai_agents.event_loop import run_sync, submit
+from ai_agents.forecast_agent import ForecastAgentResponse, build_cashflow_forecast, get_forecast_agent
+from ai_agents.runner import set_runner
+
+
+class LoopRecordingRunner:
+    def __init__(self):
+        self.loops = set()
+
+    async def run(self, agent, message):
+        self.loops.add(id(asyncio.get_running_loop()))
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(final_output=ForecastAgentResponse(amount=1, justification="stub"))
+
+
+def test_sync_wrappers_share_one_loop_across_threads():
+    runner = LoopRecordingRunner()
+    previous = set_runner(runner)
+    df = pd.DataFrame({'category': [f"cat{i}" for i in range(5)], 'Jan 2025': 2.0})
+    try:
+        # Simulates several Streamlit sessions calling the sync wrapper at once
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: build_cashflow_forecast(df.copy(), None), range(8)))
+    finally:
+        set_runner(previous)
+
+    assert all(list(r['ai_forecast']) == [1] * 5 for r in results)
+    assert len(runner.loops) == 1
+    assert get_forecast_agent() is get_forecast_agent()
+
+
+def test_submit_and_nested_run_sync():
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    assert submit(add(1, 2)).result(5) == 3
+
+    async def nested():
+        coro = add(1, 1)
+        try:
+            run_sync(coro)
+        except RuntimeError:
+            return "refused"
+
+    assert run_sync(nested()) == "refused"
+
+
+if __name__ == "__main__":
+    test_sync_wrappers_share_one_loop_across_threads()
+    test_submit_and_nested_run_sync()
+    print("✅ Event loop tests passed")
@@ -0,0 +1,63 @@
+"""
+Tests for historical statistics (per-series and matrix versions)
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from ai_agents.forecast_analyzer import analyze_matrix, calculate_trend, calculate_volatility, outlier_mask
+
+
+def test_trend_labels():
+    assert calculate_trend([100, 95, 90]) == "moderate decrease"
+    assert calculate_trend([100, 130]) == "significant growth"
+    assert calculate_trend([5]) == "insufficient data"
+
+
+def test_matrix_matches_per_series_functions():
+    rng = np.random.default_rng(1)
+    values = rng.normal(100, 30, (50, 18)).round()
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[rng.random(values.shape) < 0.1] = 0
+    values[0] = np.nan
+    values[1, :-1] = np.nan
+
+    stats = analyze_matrix(values)
+    for i, row in enumerate(values):
+        clean = [v for v in row if not np.isnan(v)]
+        assert stats.loc[i, 'trend'] == calculate_trend(clean)
+        assert stats.loc[i, 'volatility'] == calculate_volatility(clean)
+        if clean:
+            assert np.isclose(stats.loc[i, 'mean'], np.mean(clean))
+            assert np.isclose(stats.loc[i, 'std'], np.std(clean))
+            assert stats.loc[i, 'last'] == clean[-1]
+    assert stats.loc[0, 'n'] == 0 and np.isnan(stats.loc[0, 'mean'])
+
+
+def test_slope_seasonality_and_outliers():
+    t = np.arange(36)
+    seasonal = 1000 + 5 * t + 200 * np.sin(2 * np.pi * t / 12)
+    noise = np.random.default_rng(2).normal(1000, 50, 36)
+    spiked = 1000 + 5 * t.astype(float)
+    spiked[-1] = 10000
+
+    stats = analyze_matrix(np.vstack([seasonal, noise, spiked]))
+
+    assert stats.loc[0, 'seasonality_strength'] > 0.9
+    assert stats.loc[1, 'seasonality_strength'] < stats.loc[0, 'seasonality_strength']
+    assert stats.loc[0, 'acf_season'] > 0.5
+    # The spike barely moves the robust slope and is the only outlier
+    assert abs(stats.loc[2, 'slope'] - 5) < 0.5
+    assert stats.loc[2, 'outliers'] == 1 and stats.loc[2, 'last_is_outlier']
+    assert not outlier_mask(np.zeros((1, 12))).any()
+
+
+if __name__ == "__main__":
+    test_trend_labels()
+    test_matrix_matches_per_series_functions()
+    test_slope_seasonality_and_outliers()
+    print("✅ Forecast analyzer tests passed")
@@ -0,0 +1,147 @@
+"""
+Tests for concurrent per-category forecasting against a local stub Runner
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import re
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from ai_agents.forecast_agent import (
+    BatchForecastResponse, CategoryForecast, ForecastAgent, ForecastAgentResponse,
+    iter_cashflow_forecast,
+)
+from ai_agents.runner import set_runner
+
+
+class SlowRunner:
+    """Answers after a fixed delay with the category number as the amount."""
+
+    def __init__(self, delay: float = 0.05, fail=(), hang=()):
+        self.delay, self.fail, self.hang = delay, set(fail), set(hang)
+        self.in_flight = self.peak = 0
+
+    async def run(self, agent, message):
+        number = int(re.search(r"cat(\d+)", message).group(1))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later categories answer first, so ordering is exercised
+            await asyncio.sleep(self.delay * (1 + 1 / (number + 1)))
+            if number in self.hang:
+                await asyncio.sleep(10)
+            if number in self.fail:
+                raise RuntimeError("API error")
+            return SimpleNamespace(final_output=ForecastAgentResponse(amount=number, justification="stub"))
+        finally:
+            self.in_flight -= 1
+
+
+class BatchRunner:
+    """Answers batched prompts; drops every 5th category on the first try."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seen = set()
+
+    async def run(self, agent, message):
+        self.calls += 1
+        items = []
+        for line in message.splitlines()[1:]:
+            category = line.split(" | ")[0]
+            number = int(category[3:])
+            if number % 5 == 0 and category not in self.seen:
+                self.seen.add(category)
+                continue
+            items.append(CategoryForecast(category=category, amount=number, justification="batch"))
+        return SimpleNamespace(final_output=BatchForecastResponse(forecasts=items))
+
+
+def _wide(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'category': [f"cat{i}" for i in range(n)],
+        'Jan 2025': 1.0,
+        'Feb 2025': -7.0,
+    })
+
+
+def _run(runner, df, **kwargs) -> pd.DataFrame:
+    previous = set_runner(runner)
+    try:
+        return asyncio.run(ForecastAgent().build_cashflow_forecast(df, None, **kwargs))
+    finally:
+        set_runner(previous)
+
+
+def test_categories_run_concurrently_in_order():
+    runner = SlowRunner(delay=0.05)
+    start = time.perf_counter()
+    result = _run(runner, _wide(300), max_concurrency=100)
+    elapsed = time.perf_counter() - start
+
+    assert list(result['ai_forecast']) == list(range(300))
+    assert runner.peak == 100
+    # 3 waves of ~0.1s instead of 300 sequential round trips
+    assert elapsed < 2
+
+
+def test_failures_and_timeouts_fall_back_to_last_value():
+    runner = SlowRunner(delay=0.01, fail={1}, hang={2})
+    result = _run(runner, _wide(4), timeout=0.5)
+
+    assert list(result['ai_forecast']) == [0, -7.0, -7.0, 3]
+    assert 'failed' in result.loc[1, 'ai_comments']
+    assert 'timed out' in result.loc[2, 'ai_comments']
+
+
+def test_batches_fit_budget_and_retry_omitted_categories():
+    agent = ForecastAgent()
+    batches = agent.make_batches(_wide(200), token_budget=1000)
+    assert len(batches) > 1
+    assert sum(len(b) for b in batches) == 200
+
+    runner = BatchRunner()
+    previous = set_runner(runner)
+    try:
+        result = asyncio.run(agent.build_cashflow_forecast(_wide(200), None, batch=True))
+    finally:
+        set_runner(previous)
+
+    assert list(result['ai_forecast']) == list(range(200))
+    # One request per batch plus retries for the omitted categories
+    assert runner.calls < 200 // 2
+
+
+def test_stream_yields_early_results_and_cancels_on_close():
+    runner = SlowRunner(delay=0.01, hang=set(range(1, 20)))
+    previous = set_runner(runner)
+    try:
+        start = time.perf_counter()
+        stream = iter_cashflow_forecast(_wide(20))
+        first = next(stream)
+        first_latency = time.perf_counter() - start
+        stream.close()
+        time.sleep(0.1)
+    finally:
+        set_runner(previous)
+
+    # The one fast category arrives without waiting for the hanging ones
+    assert (first.category, first.amount, first.done, first.total) == ("cat0", 0, 1, 20)
+    assert first_latency < 2
+    # Closing the stream cancelled the calls still in flight
+    assert runner.in_flight == 0
+
+
+if __name__ == "__main__":
+    test_categories_run_concurrently_in_order()
+    test_failures_and_timeouts_fall_back_to_last_value()
+    test_batches_fit_budget_and_retry_omitted_categories()
+    test_stream_yields_early_results_and_cancels_on_close()
+    print("✅ Forecast concurrency tests passed")
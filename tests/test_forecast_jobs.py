@@ -0,0 +1,187 @@
+"""
+Tests for durable bulk forecast jobs
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+from collections import Counter
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import config
+import core.db
+from ai_agents.jobs import forecast_job_results, run_forecast_job, submit_forecast_job
+from ai_agents.resilience import reset_breakers
+from ai_agents.runner import set_runner
+from ai_agents.stub import StubLatency, StubRunner
+from core.db import get_forecast_job
+from core.models import Base
+
+
+@pytest.fixture
+def job_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(core.db, "engine", engine)
+    monkeypatch.setattr(core.db, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    yield engine
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run."""
+
+
+class CountingStub(StubRunner):
+    """Counts forecast prompts per category; optionally crashes on the n-th call."""
+
+    def __init__(self, crash_at=None, fail=()):
+        super().__init__(StubLatency(median_ms=1, sigma=0))
+        self.crash_at = crash_at
+        self.fail = set(fail)
+        self.seen = Counter()
+
+    async def run(self, agent, input, **kwargs):
+        category = input.split('Category: "')[1].split('"')[0]
+        self.seen[category] += 1
+        if self.crash_at is not None and sum(self.seen.values()) >= self.crash_at:
+            raise Crash()
+        if category in self.fail:
+            raise RuntimeError("provider error")
+        return await super().run(agent, input)
+
+
+def _wide(n_entities=2, n_categories=5):
+    rows = [
+        {'entity': f"E{e}", 'category': f"C{c}", 'Jan 2025': 10.0 * c, 'Feb 2025': 10.0 * c + e}
+        for e in range(n_entities) for c in range(n_categories)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_job_resumes_after_crash_without_repeating_items(job_db):
+    df = pd.concat([_wide(), _wide().head(1)])      # one duplicate row is deduped
+    job_id = submit_forecast_job(df, description="month-end")
+    assert get_forecast_job(job_id)['total_items'] == 10
+
+    crashing = CountingStub(crash_at=7)
+    previous = set_runner(crashing)
+    try:
+        with pytest.raises(Crash):
+            asyncio.run(run_forecast_job(job_id, chunk_size=4, checkpoint_items=2, max_concurrency=1))
+    finally:
+        set_runner(previous)
+
+    checkpoint = get_forecast_job(job_id)
+    assert checkpoint['status'] == "running"
+    assert 4 <= checkpoint['done_items'] < 10
+    saved = forecast_job_results(job_id)
+    saved = set((saved['entity'] + " / " + saved['category'])[saved['status'] == "done"])
+
+    resumed = CountingStub()
+    set_runner(resumed)
+    try:
+        job = asyncio.run(run_forecast_job(job_id, chunk_size=4, checkpoint_items=2, max_concurrency=1))
+    finally:
+        set_runner(previous)
+
+    assert job['status'] == "completed" and job['done_items'] == 10
+    # Only items without a checkpointed result are forecast again
+    assert sum(resumed.seen.values()) == 10 - checkpoint['done_items']
+    assert not set(resumed.seen) & saved
+
+    results = forecast_job_results(job_id)
+    assert (results['status'] == "done").all()
+    row = results[(results['entity'] == "E1") & (results['category'] == "C3")].iloc[0]
+    assert row['forecast_amount'] == 31.0
+
+
+def test_failed_items_retried_up_to_max_attempts(job_db, monkeypatch):
+    monkeypatch.setattr(config, "FORECAST_JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(config, "FORECAST_JOB_RETRY_BASE_DELAY", 0.01)
+    job_id = submit_forecast_job(_wide(n_entities=1, n_categories=3))
+
+    runner = CountingStub(fail={"E0 / C1"})
+    previous = set_runner(runner)
+    try:
+        job = asyncio.run(run_forecast_job(job_id))
+        again = asyncio.run(run_forecast_job(job_id))
+    finally:
+        set_runner(previous)
+
+    assert job['status'] == again['status'] == "completed_with_errors"
+    assert (job['done_items'], job['failed_items']) == (2, 1)
+    # The rerun retries only the failed item, with fresh attempts
+    assert (again['done_items'], again['failed_items']) == (2, 1)
+    assert runner.seen == Counter({"E0 / C0": 1, "E0 / C1": 4, "E0 / C2": 1})
+    results = forecast_job_results(job_id).set_index('category')
+    failed = results.loc["C1"]
+    assert failed['attempts'] == 2 and failed['forecast_amount'] == 10.0
+    assert failed['source'] == "fallback" and results.loc["C0", 'source'] == "llm"
+
+
+def test_outage_pauses_job_without_using_up_attempts(job_db, monkeypatch):
+    monkeypatch.setattr(config, "AGENT_MAX_RETRIES", 0)
+    monkeypatch.setattr(config, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(config, "FORECAST_JOB_RETRY_BASE_DELAY", 0.01)
+    job_id = submit_forecast_job(_wide(n_entities=1, n_categories=5))
+
+    class Down(CountingStub):
+        async def run(self, agent, input, **kwargs):
+            await super().run(agent, input)
+            raise RuntimeError("provider down")
+
+    reset_breakers()
+    down = Down()
+    previous = set_runner(down, use_resilience=True)
+    try:
+        job = asyncio.run(run_forecast_job(job_id, max_concurrency=1))
+    finally:
+        set_runner(previous)
+        reset_breakers()
+
+    # Two failures open the circuit; the rest wait for the next run
+    assert job['status'] == "paused"
+    assert sum(down.seen.values()) == 2 and job['failed_items'] == 2
+    results = forecast_job_results(job_id)
+    assert sorted(results['attempts']) == [0, 0, 0, 1, 1]
+
+    resumed = CountingStub()
+    set_runner(resumed)
+    try:
+        job = asyncio.run(run_forecast_job(job_id))
+    finally:
+        set_runner(previous)
+    assert job['status'] == "completed" and job['done_items'] == 5
+    # The two failed items and the three untouched ones are all forecast
+    assert sum(resumed.seen.values()) == 5
+
+
+def test_status_follows_source_not_wording(job_db):
+    job_id = submit_forecast_job(_wide(n_entities=1, n_categories=2))
+
+    class Lookalike(CountingStub):
+        """Model output whose justification reads like a fallback comment."""
+
+        async def run(self, agent, input, **kwargs):
+            result = await super().run(agent, input)
+            result.final_output.justification = "AI forecast failed (model); last value used"
+            return result
+
+    previous = set_runner(Lookalike())
+    try:
+        job = asyncio.run(run_forecast_job(job_id))
+    finally:
+        set_runner(previous)
+
+    assert (job['done_items'], job['failed_items']) == (2, 0)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
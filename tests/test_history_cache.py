@@ -0,0 +1,80 @@
+"""
+Tests for the content-addressed history cache
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+import config
+import core.history_cache
+from core.history_cache import HistoryCache, file_key, load_history_cached
+from core.io_historical import load_history_from_file
+
+project_root = Path(__file__).parent.parent
+SAMPLE = project_root / 'data' / 'sample_cashflow.csv'
+
+
+def test_second_load_is_served_from_cache(tmp_path, monkeypatch):
+    cache = HistoryCache(directory=str(tmp_path), max_mb=10)
+    first = load_history_cached(io.BytesIO(SAMPLE.read_bytes()), cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file parsed again")
+
+    monkeypatch.setattr(core.history_cache, "load_history_from_file", fail)
+    buffer = io.BytesIO(SAMPLE.read_bytes())
+    second = load_history_cached(buffer, cache=cache)
+
+    pd.testing.assert_frame_equal(second, first)
+    pd.testing.assert_frame_equal(second, load_history_from_file(str(SAMPLE)))
+    assert buffer.tell() == 0
+    assert cache.stats()['hits'] == 1 and cache.stats()['files'] == 1
+
+
+def test_least_recently_used_files_evicted(tmp_path):
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=5000, freq='h'),
+        'category': 'Sales',
+        'amount': np.arange(5000, dtype=float),
+    })
+    cache = HistoryCache(directory=str(tmp_path), max_mb=0.4)
+    for i, key in enumerate("abc"):
+        cache.put(key, df)
+        os.utime(tmp_path / f"{key}.arrow", (i, i))   # a oldest, c newest
+    assert cache.get("a") is not None               # a becomes most recent
+
+    cache.put("d", df)
+    assert cache.stats()['size_mb'] <= 0.4
+    assert cache.get("b") is None and cache.get("d") is not None
+
+
+def test_corrupt_file_is_dropped_and_reparsed(tmp_path):
+    cache = HistoryCache(directory=str(tmp_path), max_mb=10)
+    expected = load_history_cached(str(SAMPLE), cache=cache)
+    (path,) = tmp_path.glob("*.arrow")
+    path.write_bytes(path.read_bytes()[:10])       # truncated write
+
+    pd.testing.assert_frame_equal(load_history_cached(str(SAMPLE), cache=cache), expected)
+    assert cache.stats()['misses'] == 2 and cache.stats()['files'] == 1
+    assert cache.get(path.stem) is not None
+
+
+def test_key_covers_content_and_loader_settings(monkeypatch):
+    key = file_key(str(SAMPLE))
+    assert file_key(io.BytesIO(SAMPLE.read_bytes())) == key
+    monkeypatch.setattr(config, "HIST_STREAM_MIN_MB", 0.0)
+    assert file_key(str(SAMPLE)) != key
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
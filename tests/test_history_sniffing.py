@@ -0,0 +1,64 @@
+"""
+Tests for format sniffing of uploaded history files
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import io
+
+import pandas as pd
+import pytest
+
+from core.io_historical import load_history_from_file, sniff_format
+
+project_root = Path(__file__).parent.parent
+SAMPLE = project_root / 'data' / 'sample_cashflow.csv'
+
+
+def _upload(data: bytes, name: str) -> io.BytesIO:
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+def test_parser_chosen_from_content_not_name():
+    expected = load_history_from_file(str(SAMPLE))
+    assert expected.attrs['load_report']['format'] == 'csv'
+
+    # Cyrillic semicolon-separated CSV from a Windows export
+    text = SAMPLE.read_text(encoding='utf-8').replace(',', ';')
+    upload = _upload(text.encode('cp1251'), 'export.xls')
+    assert sniff_format(upload) == {'format': 'csv', 'encoding': 'cp1251', 'delimiter': ';'}
+    pd.testing.assert_frame_equal(load_history_from_file(upload), expected)
+
+    workbook = io.BytesIO()
+    pd.read_csv(SAMPLE).to_excel(workbook, index=False)
+    upload = _upload(workbook.getvalue(), '')
+    df = load_history_from_file(upload)
+    pd.testing.assert_frame_equal(df, expected)
+    report = df.attrs['load_report']
+    assert report['format'] == 'xlsx'
+    assert set(report['timings_ms']) == {'sniff', 'parse', 'normalize'}
+
+
+def test_ragged_csv_rows_are_padded():
+    text = "date,category,amount,note\n2024-01-05,Sales,100,first\n2024-02-05,Sales,120\n2024-02-07,Rent,-50,\n"
+    df = load_history_from_file(_upload(text.encode(), 'ledger.csv'))
+    assert list(df['amount']) == [100.0, 120.0, -50.0]
+    assert df.attrs['load_report']['engine'] == 'c'
+
+
+def test_broken_workbook_is_reported_not_parsed_as_csv():
+    upload = _upload(b'PK\x03\x04' + b'\x00' * 100, 'history.xlsx')
+    with pytest.raises(ValueError, match="Error reading file"):
+        load_history_from_file(upload)
+
+    with pytest.raises(ValueError, match="Unsupported file format"):
+        load_history_from_file(_upload(b'\x89PNG\r\n\x1a\n\x00\x00', 'chart.png'))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
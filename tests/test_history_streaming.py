@@ -0,0 +1,71 @@
+"""
+Tests for the chunked CSV history loader
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from core.io_historical import load_history_from_file, load_history_streaming
+
+project_root = Path(__file__).parent.parent
+
+
+def _ledger(path, n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    df = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'category': rng.choice(['Sales', 'Rent', 'Payroll'], n),
+        'amount': rng.normal(100, 30, n).round(2),
+        'memo': 'invoice',
+    })
+    df.loc[3, 'amount'] = np.nan
+    df.loc[4, 'date'] = np.nan
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_streaming_matches_monthly_totals(tmp_path):
+    path = str(tmp_path / 'ledger.csv')
+    _ledger(path)
+
+    full = load_history_from_file(path)
+    expected = (
+        full.groupby([full['date'].dt.to_period('M').dt.to_timestamp(), 'category'])['amount']
+        .sum().reset_index()
+    )
+    streamed = load_history_streaming(path, chunksize=333)
+
+    assert list(streamed.columns) == ['date', 'category', 'amount']
+    assert len(streamed) == 36
+    pd.testing.assert_frame_equal(streamed, expected, check_exact=False)
+
+
+def test_chunksize_routes_long_csv_only(tmp_path):
+    path = str(tmp_path / 'ledger.csv')
+    _ledger(path, n=100)
+    assert len(load_history_from_file(path, chunksize=10)) <= 36
+
+    # Wide files (items x months) keep the regular loader
+    wide = load_history_from_file(str(project_root / 'data' / 'sample_cashflow.csv'), chunksize=10)
+    assert len(wide) == 90
+
+
+def test_day_first_dates_parsed_consistently_across_chunks(tmp_path):
+    path = tmp_path / 'ledger.csv'
+    path.write_text("date,category,amount\n13/01/2024,Sales,1\n01/02/2024,Sales,10\n05/03/2024,Sales,100\n")
+
+    streamed = load_history_streaming(str(path), chunksize=1)
+    assert list(streamed['date'].dt.month) == [1, 2, 3]
+    assert list(streamed['amount']) == [1.0, 10.0, 100.0]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,143 @@
+"""
+Tests for the dependency-graph analysis pipeline
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from ai_agents.driver_agent import DriverAnalysisResponse
+from ai_agents.explainer_agent import ForecastExplanation
+from ai_agents.orchestrator import AnalysisPipeline, Pipeline
+from ai_agents.runner import set_runner
+from ai_agents.scenario_agent import ScenarioAnalysisResponse, ScenarioSuggestion
+from drivers.models import ForecastDrivers, RevenueDrivers, WorkingCapitalDrivers
+
+
+def _sleeper(seconds, value, calls):
+    async def node(**kwargs):
+        calls.append(value)
+        await asyncio.sleep(seconds)
+        return (value, kwargs)
+    return node
+
+
+def test_independent_nodes_run_concurrently():
+    calls = []
+    pipeline = (
+        Pipeline()
+        .add("a", _sleeper(0.2, "a", calls), inputs=("x",))
+        .add("b", _sleeper(0.3, "b", calls))
+        .add("c", _sleeper(0.2, "c", calls), deps=("a",))
+    )
+    result = asyncio.run(pipeline.run({"x": 1}))
+
+    assert not result.errors
+    assert result.outputs["c"][1]["a"] == ("a", {"x": 1})
+    assert result.critical_path == ["a", "c"]
+    assert result.wall_ms < 550 < result.sum_ms
+    assert abs(result.wall_ms - result.critical_path_ms) < 150
+
+
+def test_results_cached_by_input_fingerprint():
+    calls = []
+    pipeline = (
+        Pipeline()
+        .add("a", _sleeper(0, "a", calls), inputs=("x",))
+        .add("b", _sleeper(0, "b", calls), inputs=("y",))
+        .add("c", _sleeper(0, "c", calls), deps=("a", "b"))
+    )
+    asyncio.run(pipeline.run({"x": pd.DataFrame({"v": [1, 2]}), "y": 1}))
+    again = asyncio.run(pipeline.run({"x": pd.DataFrame({"v": [1, 2]}), "y": 1}))
+    assert calls == ["a", "b", "c"]
+    assert again.timings["cached"].all()
+
+    # A changed input reruns its node and everything downstream only
+    asyncio.run(pipeline.run({"x": pd.DataFrame({"v": [1, 2]}), "y": 2}))
+    assert calls == ["a", "b", "c", "b", "c"]
+
+
+def test_failure_skips_downstream_only():
+    def broken():
+        raise ValueError("bad input")
+
+    pipeline = (
+        Pipeline()
+        .add("a", broken)
+        .add("b", lambda: 1)
+        .add("c", lambda a: a, deps=("a",))
+        .add("d", lambda b: b + 1, deps=("b",), output_type=int)
+    )
+    result = asyncio.run(pipeline.run({}))
+    assert result.outputs == {"b": 1, "d": 2}
+    assert "bad input" in result.errors["a"] and result.errors["c"].startswith("skipped")
+
+
+class AgentStubRunner:
+    """Answers each agent after a fixed delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def run(self, agent, message):
+        await asyncio.sleep(self.delay)
+        if agent.output_type is DriverAnalysisResponse:
+            output = DriverAnalysisResponse(
+                recommendations=[], overall_assessment="ok", risk_factors=[], opportunities=[]
+            )
+        elif agent.output_type is ScenarioAnalysisResponse:
+            output = ScenarioAnalysisResponse(
+                scenarios=[ScenarioSuggestion(
+                    scenario_name="Faster collections", description="", reasoning="",
+                    driver_adjustments={"dso_days": 0.8}, probability=0.5,
+                )],
+                key_uncertainties=[], recommendation="",
+            )
+        else:
+            output = ForecastExplanation(
+                summary="stable", key_drivers=[], assumptions=[], risks=[],
+                confidence_level="medium", recommendation="",
+            )
+        return SimpleNamespace(final_output=output)
+
+
+def test_full_analysis_costs_critical_path():
+    history = pd.DataFrame({
+        'category': 'Sales',
+        'date': pd.date_range('2024-01-01', periods=6, freq='MS'),
+        'amount': [1000.0, 1100, 1050, 1200, 1150, 1300],
+    })
+    drivers = ForecastDrivers(
+        working_capital=WorkingCapitalDrivers(dso_days=40, dpo_days=30, dio_days=20),
+        revenue=RevenueDrivers(revenue_growth_pct=10, gross_margin_pct=35),
+    )
+    previous = set_runner(AgentStubRunner(0.2), use_cache=False)
+    try:
+        result = asyncio.run(AnalysisPipeline().run(
+            {"df_history": history, "drivers": drivers, "industry": "services", "periods": 6}
+        ))
+    finally:
+        set_runner(previous)
+
+    assert not result.errors
+    assert len(result.outputs["forecast"]) == 6
+    results, rejected = result.outputs["scenario_evaluation"]
+    assert "Faster collections" in results and not rejected
+    assert result.outputs["explanation"].summary == "stable"
+    # Three 0.2s agent calls, two of them in parallel with the third
+    assert result.wall_ms < 550 < result.sum_ms
+
+
+if __name__ == "__main__":
+    test_independent_nodes_run_concurrently()
+    test_results_cached_by_input_fingerprint()
+    test_failure_skips_downstream_only()
+    test_full_analysis_costs_critical_path()
+    print("✅ Orchestrator tests passed")
@@ -0,0 +1,82 @@
+"""
+Tests for the payment-run scheduler
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from drivers.models import WorkingCapitalDrivers
+from forecasting.payment_scheduler import PaymentRunScheduler
+
+STARTS = pd.date_range('2025-01-06', periods=13, freq='7D')
+
+
+def _payables(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    issue = pd.Timestamp('2024-12-20') + pd.to_timedelta(rng.integers(0, 50, n), 'D')
+    return pd.DataFrame({
+        'invoice_id': [f"INV{i}" for i in range(n)],
+        'counterparty': rng.integers(0, 20, n).astype(str),
+        'amount': rng.uniform(100, 1000, n),
+        'issue_date': issue,
+        'due_date': issue + pd.Timedelta(days=30),
+    })
+
+
+def _cash(level: float) -> pd.DataFrame:
+    return pd.DataFrame({'period_start': STARTS, 'closing_cash': np.full(13, level)})
+
+
+def test_pays_on_due_date_when_cash_allows():
+    payables = _payables(200)
+    result = PaymentRunScheduler(min_cash=0).schedule(payables, _cash(1e9))
+
+    assert result.late_invoices == 0
+    assert (result.schedule['pay_date'] == result.schedule['due_date']).all()
+    assert abs(result.effective_dpo - 30) < 1e-9
+    wc = result.to_working_capital(WorkingCapitalDrivers(dso_days=40, dpo_days=10, dio_days=20))
+    assert wc.dpo_days == 30
+
+
+def test_cash_floor_is_respected():
+    payables = _payables(500)
+    result = PaymentRunScheduler(min_cash=20000).schedule(payables, _cash(100000))
+
+    assert (result.closing_cash >= 20000 - 1e-6).all()
+    assert result.late_invoices > 0
+    assert np.isclose(result.period_payments.sum(), result.schedule['paid_amount'].sum())
+
+
+def test_discount_taken_when_return_beats_cost_of_capital():
+    payables = _payables(50)
+    payables['discount_pct'] = 2.0
+    payables['discount_date'] = payables['issue_date'] + pd.Timedelta(days=10)
+    payables.loc[payables['discount_date'] < STARTS[0], 'discount_pct'] = 0.0
+
+    result = PaymentRunScheduler(cost_of_capital_pct=8).schedule(payables, _cash(1e9))
+    taken = result.schedule['discount_taken']
+    assert taken.sum() == (payables['discount_pct'] > 0).sum()
+    assert np.isclose(result.discounts_captured, payables.loc[taken, 'amount'].sum() * 0.02)
+    assert result.effective_dpo < 30
+
+
+def test_exact_mode_respects_floor():
+    pytest.importorskip("scipy")
+
+    payables = _payables(40, seed=3)
+    result = PaymentRunScheduler(min_cash=1000).schedule(payables, _cash(12000), method='exact')
+    assert (result.closing_cash >= 1000 - 1e-6).all()
+
+
+if __name__ == "__main__":
+    test_pays_on_due_date_when_cash_allows()
+    test_cash_floor_is_respected()
+    test_discount_taken_when_return_beats_cost_of_capital()
+    test_exact_mode_respects_floor()
+    print("✅ Payment scheduler tests passed")
@@ -0,0 +1,68 @@
+"""
+Tests for prompt compaction and token accounting
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from ai_agents.prompting import (
+    PromptBudgetError, PromptBuilder, compact_json, count_tokens, record_call, series_digest,
+    summarize_prompt_metrics,
+)
+
+
+def test_digest_is_compact_and_rounded():
+    values = list(np.random.default_rng(0).normal(1e5, 1e4, 36)) + [np.nan]
+    digest = series_digest(values, max_points=6)
+
+    assert digest['n'] == 36
+    assert len(digest['recent']) == 6
+    text = compact_json(digest)
+    assert '.' not in text.split('"recent"')[1]   # large values rounded to integers
+    assert compact_json({'a': np.float64(0.12345), 'b': np.int64(3)}) == '{"a":0.12,"b":3}'
+
+
+def test_builder_shrinks_to_budget_and_records_savings():
+    history = {'values': list(range(1000, 1200))}
+    message = PromptBuilder('forecast', budget=120).build('Forecast.', {'History': history})
+    assert count_tokens(message) <= 120
+    assert '1199' in message          # most recent values are kept
+    assert 'NOTE: lists in History are truncated' in message
+
+    metric = record_call('forecast_agent', message, latency_ms=5.0)
+    assert metric.tokens_saved > 0
+    assert summarize_prompt_metrics().loc['forecast_agent', 'calls'] >= 1
+
+
+def test_only_history_sections_are_shrunk():
+    factors = [round(1 + i / 100, 2) for i in range(12)]
+    sections = {'SEASONALITY': factors, 'HISTORICAL CONTEXT': {'values': list(range(1000, 1200))}}
+    message = PromptBuilder('driver', budget=150).build('Analyze.', sections)
+    assert compact_json(factors) in message
+    assert 'NOTE: lists in HISTORICAL CONTEXT are truncated' in message
+
+    try:
+        PromptBuilder('driver', budget=20).build('Analyze.', {'FORECAST': list(range(1000, 1200))})
+    except PromptBudgetError:
+        return
+    raise AssertionError("Forecast section was truncated")
+
+
+def test_budget_error_when_prompt_cannot_fit():
+    try:
+        PromptBuilder('driver', budget=5).build('x' * 200, {'A': 1})
+    except PromptBudgetError:
+        return
+    raise AssertionError("PromptBudgetError not raised")
+
+
+if __name__ == "__main__":
+    test_digest_is_compact_and_rounded()
+    test_builder_shrinks_to_budget_and_records_savings()
+    test_only_history_sections_are_shrunk()
+    test_budget_error_when_prompt_cannot_fit()
+    print("✅ Prompting tests passed")
@@ -0,0 +1,145 @@
+"""
+Tests for agent call deadlines, retries, hedging and circuit breaking
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+import config
+from ai_agents.forecast_agent import ForecastAgent, ForecastAgentResponse
+from ai_agents.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    get_latency_tracker,
+    latency_histograms,
+    reset_breakers,
+    resilient_call,
+)
+from ai_agents.runner import run_agent, set_runner
+from ai_agents.scheduler import RequestScheduler, set_scheduler
+
+
+def test_retries_then_succeeds(monkeypatch):
+    monkeypatch.setattr(config, "AGENT_RETRY_BASE_DELAY", 0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("503")
+        return "ok"
+
+    reset_breakers()
+    assert asyncio.run(resilient_call("flaky", flaky, retries=2, hedge=False)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_hedge_fires_after_p95_and_first_response_wins(monkeypatch):
+    monkeypatch.setattr(config, "AGENT_HEDGE_MIN_SAMPLES", 5)
+    tracker = get_latency_tracker()
+    for _ in range(20):
+        tracker.record("hedged", 0.02)
+    delays = iter([5.0, 0.01])   # the first request stalls, the hedge is fast
+    started = []
+
+    async def call():
+        delay = next(delays)
+        started.append(delay)
+        await asyncio.sleep(delay)
+        return delay
+
+    reset_breakers()
+    start = time.perf_counter()
+    result = asyncio.run(resilient_call("hedged", call, deadline=3))
+    assert result == 0.01
+    assert started == [5.0, 0.01]
+    assert time.perf_counter() - start < 1
+
+
+def test_circuit_opens_then_half_open_trial_closes_it():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the single trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+class FailingRunner:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, agent, message):
+        self.calls += 1
+        raise RuntimeError("provider down")
+
+
+def test_open_circuit_falls_back_to_baseline(monkeypatch):
+    monkeypatch.setattr(config, "AGENT_MAX_RETRIES", 0)
+    monkeypatch.setattr(config, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    reset_breakers()
+    runner = FailingRunner()
+    previous = set_runner(runner, use_resilience=True)
+    df = pd.DataFrame({'category': [f"cat{i}" for i in range(6)], 'Jan 2025': 1.0, 'Feb 2025': 3.0})
+    try:
+        result = asyncio.run(ForecastAgent().build_cashflow_forecast(df, None, max_concurrency=1))
+    finally:
+        set_runner(previous)
+        reset_breakers()
+
+    # Two failed calls open the circuit; the rest never reach the provider
+    assert runner.calls == 2
+    assert list(result['ai_forecast'][:2]) == [3.0, 3.0]
+    assert all('circuit open' in c for c in result['ai_comments'][2:])
+
+
+def test_deadline_starts_after_scheduler_admission():
+    class SlowRunner:
+        async def run(self, agent, message):
+            await asyncio.sleep(0.1)
+            return SimpleNamespace(final_output=ForecastAgentResponse(amount=1, justification="stub"))
+
+    # 2 requests per second with the burst used up: ~0.5 s in the queue
+    scheduler = RequestScheduler(requests_per_minute=120, tokens_per_minute=1e9)
+    scheduler.requests.level = 0
+    reset_breakers()
+    previous_runner = set_runner(SlowRunner(), use_scheduler=True, use_resilience=True)
+    previous_scheduler = set_scheduler(scheduler)
+    try:
+        result = asyncio.run(run_agent(ForecastAgent().agent, "forecast", use_cache=False, deadline=0.3))
+    finally:
+        set_runner(previous_runner)
+        set_scheduler(previous_scheduler)
+        reset_breakers()
+    assert result.final_output.amount == 1
+
+
+def test_latency_histograms():
+    tracker = LatencyTracker()
+    for seconds in (0.05, 0.3, 0.3, 2.5):
+        tracker.record("a", seconds)
+    hist = tracker.histograms()
+    counts = dict(zip(hist['le_ms'], hist['count']))
+    assert (counts[100], counts[500], counts[5000]) == (1, 2, 1)
+    assert hist['count'].sum() == 4
+    assert tracker.summary().loc[0, 'calls'] == 4
+    assert list(latency_histograms().columns) == ['agent', 'le_ms', 'count']
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,92 @@
+"""
+Tests for batched evaluation of AI-suggested scenarios
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import time
+
+import pandas as pd
+import pytest
+
+from ai_agents.scenario_agent import ScenarioAnalysisResponse, ScenarioSuggestion, evaluate_suggestions
+from drivers.models import ForecastDrivers, RevenueDrivers, WorkingCapitalDrivers
+from forecasting.driver_based import DriverBasedForecaster
+from forecasting.scenarios import WEIGHTED_SCENARIO, apply_adjustments
+
+BASE = ForecastDrivers(
+    working_capital=WorkingCapitalDrivers(dso_days=40, dpo_days=30, dio_days=20),
+    revenue=RevenueDrivers(revenue_growth_pct=10, gross_margin_pct=35),
+)
+HISTORY = pd.DataFrame({'revenue': [1000.0, 1100.0]})
+
+
+def _suggestion(name, adjustments, probability):
+    return ScenarioSuggestion(
+        scenario_name=name, description=name, driver_adjustments=adjustments,
+        probability=probability, reasoning="",
+    )
+
+
+def test_apply_adjustments():
+    drivers, warnings = apply_adjustments(BASE, {'DSO': 0.5, 'revenue_growth_pct': 2, 'fx_rate': 1.1})
+    assert drivers.working_capital.dso_days == 20
+    assert drivers.revenue.revenue_growth_pct == 20
+    assert BASE.working_capital.dso_days == 40
+    assert any('fx_rate' in w for w in warnings)
+
+    with pytest.raises(ValueError, match="out of range"):
+        apply_adjustments(BASE, {'dso_days': 10})
+
+
+def test_evaluate_suggestions():
+    suggestions = ScenarioAnalysisResponse(
+        scenarios=[
+            _suggestion("Base", {}, 0.5),
+            _suggestion("Upside", {'dso_days': 0.8, 'revenue_growth_pct': 1.5}, 0.3),
+            _suggestion("Stress", {'dso_days': 1.5, 'gross_margin_pct': 0.7}, 0.2),
+            _suggestion("Broken", {'dpo_days': 20}, 0.1),
+        ],
+        key_uncertainties=[],
+        recommendation="",
+    )
+
+    start = time.perf_counter()
+    results, rejected = evaluate_suggestions(suggestions, BASE, HISTORY, n_simulations=500)
+    assert time.perf_counter() - start < 1
+
+    assert list(rejected) == ["Broken"]
+    expected = DriverBasedForecaster(BASE).generate_forecast(HISTORY, 12)
+    assert results["Base"]["total_fcf"] == pytest.approx(expected["free_cashflow"].sum())
+    assert results["Upside"]["total_fcf"] > results["Stress"]["total_fcf"]
+    assert "p95" in results["Stress"]["monte_carlo"]
+
+    weighted = sum(results[n]["total_fcf"] * p for n, p in [("Base", 0.5), ("Upside", 0.3), ("Stress", 0.2)])
+    assert results[WEIGHTED_SCENARIO]["total_fcf"] == pytest.approx(weighted)
+
+
+def test_duplicate_scenario_names_kept_apart():
+    suggestions = ScenarioAnalysisResponse(
+        scenarios=[
+            _suggestion("Upside", {'dso_days': 0.8}, 0.5),
+            _suggestion("Upside", {'revenue_growth_pct': 1.5}, 0.3),
+            _suggestion(WEIGHTED_SCENARIO, {}, 0.2),
+            _suggestion("Broken", {'dpo_days': 20}, 0.1),
+            _suggestion("Broken", {'dso_days': 10}, 0.1),
+        ],
+        key_uncertainties=[],
+        recommendation="",
+    )
+    results, rejected = evaluate_suggestions(suggestions, BASE, HISTORY)
+
+    assert list(results) == ["Upside", "Upside (2)", f"{WEIGHTED_SCENARIO} (2)", WEIGHTED_SCENARIO]
+    assert results["Upside"]["total_fcf"] != results["Upside (2)"]["total_fcf"]
+    assert list(rejected) == ["Broken", "Broken (2)"]
+    assert "dpo_days" in rejected["Broken"] and "dso_days" in rejected["Broken (2)"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+"""
+Tests for the cross-session LLM request scheduler
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from ai_agents.event_loop import run_sync
+from ai_agents.forecast_agent import ForecastAgent, ForecastAgentResponse
+from ai_agents.runner import set_runner
+from ai_agents.scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    current_session,
+    session_scope,
+    set_scheduler,
+)
+
+
+class SessionRecordingRunner:
+    def __init__(self):
+        self.sessions = []
+
+    async def run(self, agent, message):
+        self.sessions.append(current_session())
+        return SimpleNamespace(final_output=ForecastAgentResponse(amount=1, justification="stub"))
+
+
+def test_requests_per_minute_limit():
+    # 4 requests per second once the burst capacity is used up
+    scheduler = RequestScheduler(requests_per_minute=240, tokens_per_minute=1e9)
+
+    async def main():
+        scheduler.requests.level = 0
+        start = time.monotonic()
+        await asyncio.gather(*(scheduler.acquire(1) for _ in range(4)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert 0.9 <= elapsed < 3
+    assert scheduler.metrics()["by_priority"][0]["granted"] == 4
+
+
+def test_interactive_first_and_round_robin_sessions():
+    scheduler = RequestScheduler(requests_per_minute=600, tokens_per_minute=1e9)
+    order = []
+
+    async def request(label, priority, session):
+        await scheduler.acquire(1, priority, session)
+        order.append(label)
+
+    async def main():
+        # Drain the burst capacity so the rest is granted one by one
+        scheduler.requests.level = 0
+        tasks = [asyncio.create_task(request(f"a{i}", PRIORITY_BULK, "A")) for i in range(4)]
+        tasks += [asyncio.create_task(request(f"b{i}", PRIORITY_BULK, "B")) for i in range(2)]
+        tasks.append(asyncio.create_task(request("explain", PRIORITY_INTERACTIVE, "B")))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order[0] == "explain"
+    # Session B isn't stuck behind all of session A's bulk requests
+    assert order[1:5] == ["a0", "b0", "a1", "b1"]
+
+    metrics = scheduler.metrics()
+    assert metrics["max_queue_depth"] == 7
+    assert metrics["queue_depth"] == 0
+    assert metrics["granted_by_session"] == {"A": 4, "B": 3}
+
+
+def test_cancelled_waiter_does_not_stall_the_queue():
+    scheduler = RequestScheduler(requests_per_minute=120, tokens_per_minute=1e9)
+    scheduler.requests.level = 0
+
+    async def give_up():
+        try:
+            await asyncio.wait_for(scheduler.acquire(1), 0.05)
+        except asyncio.TimeoutError:
+            return "gave up"
+
+    # The refill timer was armed on this loop, which closes with the waiter
+    assert asyncio.run(give_up()) == "gave up"
+
+    async def wait():
+        return await asyncio.wait_for(scheduler.acquire(1), 3)
+
+    assert asyncio.run(wait()) < 1
+    assert scheduler.metrics()["queue_depth"] == 0
+
+
+def test_forecasts_are_scheduled_per_session():
+    runner = SessionRecordingRunner()
+    scheduler = RequestScheduler()
+    previous_runner = set_runner(runner, use_scheduler=True)
+    previous_scheduler = set_scheduler(scheduler)
+    df = pd.DataFrame({'category': ["Rent", "Sales"], 'Jan 2025': [1.0, 2.0]})
+    try:
+        with session_scope("planner-1"):
+            run_sync(ForecastAgent().build_cashflow_forecast(df, None))
+    finally:
+        set_runner(previous_runner)
+        set_scheduler(previous_scheduler)
+
+    # The session set in the calling thread reaches the shared loop
+    assert runner.sessions == ["planner-1", "planner-1"]
+    bulk = scheduler.metrics()["by_priority"]
+    assert [(p["priority"], p["granted"]) for p in bulk] == [("bulk", 2)]
+
+
+if __name__ == "__main__":
+    test_requests_per_minute_limit()
+    test_interactive_first_and_round_robin_sessions()
+    test_cancelled_waiter_does_not_stall_the_queue()
+    test_forecasts_are_scheduled_per_session()
+    print("✅ Scheduler tests passed")
@@ -0,0 +1,114 @@
+"""
+Tests for agent call telemetry
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+
+import pytest
+
+import config
+from ai_agents.forecast_agent import ForecastAgent
+from ai_agents.resilience import reset_breakers
+from ai_agents.runner import run_agent, set_runner
+from ai_agents.stub import StubLatency, StubProviderError, StubRunner
+from ai_agents.telemetry import CallRecord, Telemetry, call_cost, set_telemetry
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    telemetry = Telemetry(
+        jsonl_path=str(tmp_path / "calls.jsonl"),
+        prometheus_path=str(tmp_path / "metrics.prom"),
+        export_seconds=3600,
+    )
+    previous = set_telemetry(telemetry)
+    yield telemetry
+    set_telemetry(previous)
+
+
+class FlakyRunner(StubRunner):
+    """Fails the first attempt of every call."""
+
+    async def run(self, agent, input, **kwargs):
+        self.calls["attempts"] += 1
+        if self.calls["attempts"] % 2:
+            raise StubProviderError("first attempt")
+        return await super().run(agent, input)
+
+
+def test_calls_are_recorded(telemetry, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "AGENT_RETRY_BASE_DELAY", 0.001)
+    monkeypatch.setattr(config, "AGENT_HEDGE_ENABLED", False)
+    agent = ForecastAgent().agent
+    reset_breakers()
+    previous = set_runner(FlakyRunner(StubLatency(median_ms=1, sigma=0)), use_resilience=True)
+    try:
+        result = asyncio.run(run_agent(agent, 'History: {"last": 5}'))
+    finally:
+        set_runner(previous)
+
+    set_runner(StubRunner(StubLatency(median_ms=1, sigma=0), failure_rate=1.0))
+    try:
+        with pytest.raises(StubProviderError):
+            asyncio.run(run_agent(agent, 'History: {"last": 6}'))
+    finally:
+        set_runner(previous)
+
+    assert result.final_output.amount == 5
+    records = telemetry.records()
+    assert list(records["attempts"]) == [2, 1]
+    assert list(records["ok"]) == [True, False]
+    assert records.loc[1, "error"] == "StubProviderError"
+    assert records.loc[0, "completion_tokens"] > 0
+    assert records.loc[0, "cost_usd"] == call_cost(config.FORECAST_MODEL, records.loc[0, "prompt_tokens"],
+                                                   records.loc[0, "completion_tokens"])
+
+    summary = telemetry.summary().set_index("agent").loc["forecast_agent"]
+    assert summary["calls"] == 2 and summary["errors"] == 1 and summary["extra_attempts"] == 1
+
+    lines = (tmp_path / "calls.jsonl").read_text().splitlines()
+    assert [json.loads(line)["ok"] for line in lines] == [True, False]
+    assert (tmp_path / "metrics.prom").exists()   # first record triggers an export
+
+
+def test_percentiles_histograms_and_prometheus(telemetry):
+    for ms in range(1, 101):
+        telemetry.record(CallRecord(agent="a", wall_ms=float(ms), attempts=1, cached=ms <= 25))
+    summary = telemetry.summary().iloc[0]
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["cache_hit_rate"] == 0.25
+
+    hist = telemetry.histograms()
+    assert hist["count"].sum() == 100 and hist.loc[hist["le_ms"] == 250, "count"].item() <= 1
+
+    text = telemetry.prometheus_text()
+    assert 'fcf_agent_calls_total{agent="a"} 100' in text
+    assert 'fcf_agent_cache_hits_total{agent="a"} 25' in text
+    assert 'fcf_agent_call_duration_ms_bucket{agent="a",le="+Inf"} 100' in text
+    assert 'fcf_agent_call_duration_ms_count{agent="a"} 100' in text
+
+    # Buckets count every call since start, not just the rolling window
+    small = Telemetry(window=10, jsonl_path="", prometheus_path="")
+    for _ in range(30):
+        small.record(CallRecord(agent="a", wall_ms=50.0))
+    assert 'fcf_agent_call_duration_ms_bucket{agent="a",le="100"} 30' in small.prometheus_text()
+
+
+def test_jsonl_is_rotated(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    telemetry = Telemetry(jsonl_path=str(path), prometheus_path="", jsonl_max_mb=0.001)
+    for _ in range(50):
+        telemetry.record(CallRecord(agent="a", wall_ms=1.0))
+    assert path.stat().st_size < 2 * 2**10
+    assert (tmp_path / "calls.jsonl.1").exists()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
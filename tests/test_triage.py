@@ -0,0 +1,45 @@
+"""
+Tests for LLM triage of forecast categories
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from ai_agents.triage import baseline_justification, triage_categories
+
+MONTHS = pd.date_range('2024-01-01', periods=24, freq='MS').strftime('%b %Y')
+
+
+def _wide(n: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    values = 1000 + rng.normal(0, 30, (n, len(MONTHS)))
+    values[:10] += rng.normal(0, 600, (10, len(MONTHS)))  # noisy
+    values[10:15, -3:] += 500                             # level shift
+    df = pd.DataFrame(values, columns=MONTHS)
+    df.insert(0, 'category', [f"cat{i}" for i in range(n)])
+    return df
+
+
+def test_routes_only_uncertain_categories():
+    routing = triage_categories(_wide(), max_llm_share=1)
+    llm = set(routing.index[routing['route'] == 'llm'])
+
+    assert llm == set(range(15))
+    assert routing.loc[10:14, 'structural_break'].all()
+    assert 'Statistical baseline' in baseline_justification(routing.loc[100])
+
+
+def test_llm_share_is_capped():
+    routing = triage_categories(_wide(), max_llm_share=0.05)
+    assert (routing['route'] == 'llm').sum() == 10
+
+
+if __name__ == "__main__":
+    test_routes_only_uncertain_categories()
+    test_llm_share_is_capped()
+    print("✅ Triage tests passed")
@@ -0,0 +1,96 @@
+"""
+Tests for the weekly/daily rolling cash forecast engine
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from drivers.models import WorkingCapitalDrivers
+from forecasting.weekly import (
+    WeeklyCashForecaster,
+    convolve_lag,
+    lag_kernel,
+    monthly_to_buckets,
+)
+
+
+def test_kernel_mean_matches_dso():
+    kernel = lag_kernel(45, bucket_days=1)
+    mean_days = (np.arange(len(kernel)) * kernel).sum()
+    assert abs(kernel.sum() - 1.0) < 1e-9
+    assert abs(mean_days - 45) < 1.0
+
+
+def test_fft_matches_direct_convolution():
+    rng = np.random.default_rng(0)
+    flows = rng.uniform(0, 100, size=(3, 400))
+    kernel = lag_kernel(60, bucket_days=1)
+    assert len(kernel) > 64
+
+    expected = np.stack([np.convolve(row, kernel)[:400] for row in flows])
+    assert np.allclose(convolve_lag(flows, kernel), expected)
+
+
+def test_steady_state_receivables_match_dso():
+    wc = WorkingCapitalDrivers(dso_days=30, dpo_days=20, dio_days=0)
+    forecaster = WeeklyCashForecaster(wc, bucket_days=1)
+    daily_sales = np.full(365, 1000.0)
+
+    result = forecaster.roll_forward(
+        daily_sales, daily_sales * 0.6,
+        opening_receivables=1000.0 * 30,
+        opening_payables=600.0 * 20,
+    )
+    # With steady sales the AR balance stays at sales/day * DSO
+    assert np.allclose(result["accounts_receivable"][-1], 30000, rtol=0.02)
+    assert np.allclose(result["receipts"][-30:], 1000.0, rtol=0.02)
+
+
+def test_13_week_table_from_monthly():
+    wc = WorkingCapitalDrivers(dso_days=45, dpo_days=30, dio_days=60)
+    monthly = pd.DataFrame({
+        "revenue": [100000.0, 110000.0, 120000.0, 130000.0],
+        "cogs": [60000.0, 66000.0, 72000.0, 78000.0],
+    })
+    buckets = monthly_to_buckets(monthly["revenue"].to_numpy(), "2025-01-01", 13)
+    assert buckets.shape == (13,)
+
+    table = WeeklyCashForecaster(wc).forecast_from_monthly(
+        monthly, "2025-01-01", opening_cash=50000
+    )
+    assert len(table) == 13
+    assert table["opening_cash"].iloc[0] == 50000
+    assert np.allclose(
+        table["closing_cash"],
+        50000 + (table["receipts"] - table["disbursements"]).cumsum(),
+    )
+
+
+def test_daily_monte_carlo_speed():
+    wc = WorkingCapitalDrivers(dso_days=45, dpo_days=30, dio_days=60)
+    forecaster = WeeklyCashForecaster(wc, bucket_days=1)
+    rng = np.random.default_rng(1)
+    revenue = rng.normal(1000, 150, size=(2000, 1100))
+
+    start = time.perf_counter()
+    summary = forecaster.simulate(revenue, revenue * 0.6, opening_cash=1e5)
+    elapsed = time.perf_counter() - start
+
+    assert summary["p50"].shape == (1100,)
+    assert summary["min_cash"].shape == (2000,)
+    assert elapsed < 5, f"simulation took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    test_kernel_mean_matches_dso()
+    test_fft_matches_direct_convolution()
+    test_steady_state_receivables_match_dso()
+    test_13_week_table_from_monthly()
+    test_daily_monte_carlo_speed()
+    print("✅ Weekly forecast tests passed")
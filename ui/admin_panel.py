@@ -0,0 +1,99 @@
+"""
+Admin panel for Cash Flow Planner v2.0: agent call telemetry
+
+Shows where the seconds (and tokens) of AI runs go: per-agent latency
+percentiles, queue waits, retries, cache hits, token usage and cost.
+
+All functions accept plain dicts / DataFrames to avoid coupling
+with the AI agent modules.
+"""
+
+import streamlit as st
+import pandas as pd
+from typing import Dict, Optional
+
+
+def render_admin_panel(
+    calls_summary: pd.DataFrame,
+    histograms: pd.DataFrame,
+    prompt_summary: Optional[pd.DataFrame] = None,
+    tool_summary: Optional[pd.DataFrame] = None,
+    scheduler_metrics: Optional[Dict] = None,
+    cache_stats: Optional[Dict] = None,
+) -> None:
+    """
+    Display agent telemetry.
+
+    Args:
+        calls_summary: per-agent DataFrame with columns agent, calls, wall_s,
+            errors, cache_hit_rate, extra_attempts, p50_ms, p95_ms, p99_ms,
+            queue_p95_ms, prompt_tokens, completion_tokens, cost_usd
+        histograms: DataFrame with columns agent, le_ms (bucket upper
+            bound), count (calls in the bucket)
+        prompt_summary: per-agent prompt size / tokens saved table
+        tool_summary: per-tool calls and latency percentiles
+        scheduler_metrics: request scheduler counters
+        cache_stats: response cache counters
+    """
+    st.subheader("🛠 Agent Telemetry")
+
+    if calls_summary.empty:
+        st.info("No agent calls recorded yet.")
+        return
+
+    calls = int(calls_summary["calls"].sum())
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Calls", f"{calls:,}")
+    with col2:
+        st.metric("Errors", f"{calls_summary['errors'].sum() / calls:.1%}")
+    with col3:
+        hits = (calls_summary["cache_hit_rate"] * calls_summary["calls"]).sum()
+        st.metric("Cache Hits", f"{hits / calls:.1%}")
+    with col4:
+        tokens = calls_summary["prompt_tokens"].sum() + calls_summary["completion_tokens"].sum()
+        st.metric("Tokens", f"{tokens:,.0f}")
+    with col5:
+        st.metric("Est. Cost", f"${calls_summary['cost_usd'].sum():,.4f}")
+
+    # Where the seconds go
+    st.markdown("**Time by agent (s)**")
+    st.bar_chart(calls_summary.set_index("agent")["wall_s"])
+
+    st.dataframe(
+        calls_summary,
+        column_config={
+            "wall_s": st.column_config.NumberColumn("Total (s)", format="%.1f"),
+            "cache_hit_rate": st.column_config.NumberColumn("Cache hit rate", format="%.2f"),
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.0f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.0f"),
+            "p99_ms": st.column_config.NumberColumn("p99 (ms)", format="%.0f"),
+            "queue_p95_ms": st.column_config.NumberColumn("Queue p95 (ms)", format="%.0f"),
+            "cost_usd": st.column_config.NumberColumn("Cost ($)", format="%.4f"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    if not histograms.empty:
+        st.markdown("**Latency histogram (calls per bucket, ≤ ms)**")
+        table = histograms.pivot(index="le_ms", columns="agent", values="count")
+        table = table[table.sum(axis=1) > 0]
+        table.index = [("∞" if le == float("inf") else f"{le:,.0f}") for le in table.index]
+        st.bar_chart(table)
+
+    if prompt_summary is not None and not prompt_summary.empty:
+        with st.expander("Prompt sizes"):
+            st.dataframe(prompt_summary, use_container_width=True)
+
+    if tool_summary is not None and not tool_summary.empty:
+        with st.expander("Forecast tool latency"):
+            st.dataframe(tool_summary, use_container_width=True, hide_index=True)
+
+    if scheduler_metrics:
+        with st.expander("Request scheduler"):
+            st.json(scheduler_metrics)
+
+    if cache_stats:
+        with st.expander("Response cache"):
+            st.json(cache_stats)
@@ -7,7 +7,7 @@ Pydantic models or other modules.
 """
 
 import streamlit as st
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 INDUSTRY_OPTIONS = {
@@ -19,19 +19,27 @@ INDUSTRY_OPTIONS = {
 }
 
 
-def render_driver_input_form() -> Dict[str, Any]:
+def render_driver_input_form(defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Renders a Streamlit form for entering financial drivers.
 
+    Args:
+        defaults: Optional initial values in the same shape as the
+            returned dict (e.g. drivers calibrated from history).
+
     Returns a dict with keys:
         - working_capital: {dso_days, dpo_days, dio_days}
-        - revenue: {revenue_growth_pct, gross_margin_pct}
+        - revenue: {revenue_growth_pct, gross_margin_pct, seasonality_factors}
         - capex: {capex_pct_of_revenue, depreciation_years} or None
         - industry: str (key from INDUSTRY_OPTIONS)
         - ccc_days: float (calculated Cash Conversion Cycle)
     """
     st.subheader("📊 Financial Drivers")
 
+    defaults = defaults or {}
+    wc_defaults = defaults.get("working_capital", {})
+    rev_defaults = defaults.get("revenue", {})
+
     # --- Industry selector ---
     industry = st.selectbox(
         "Industry",
@@ -49,7 +57,7 @@ def render_driver_input_form() -> Dict[str, Any]:
             "DSO (days)",
             min_value=0.0,
             max_value=365.0,
-            value=45.0,
+            value=float(wc_defaults.get("dso_days", 45.0)),
             help="Days Sales Outstanding — average time to collect receivables",
         )
     with col2:
@@ -57,7 +65,7 @@ def render_driver_input_form() -> Dict[str, Any]:
             "DPO (days)",
             min_value=0.0,
             max_value=365.0,
-            value=30.0,
+            value=float(wc_defaults.get("dpo_days", 30.0)),
             help="Days Payable Outstanding — average time to pay suppliers",
         )
     with col3:
@@ -65,7 +73,7 @@ def render_driver_input_form() -> Dict[str, Any]:
             "DIO (days)",
             min_value=0.0,
             max_value=365.0,
-            value=60.0,
+            value=float(wc_defaults.get("dio_days", 60.0)),
             help="Days Inventory Outstanding — average time inventory is held",
         )
 
@@ -87,14 +95,14 @@ def render_driver_input_form() -> Dict[str, Any]:
             "Revenue Growth (%)",
             min_value=-100.0,
             max_value=500.0,
-            value=10.0,
+            value=float(rev_defaults.get("revenue_growth_pct", 10.0)),
         )
     with col2:
         gross_margin = st.number_input(
             "Gross Margin (%)",
             min_value=0.0,
             max_value=100.0,
-            value=35.0,
+            value=float(rev_defaults.get("gross_margin_pct", 35.0)),
         )
 
     # --- CapEx section (optional) ---
@@ -123,6 +131,7 @@ def render_driver_input_form() -> Dict[str, Any]:
         "revenue": {
             "revenue_growth_pct": revenue_growth,
             "gross_margin_pct": gross_margin,
+            "seasonality_factors": rev_defaults.get("seasonality_factors"),
         },
         "capex": capex_data,
         "industry": industry,